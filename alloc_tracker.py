@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Seguimiento de las asignaciones de memoria por frame
+
+En sesiones largas de quiosco la memoria residente crece poco a poco, y los
+bucles asignan memoria en cada frame (copias del frame para dibujar, listas y
+diccionarios de los landmarks...). Con --memprofile N los controladores activan
+tracemalloc y:
+
+- En cada frame miden el pico de memoria por encima de la del inicio del frame,
+  es decir, lo que el frame asigna de forma transitoria.
+- Cada N frames toman una instantánea y la comparan con la anterior para obtener
+  los bytes y objetos netos que quedan vivos por frame, desglosados por línea de
+  código (el sitio donde se asignaron). La primera instantánea es la referencia:
+  en los primeros N frames se rellenan cachés (capas del HUD, buffers de la vista
+  previa) que no cuentan como crecimiento.
+- Ajustan una recta a la memoria trazada de todas las instantáneas: si crece de
+  forma sostenida (pendiente por encima de GROWTH_THRESHOLD bytes por frame con
+  un buen ajuste) se marca como crecimiento y se indican los sitios que más crecen.
+
+Al salir se imprime un informe; benchmark.py --memprofile N lo incluye en el JSON
+para detectar regresiones. tracemalloc solo ve la memoria que pasa por Python
+(incluidos los arrays de numpy y OpenCV), no la interna de MediaPipe, y ralentiza
+cada asignación, así que los tiempos medidos con esta opción no son comparables.
+
+Uso:
+    from alloc_tracker import memory_tracker, start_memory_profile
+
+    start_memory_profile(300)   # Instantánea cada 300 frames
+    while ...:
+        ...
+        memory_tracker.frame()
+"""
+
+import gc
+import atexit
+import fnmatch
+import linecache
+import tracemalloc
+
+import numpy as np
+
+# Sitios de asignación incluidos en los informes
+TOP_SITES = 10
+
+# Instantáneas necesarias para evaluar el crecimiento
+GROWTH_MIN_SAMPLES = 5
+
+# Crecimiento sostenido a partir del cual se avisa (bytes por frame)
+GROWTH_THRESHOLD = 64.0
+
+# Calidad mínima del ajuste lineal (R²) para considerar el crecimiento sostenido
+GROWTH_MIN_R2 = 0.8
+
+# Asignaciones que no son del controlador (el propio tracemalloc y las importaciones)
+_EXCLUDED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+def _site(stat):
+    """Línea de código de una estadística de tracemalloc ('archivo:línea')"""
+    frame = stat.traceback[0]
+    return f'{frame.filename}:{frame.lineno}'
+
+
+def _format_bytes(size):
+    """Tamaño legible con signo (para diferencias)"""
+    for unit in ('B', 'KB', 'MB'):
+        if abs(size) < 1024 or unit == 'MB':
+            return f'{size:+.0f} {unit}' if unit == 'B' else f'{size:+.1f} {unit}'
+        size /= 1024.0
+
+
+class AllocationTracker:
+    """Mide con tracemalloc las asignaciones de cada frame y el crecimiento de la memoria"""
+
+    def __init__(self):
+        self.enabled = False
+        self.interval = 0
+        self.frames = 0
+        self.samples = []   # (frame, bytes trazados) de cada instantánea
+
+        self._filters = _EXCLUDED
+        self._frame_base = None
+        self._transient_total = 0
+        self._transient_max = 0
+        self._baseline = None
+        self._previous = None
+        self._last_interval = None  # Bytes y objetos por frame del último intervalo
+
+    def start(self, interval, depth=1, exclude=()):
+        """
+        Activa tracemalloc y el seguimiento por frame.
+
+        Args:
+            interval: Frames entre instantáneas
+            depth: Marcos de pila guardados por asignación (1 basta para desglosar por línea)
+            exclude: Archivos cuyas asignaciones no se cuentan (por ejemplo, el del benchmark)
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(depth)
+        self.interval = max(int(interval), 1)
+        self._filters = _EXCLUDED + tuple(tracemalloc.Filter(False, path) for path in exclude)
+        # Compilar ya los patrones de los filtros para que sus cachés no aparezcan como crecimiento
+        for trace_filter in self._filters:
+            fnmatch.fnmatch('', trace_filter.filename_pattern)
+        self.frames = 0
+        self.samples = []
+        self._transient_total = self._transient_max = 0
+        self._frame_base = None
+        self._baseline = self._previous = self._last_interval = None
+        self.enabled = True
+
+    def stop(self):
+        """Desactiva el seguimiento y tracemalloc (los resultados se conservan)"""
+        self.enabled = False
+        tracemalloc.stop()
+
+    def frame(self):
+        """Cierra un frame del bucle: mide su pico transitorio y toma la instantánea que toque"""
+        if not self.enabled:
+            return
+        _, peak = tracemalloc.get_traced_memory()
+        # La primera llamada solo marca el inicio del primer frame medido
+        if self._frame_base is not None:
+            self.frames += 1
+            transient = peak - self._frame_base
+            self._transient_total += transient
+            if transient > self._transient_max:
+                self._transient_max = transient
+            if self.frames % self.interval == 0:
+                self._snapshot()
+
+        tracemalloc.reset_peak()
+        self._frame_base = tracemalloc.get_traced_memory()[0]
+
+    def _snapshot(self):
+        """Toma una instantánea y la compara con la anterior"""
+        # Sin recoger antes los ciclos pendientes (MediaPipe crea una clase namedtuple por
+        # llamada) la basura que aún no ha pasado el recolector parecería crecimiento
+        gc.collect()
+        snapshot = tracemalloc.take_snapshot().filter_traces(self._filters)
+        # Total de la instantánea filtrada: get_traced_memory() incluiría las instantáneas guardadas
+        current = sum(stat.size for stat in snapshot.statistics('filename'))
+        self.samples.append((self.frames, current))
+
+        if self._previous is None:
+            self._baseline = snapshot
+        else:
+            stats = snapshot.compare_to(self._previous, 'lineno')
+            size = sum(stat.size_diff for stat in stats)
+            count = sum(stat.count_diff for stat in stats)
+            self._last_interval = (size / self.interval, count / self.interval)
+
+            top = ', '.join(f'{_site(stat)} {_format_bytes(stat.size_diff)}'
+                            for stat in stats[:3] if stat.size_diff)
+            print(f"[memoria] frame {self.frames}: {current / 1048576:.1f} MB trazados,"
+                  f" {_format_bytes(size / self.interval)}/frame"
+                  f" ({count / self.interval:+.1f} objetos/frame)"
+                  f", pico transitorio medio {self.mean_transient() / 1024:.1f} KB"
+                  + (f" | {top}" if top else ''))
+        self._previous = snapshot
+
+    def mean_transient(self):
+        """Pico medio de memoria asignada de forma transitoria en un frame (bytes)"""
+        return self._transient_total / self.frames if self.frames else 0.0
+
+    def growth(self):
+        """
+        Ajusta una recta a la memoria trazada de las instantáneas.
+
+        Returns:
+            (pendiente en bytes por frame, R² del ajuste), o (None, None) si hay pocas muestras
+        """
+        if len(self.samples) < GROWTH_MIN_SAMPLES:
+            return None, None
+        frames, sizes = np.asarray(self.samples, dtype=np.float64).T
+        slope, intercept = np.polyfit(frames, sizes, 1)
+        residual = sizes - (slope * frames + intercept)
+        total = sizes - sizes.mean()
+        variance = float(np.dot(total, total))
+        r2 = 1.0 - float(np.dot(residual, residual)) / variance if variance > 0 else 0.0
+        return float(slope), r2
+
+    def top_sites(self, limit=TOP_SITES):
+        """Sitios de asignación que más han crecido desde la primera instantánea"""
+        if self._baseline is None or self._previous is None or self._previous is self._baseline:
+            return []
+        stats = self._previous.compare_to(self._baseline, 'lineno')
+        return [{'site': _site(stat),
+                 'code': linecache.getline(stat.traceback[0].filename, stat.traceback[0].lineno).strip(),
+                 'size_diff': stat.size_diff,
+                 'count_diff': stat.count_diff}
+                for stat in stats[:limit] if stat.size_diff > 0]
+
+    def report(self):
+        """Resultados del seguimiento como diccionario (para el informe o el JSON del benchmark)"""
+        slope, r2 = self.growth()
+        growing = slope is not None and slope > GROWTH_THRESHOLD and r2 >= GROWTH_MIN_R2
+        per_frame_bytes, per_frame_objects = self._last_interval or (None, None)
+        return {
+            'frames': self.frames,
+            'interval': self.interval,
+            'traced_bytes': self.samples[-1][1] if self.samples else 0,
+            'transient_bytes_per_frame': round(self.mean_transient(), 1),
+            'transient_bytes_max': self._transient_max,
+            'net_bytes_per_frame': round(per_frame_bytes, 1) if per_frame_bytes is not None else None,
+            'net_objects_per_frame': round(per_frame_objects, 2) if per_frame_objects is not None else None,
+            'growth_bytes_per_frame': round(slope, 2) if slope is not None else None,
+            'growth_r2': round(r2, 3) if r2 is not None else None,
+            'growing': growing,
+            'top_sites': self.top_sites(),
+        }
+
+    def print_report(self):
+        """Imprime el informe de memoria del bucle"""
+        report = self.report()
+        print(f"\nMemoria en {report['frames']} frames: pico transitorio medio"
+              f" {report['transient_bytes_per_frame'] / 1024:.1f} KB/frame"
+              f" (máx {report['transient_bytes_max'] / 1024:.1f} KB)")
+        if report['growth_bytes_per_frame'] is None:
+            print(f"  Pocas instantáneas para evaluar el crecimiento (mínimo {GROWTH_MIN_SAMPLES})")
+        else:
+            verdict = "CRECIMIENTO SOSTENIDO" if report['growing'] else "estable"
+            print(f"  Tendencia: {_format_bytes(report['growth_bytes_per_frame'])}/frame"
+                  f" (R² {report['growth_r2']:.2f}) -> {verdict}")
+        if report['top_sites']:
+            print("  Sitios que más crecieron desde la primera instantánea:")
+            for site in report['top_sites']:
+                print(f"    {_format_bytes(site['size_diff']):>10} {site['count_diff']:+7d} obj"
+                      f"  {site['site']}  {site['code']}")
+
+
+# Seguimiento compartido por el bucle del controlador
+memory_tracker = AllocationTracker()
+
+
+def start_memory_profile(interval):
+    """
+    Activa el seguimiento de memoria y programa el informe al terminar el proceso.
+
+    Args:
+        interval: Frames entre instantáneas (None o 0 para no hacer nada)
+    """
+    if not interval:
+        return
+    memory_tracker.start(interval)
+    atexit.register(memory_tracker.print_report)
@@ -23,9 +23,19 @@ import time
 import pyautogui
 import numpy as np
 import mediapipe as mp
-import argparse
-import webbrowser
+from itertools import permutations
 from collections import deque
+from dataclasses import dataclass
+
+from controller_runtime import DEFAULT_PREVIEW_FPS, DEFAULT_PREVIEW_SCALE
+from controller_pipeline import (GamePlugin, run_pipeline, find_camera, create_parser,
+                                 start_instrumentation, no_arguments, DEFAULT_CAMERA_INDEX)
+from game_config import load_game_config, default_game_config
+from hud_overlay import HudLayer, text_layer, blend_circle, opaque
+from session_recorder import open_capture
+from stage_profiler import profiler
+from metrics_server import metrics
+from frame_pacing import pacing_analyzer
 
 # Initialize mediapipe hands class
 mp_hands = mp.solutions.hands
@@ -39,20 +49,113 @@ hands = mp_hands.Hands(
     min_tracking_confidence=0.5,  # Reducido para seguimiento más fluido
     max_num_hands=1)  # Una sola mano para mayor precisión
 
+# Modelo del modo de dos jugadores (se crea solo si se usa)
+_two_player_hands = None
+
+def two_player_hands():
+    """
+    Devuelve el modelo de manos del modo de dos jugadores (dos manos, mismas opciones).
+    
+    En modo vídeo MediaPipe sigue cada mano desde la región de sus landmarks del frame
+    anterior y solo vuelve a buscar palmas en el frame completo cuando pierde alguna,
+    así que con los dos jugadores a la vista la segunda mano solo añade una pasada del
+    modelo de landmarks sobre su recorte.
+    """
+    global _two_player_hands
+    if _two_player_hands is None:
+        _two_player_hands = mp_hands.Hands(
+            model_complexity=0,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5,
+            max_num_hands=2)
+    return _two_player_hands
+
 # Disable the PyAutoGUI fail-safe
 pyautogui.FAILSAFE = False
 
-# Configuración del suavizado de movimiento
-SMOOTHING_FACTOR = 0.5  # Factor de suavizado entre 0 y 1 (0 = sin suavizado, 1 = suavizado máximo)
-HISTORY_LENGTH = 5  # Número de posiciones históricas para el suavizado
+# Acciones de cada jugador con su tecla por defecto (la posición es su índice en la tabla de teclas)
+ACTIONS = (
+    ('left', 'left'),
+    ('right', 'right'),
+    ('up', 'up'),
+    ('down', 'down'),
+    ('shoot', 'z'),         # Disparo automático
+    ('barrel_roll', 'x'),   # Barril/Loop
+    ('start', 'enter'),
+    ('select', 'ctrl'),
+    # Segundo jugador (modo --players 2)
+    ('p2_left', 'a'),
+    ('p2_right', 'd'),
+    ('p2_up', 'w'),
+    ('p2_down', 's'),
+    ('p2_shoot', 'g'),
+    ('p2_barrel_roll', 'h'),
+    ('p2_start', '2'),
+    ('p2_select', 'shift'),
+)
+LEFT, RIGHT, UP, DOWN, SHOOT, BARREL_ROLL, START, SELECT = range(8)
+PLAYER_ACTIONS = 8  # Acciones de cada jugador en la tabla de teclas
+MAX_PLAYERS = len(ACTIONS) // PLAYER_ACTIONS
+
+# Color del cursor de cada jugador (BGR)
+PLAYER_COLORS = ((0, 255, 0), (0, 165, 255))
+
+@dataclass(frozen=True, slots=True)
+class Arcade1942Tuning:
+    """Umbrales del control de Arcade 1942 (se ajustan en configs/arcade_1942.json)"""
+    sensitivity: float = 2.5           # Multiplicador de sensibilidad (--sensitivity lo sustituye)
+    smoothing: float = 0.5             # Suavizado entre 0 (sin suavizado) y 1 (máximo) (--smoothing)
+    history_length: int = 5            # Número de posiciones históricas para el suavizado
+    movement_threshold: int = 5        # Umbral mínimo para considerar movimiento intencionado (px)
+    dead_zone_radius: float = 0.15     # Zona muerta central (radio como fracción del ancho)
+    position_low: float = 0.4          # Posición relativa por debajo de la cual se pulsa izquierda/arriba
+    position_high: float = 0.6         # Posición relativa por encima de la cual se pulsa derecha/abajo
+    toggle_cooldown: float = 0.5       # Segundos entre cambios del disparo automático
+    shoot_cooldown: float = 0.1        # Segundos entre disparos
+    barrel_roll_cooldown: float = 0.5  # Segundos entre barrel rolls
+    start_cooldown: float = 0.5        # Segundos entre START
+    select_cooldown: float = 0.5       # Segundos entre SELECT
+    player_max_jump: float = 0.25      # Desplazamiento máximo de una mano entre frames (fracción del frame)
+    player_lost_frames: int = 15       # Frames sin su mano tras los que un jugador vuelve a su lado
+    player_velocity_smoothing: float = 0.5  # Peso del último desplazamiento en la velocidad de cada mano
+    handedness_penalty: float = 0.15   # Coste de asignar a un jugador una mano de otra lateralidad
+
+def configure(path=None):
+    """
+    Carga la configuración del juego y compila la tabla de teclas y los umbrales.
+    
+    Args:
+        path: Archivo JSON a usar en lugar de configs/arcade_1942.json
+    """
+    return _use_config(load_game_config('arcade_1942', ACTIONS, Arcade1942Tuning, path))
+
+def _use_config(config):
+    """Aplica una configuración ya compilada a las tablas del módulo"""
+    global CONFIG, KEYS, TUNING, SMOOTHING_FACTOR, HISTORY_LENGTH
+    CONFIG = config
+    KEYS, TUNING = CONFIG.keys, CONFIG.tuning
+    # Configuración del suavizado de movimiento
+    SMOOTHING_FACTOR = TUNING.smoothing
+    HISTORY_LENGTH = TUNING.history_length
+    return CONFIG
+
+# Valores por defecto al importar; main() lee configs/arcade_1942.json
+_use_config(default_game_config('arcade_1942', ACTIONS, Arcade1942Tuning))
 
 class HandController:
     """Controlador de mano con sensibilidad tipo mouse para juegos arcade"""
     
-    def __init__(self):
-        """Inicializa el controlador de mano"""
-        # Variables de control generales
-        self.camera_index = self._find_camera()
+    def __init__(self, player=0):
+        """
+        Inicializa el controlador de mano
+        
+        Args:
+            player: Jugador que controla (0 o 1); cada jugador tiene su estado y sus teclas
+        """
+        # Variables de control generales (la cámara solo la usa el primer jugador)
+        self.player = player
+        self.label = None  # Etiqueta del cursor en el modo de dos jugadores ("J1", "J2")
+        self.camera_index = self._find_camera() if player == 0 else None
         self.camera = None
         # Reducir resolución para mejor rendimiento
         self.frame_width = 480   # Reducido de 1280 a 640
@@ -62,8 +165,13 @@ class HandController:
         # Variables para el control de sensibilidad
         self.prev_hand_center = None
         self.position_history = deque(maxlen=HISTORY_LENGTH)
-        self.movement_threshold = 5  # Umbral mínimo para considerar movimiento intencionado
-        self.sensitivity = 2.5  # Multiplicador de sensibilidad
+        self.movement_threshold = TUNING.movement_threshold  # Umbral mínimo para considerar movimiento intencionado
+        self.sensitivity = TUNING.sensitivity  # Multiplicador de sensibilidad
+        
+        # Tabla de teclas compilada del jugador (indexada por LEFT, RIGHT, SHOOT...) y límites de posición
+        self.keys = KEYS[player * PLAYER_ACTIONS:(player + 1) * PLAYER_ACTIONS]
+        self.position_low = TUNING.position_low
+        self.position_high = TUNING.position_high
           # Variables para el control de gestos
         self.current_keys_pressed = set()
         self.last_command_time = time.time()
@@ -73,40 +181,70 @@ class HandController:
         self.last_start_time = time.time()
         self.last_select_time = time.time()
         
-        self.gesture_cooldowns = {
-            'barrel_roll': 0.5,  # 0.5 segundos entre barrel rolls (reducido para pruebas)
-            'shoot': 0.1,        # 0.1 segundos entre disparos
-            'start': 0.5,        # 0.5 segundos para start/select
-            'select': 0.5
-        }
+        # Tiempos de espera de cada gesto
+        self.toggle_cooldown = TUNING.toggle_cooldown
+        self.shoot_cooldown = TUNING.shoot_cooldown
+        self.barrel_roll_cooldown = TUNING.barrel_roll_cooldown
+        self.start_cooldown = TUNING.start_cooldown
+        self.select_cooldown = TUNING.select_cooldown
         
         # Variables para el cálculo de FPS
         self.prev_time = 0
         self.current_fps = 0
         
         # Zonas de control virtual para dirección
-        self.dead_zone_radius = 0.15  # Zona muerta central (radio como % del ancho)
+        self.dead_zone_radius = TUNING.dead_zone_radius  # Zona muerta central (radio como % del ancho)
         
         # Estado actual del jugador
         self.player_x = 0.5  # Posición relativa (0-1) del jugador en X
         self.player_y = 0.5  # Posición relativa (0-1) del jugador en Y
         
+        # Modo headless: sin dibujado ni ventanas para dedicar todo el bucle al control
+        self.headless = False
+        
+        # Vista previa en su propio hilo, limitada en FPS y reducida de tamaño
+        self.preview = None
+        self.preview_fps = DEFAULT_PREVIEW_FPS
+        self.preview_scale = DEFAULT_PREVIEW_SCALE
+        
+        # Sesiones: grabar la cámara (--record) o usar una grabación en su lugar (--replay)
+        self.record_path = None
+        self.replay_path = None
+        
+        # Capas estáticas del HUD: se rasterizan una vez y solo se componen en cada frame
+        self.static_hud = HudLayer(self._draw_static_hud)
+        self.hud_labels = {
+            'auto_shoot_on': text_layer("🔫 DISPARO AUTOMÁTICO (Z)", lambda w, h: (10, h - 40),
+                                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2),
+            'auto_shoot_off': text_layer("⏸️ DISPARO PAUSADO", lambda w, h: (10, h - 40),
+                                         cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 165, 255), 2),
+            'is_barrel_roll': HudLayer(self._draw_barrel_roll_label),
+            'is_start': text_layer("▶️ START (Enter)", (10, 150),
+                                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2),
+            'is_select': text_layer("⚙️ SELECT (Ctrl)", (10, 180),
+                                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2),
+            'is_pause': text_layer("🤙 PAUSAR/REANUDAR", (10, 210),
+                                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2),
+            'debug_header': text_layer("DEBUG - Dedos extendidos:", (10, 240),
+                                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1),
+            'no_hand': text_layer("⚠️ No se detecta mano", lambda w, h: (10, h - 80),
+                                  cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2),
+        }
+        
     def _find_camera(self):
         """Encuentra y devuelve el índice de la primera cámara disponible"""
-        print("Buscando cámaras disponibles...")
-        
-        # Usar directamente la cámara 3 que sabemos que funciona
-        print("Usando cámara con índice 3 (confirmada)")
-        return 3
+        return find_camera()
     
     def initialize_camera(self):
         """Inicializa la cámara con los parámetros deseados"""
-        self.camera = cv2.VideoCapture(self.camera_index)
+        self.camera = pacing_analyzer.wrap(
+            open_capture(self.camera_index, record=self.record_path, replay=self.replay_path))
         self.camera.set(3, self.frame_width)
         self.camera.set(4, self.frame_height)
         
         if not self.camera.isOpened():
             raise Exception("Error: No se pudo abrir la cámara")
+        metrics.set_source_fps(self.camera.get(cv2.CAP_PROP_FPS))
             
         return self.camera.isOpened()
     
@@ -116,10 +254,16 @@ class HandController:
         for key in self.current_keys_pressed:
             pyautogui.keyUp(key)
             
+        # Detener la vista previa
+        if self.preview is not None:
+            self.preview.stop()
+            self.preview = None
+            
         # Liberar cámara y cerrar ventanas
         if self.camera is not None:
             self.camera.release()
-        cv2.destroyAllWindows()
+        if not self.headless:
+            cv2.destroyAllWindows()
     
     def detect_hands(self, image, draw=True):
         """
@@ -136,12 +280,15 @@ class HandController:
         # Crear una versión reducida de la imagen para procesar más rápido
         # Reducir la imagen a la mitad para procesamiento
         small_image = cv2.resize(image, (0, 0), fx=0.5, fy=0.5)
+        profiler.lap('resize')
         
         # Convertir la imagen de BGR a RGB
         imageRGB = cv2.cvtColor(small_image, cv2.COLOR_BGR2RGB)
+        profiler.lap('cvtColor')
         
         # Realizar la detección de manos en la imagen reducida
         results = hands.process(imageRGB)
+        profiler.lap('inference')
         
         # Crear copia de imagen original solo si se detectan manos y se debe dibujar
         output_image = image
@@ -155,6 +302,7 @@ class HandController:
                     mp_hands.HAND_CONNECTIONS,
                     mp_drawing_styles.get_default_hand_landmarks_style(),
                     mp_drawing_styles.get_default_hand_connections_style())
+            profiler.lap('drawing')
         
         return output_image, results
     
@@ -329,18 +477,19 @@ class HandController:
         
         # Calcular las teclas que deben presionarse según la posición del jugador
         new_keys = set()
+        keys = self.keys
         
         # Controles de dirección horizontal
-        if self.player_x < 0.4:
-            new_keys.add('left')
-        elif self.player_x > 0.6:
-            new_keys.add('right')
+        if self.player_x < self.position_low:
+            new_keys.add(keys[LEFT])
+        elif self.player_x > self.position_high:
+            new_keys.add(keys[RIGHT])
             
         # Controles de dirección vertical
-        if self.player_y < 0.4:
-            new_keys.add('up')
-        elif self.player_y > 0.6:
-            new_keys.add('down')
+        if self.player_y < self.position_low:
+            new_keys.add(keys[UP])
+        elif self.player_y > self.position_high:
+            new_keys.add(keys[DOWN])
             
         return new_keys
     
@@ -355,6 +504,7 @@ class HandController:
             Conjunto de teclas que deben presionarse según los gestos
         """
         new_keys = set()
+        keys = self.keys
         current_time = time.time()
         
         # Variables para control de disparos
@@ -363,40 +513,40 @@ class HandController:
             
         # Verificar gesto de pausa
         if hand_info['is_pause']:
-            if current_time - self.last_command_time > 0.5:  # Evitar cambios rápidos
+            if current_time - self.last_command_time > self.toggle_cooldown:  # Evitar cambios rápidos
                 self.auto_shoot = not self.auto_shoot
                 print(f"Disparo automático {'ACTIVADO' if self.auto_shoot else 'DESACTIVADO'}")
                 self.last_command_time = current_time
         
         # Gesto para activar disparo automático (todos los dedos)
         if hand_info['is_auto_shoot']:
-            if not self.auto_shoot and current_time - self.last_command_time > 0.5:
+            if not self.auto_shoot and current_time - self.last_command_time > self.toggle_cooldown:
                 self.auto_shoot = True
                 print("Disparo automático ACTIVADO")
                 self.last_command_time = current_time
         
         # Disparo automático - usa tecla Z y respeta el estado de pausa
-        if self.auto_shoot and current_time - self.last_shoot_time > self.gesture_cooldowns['shoot']:
-            new_keys.add('z')  # Tecla de disparo (Z)
+        if self.auto_shoot and current_time - self.last_shoot_time > self.shoot_cooldown:
+            new_keys.add(keys[SHOOT])  # Tecla de disparo (Z)
             self.last_shoot_time = current_time
           # Barril/Loop (X): SOLO con dedo índice
         if hand_info['is_barrel_roll']:
-            if current_time - self.last_barrel_roll_time > self.gesture_cooldowns['barrel_roll']:
-                new_keys.add('x')  # Barrel roll key (X)
+            if current_time - self.last_barrel_roll_time > self.barrel_roll_cooldown:
+                new_keys.add(keys[BARREL_ROLL])  # Barrel roll key (X)
                 self.last_barrel_roll_time = current_time
                 print("🔄 BARRIL ROLL DETECTADO - Tecla X presionada")
                 
         # Gesto de Start (Enter)
         if hand_info['is_start']:
-            if current_time - self.last_start_time > self.gesture_cooldowns['start']:
-                new_keys.add('enter')
+            if current_time - self.last_start_time > self.start_cooldown:
+                new_keys.add(keys[START])
                 self.last_start_time = current_time
                 print("▶️ START DETECTADO - Tecla Enter presionada")
                 
         # Gesto de Select (Ctrl)
         if hand_info['is_select']:
-            if current_time - self.last_select_time > self.gesture_cooldowns['select']:
-                new_keys.add('ctrl')
+            if current_time - self.last_select_time > self.select_cooldown:
+                new_keys.add(keys[SELECT])
                 self.last_select_time = current_time
                 print("⚙️ SELECT DETECTADO - Tecla Ctrl presionada")
                 
@@ -430,6 +580,70 @@ class HandController:
         self.prev_time = current_time
         return int(self.current_fps)
     
+    def _draw_static_hud(self, canvas):
+        """Dibuja en la capa estática la zona muerta central y la guía de gestos"""
+        height, width = canvas.shape[:2]
+        
+        # Zona central "muerta"
+        dead_zone_radius = int(self.dead_zone_radius * width)
+        cv2.circle(canvas, (width // 2, height // 2), dead_zone_radius, opaque((100, 100, 100)), 1)
+        
+        # Guía de gestos
+        white = opaque((255, 255, 255))
+        cv2.putText(canvas, "📋 GESTOS:", (width - 300, 30), 
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, white, 1)
+        cv2.putText(canvas, "- Solo Índice: Barril (X)", (width - 300, 60), 
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, white, 1)
+        cv2.putText(canvas, "- Pulgar+Meñique: Start", (width - 300, 90), 
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, white, 1)
+        cv2.putText(canvas, "- Pulgar+Índice: Select", (width - 300, 120), 
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, white, 1)
+        cv2.putText(canvas, "- 🤙: Pausar/reanudar", (width - 300, 150), 
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, white, 1)
+    
+    def _draw_barrel_roll_label(self, canvas):
+        """Dibuja en su capa la etiqueta del barril/loop con su recuadro indicador"""
+        red = opaque((0, 0, 255))
+        cv2.putText(canvas, "🔄 BARRIL/LOOP (X)", (10, 120), 
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, red, 2)
+        # Indicador adicional más visible para barril roll
+        cv2.rectangle(canvas, (5, 115), (250, 135), red, 2)
+    
+    def draw_player_cursor(self, frame):
+        """Dibuja el cursor virtual del jugador (con su etiqueta en el modo de dos jugadores)"""
+        height, width = frame.shape[:2]
+        player_x_pixel = int(self.player_x * width)
+        player_y_pixel = int(self.player_y * height)
+        color = PLAYER_COLORS[self.player]
+        
+        radius = 20
+        # Círculo exterior (contorno blanco)
+        cv2.circle(frame, (player_x_pixel, player_y_pixel), radius + 2, (255, 255, 255), 2)
+        # Círculo interior (relleno semi-transparente del color del jugador), mezclado solo en su región
+        blend_circle(frame, (player_x_pixel, player_y_pixel), radius, color, 0.4)
+        if self.label:
+            cv2.putText(frame, self.label, (player_x_pixel - 12, player_y_pixel - radius - 8),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+    
+    def display_player(self, frame, hand_info=None):
+        """
+        Muestra el estado compacto de un jugador secundario (cursor, teclas y si se ve su mano)
+        
+        Args:
+            frame: Imagen del marco actual
+            hand_info: Información de la mano del jugador (None si no hay mano)
+        """
+        height, width = frame.shape[:2]
+        self.draw_player_cursor(frame)
+        
+        color = PLAYER_COLORS[self.player]
+        if hand_info is None:
+            status = "sin mano"
+        else:
+            status = " ".join(sorted(self.current_keys_pressed)) or "-"
+        cv2.putText(frame, f"{self.label}: {status}", (width - 220, height - 20),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+    
     def display_interface(self, frame, hand_info=None, delta_movement=None):
         """
         Muestra la interfaz del controlador en el marco de video
@@ -441,38 +655,20 @@ class HandController:
         """
         height, width, _ = frame.shape
         
-        # Mostrar FPS
-        fps = self.calculate_fps()
+        # Mostrar FPS (calculados en el bucle en cada frame procesado)
+        fps = int(self.current_fps)
         cv2.putText(frame, f'FPS: {fps}', (width - 120, 30), 
                     cv2.FONT_HERSHEY_PLAIN, 1.5, (0, 255, 0), 2)
         
         # Mostrar posición virtual del jugador
-        player_x_pixel = int(self.player_x * width)
-        player_y_pixel = int(self.player_y * height)
-        
-        # Dibujar cursor virtual del jugador
-        radius = 20
-        # Círculo exterior (contorno blanco)
-        cv2.circle(frame, (player_x_pixel, player_y_pixel), radius + 2, (255, 255, 255), 2)
-        # Círculo interior (relleno verde semi-transparente)
-        overlay = frame.copy()
-        cv2.circle(overlay, (player_x_pixel, player_y_pixel), radius, (0, 255, 0), -1)
-        # Aplicar transparencia al círculo relleno
-        cv2.addWeighted(overlay, 0.4, frame, 0.6, 0, frame)
-        
-        # Mostrar zona central "muerta"
-        dead_zone_radius = int(self.dead_zone_radius * width)
-        center_x, center_y = width // 2, height // 2
-        cv2.circle(frame, (center_x, center_y), dead_zone_radius, (100, 100, 100), 1)
+        self.draw_player_cursor(frame)
         
         # Estado del disparo automático
         if hasattr(self, 'auto_shoot'):
             if self.auto_shoot:
-                cv2.putText(frame, "🔫 DISPARO AUTOMÁTICO (Z)", (10, height - 40), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+                self.hud_labels['auto_shoot_on'].draw(frame)
             else:
-                cv2.putText(frame, "⏸️ DISPARO PAUSADO", (10, height - 40), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 165, 255), 2)
+                self.hud_labels['auto_shoot_off'].draw(frame)
         
         # Si tenemos información de la mano
         if hand_info is not None:
@@ -487,35 +683,23 @@ class HandController:
             
             # Mostrar teclas activas
             active_keys = []
-            if 'left' in self.current_keys_pressed:
+            if self.keys[LEFT] in self.current_keys_pressed:
                 active_keys.append("⬅️")
-            if 'right' in self.current_keys_pressed:
+            if self.keys[RIGHT] in self.current_keys_pressed:
                 active_keys.append("➡️")
-            if 'up' in self.current_keys_pressed:
+            if self.keys[UP] in self.current_keys_pressed:
                 active_keys.append("⬆️")
-            if 'down' in self.current_keys_pressed:
+            if self.keys[DOWN] in self.current_keys_pressed:
                 active_keys.append("⬇️")
                 
             if active_keys:
                 cv2.putText(frame, "Dirección: " + " ".join(active_keys), 
-                            (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)            # Mostrar acciones especiales
-            if hand_info['is_barrel_roll']:
-                cv2.putText(frame, "🔄 BARRIL/LOOP (X)", (10, 120), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
-                # Indicador adicional más visible para barril roll
-                cv2.rectangle(frame, (5, 115), (250, 135), (0, 0, 255), 2)
-                
-            if hand_info['is_start']:
-                cv2.putText(frame, "▶️ START (Enter)", (10, 150), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
-                
-            if hand_info['is_select']:
-                cv2.putText(frame, "⚙️ SELECT (Ctrl)", (10, 180), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
-                
-            if hand_info['is_pause']:
-                cv2.putText(frame, "🤙 PAUSAR/REANUDAR", (10, 210), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
+                            (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+            
+            # Mostrar acciones especiales (etiquetas pre-renderizadas)
+            for gesture in ('is_barrel_roll', 'is_start', 'is_select', 'is_pause'):
+                if hand_info[gesture]:
+                    self.hud_labels[gesture].draw(frame)
             
             # Mostrar información de debug de dedos
             debug_y = 240
@@ -528,8 +712,7 @@ class HandController:
                 hand_info['pinky_extended']
             ]
             
-            cv2.putText(frame, f"DEBUG - Dedos extendidos:", (10, debug_y), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
+            self.hud_labels['debug_header'].draw(frame)
             
             for i, (name, state) in enumerate(zip(finger_names, finger_states)):
                 color = (0, 255, 0) if state else (0, 0, 255)
@@ -538,19 +721,10 @@ class HandController:
                             cv2.FONT_HERSHEY_SIMPLEX, 0.4, color, 1)
                 
         else:
-            cv2.putText(frame, "⚠️ No se detecta mano", (10, height - 80), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
-              # Mostrar guía de gestos
-        cv2.putText(frame, "📋 GESTOS:", (width - 300, 30), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 1)
-        cv2.putText(frame, "- Solo Índice: Barril (X)", (width - 300, 60), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
-        cv2.putText(frame, "- Pulgar+Meñique: Start", (width - 300, 90), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
-        cv2.putText(frame, "- Pulgar+Índice: Select", (width - 300, 120), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
-        cv2.putText(frame, "- 🤙: Pausar/reanudar", (width - 300, 150), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+            self.hud_labels['no_hand'].draw(frame)
+        
+        # Mostrar zona central "muerta" y guía de gestos (capa estática)
+        self.static_hud.draw(frame)
             
     def test_detection(self):
         """Prueba la detección de manos y muestra la interfaz de prueba"""
@@ -605,6 +779,7 @@ class HandController:
                     self.update_key_presses(set())
                 
                 # Mostrar la interfaz
+                self.calculate_fps()
                 self.display_interface(frame, hand_info, (delta_x, delta_y))
                   # Mostrar el fotograma
                 cv2.imshow('Mouse-Like Hand Detection Test', frame)
@@ -621,98 +796,16 @@ class HandController:
             traceback.print_exc()
             self.release_resources()
     
-    def play_game(self):
-        """Función principal para jugar al juego arcade 1942 con detección de manos"""
-        try:
-            # Abrir automáticamente la URL de 1942
-            print("Abriendo Arcade 1942 en el navegador...")
-            webbrowser.open("https://www.free80sarcade.com/1942-2.php")
-            
-            if not self.initialize_camera():
-                return
-                
-            cv2.namedWindow('1942 Arcade Mouse-Like Controller', cv2.WINDOW_NORMAL)
-              # Mostrar instrucciones
-            print("\n============== INSTRUCCIONES DE JUEGO ==============")
-            print("CONTROLES:")
-            print("  - Mover la mano como un mouse para controlar el avión")
-            print("  - Solo dedo índice extendido: BARRIL/LOOP (tecla X)")
-            print("  - Todos los dedos extendidos: DISPARO AUTOMÁTICO (tecla Z)")
-            print("  - Pulgar y meñique extendidos para START (tecla Enter)")
-            print("  - Pulgar e índice extendidos para SELECT (tecla Ctrl)")
-            print("  - Presionar ESC para salir")
-            print("\nAJUSTES DE SENSIBILIDAD:")
-            print("  - Detecta y sigue el movimiento relativo de la mano")
-            print("  - Comportamiento similar al de un mouse")
-            print("  - Suavizado de movimiento para mayor precisión")
-            print("===================================================\n")
-            
-            # Posicionar al jugador en el centro al inicio
-            self.player_x = 0.5
-            self.player_y = 0.5
-            
-            while self.camera.isOpened():
-                # Leer un fotograma
-                ok, frame = self.camera.read()
-                
-                if not ok:
-                    print("Error: No se pudo leer un fotograma de la cámara")
-                    break
-                
-                # Voltear horizontalmente para una visualización natural
-                frame = cv2.flip(frame, 1)
-                
-                # Detectar manos
-                frame, results = self.detect_hands(frame)
-                
-                # Variables para el movimiento relativo
-                delta_x, delta_y = 0, 0
-                hand_info = None
-                
-                # Procesar gestos si se detectan manos
-                if results.multi_hand_landmarks:
-                    for hand_landmarks in results.multi_hand_landmarks:
-                        # Obtener información de la mano
-                        hand_info = self.get_hand_info(hand_landmarks, frame.shape)
-                        
-                        # Calcular movimiento relativo
-                        delta_x, delta_y = self.calculate_relative_movement(hand_info)
-                        
-                        # Actualizar posición del jugador y obtener nuevas teclas a presionar
-                        movement_keys = self.update_player_position(delta_x, delta_y)
-                        
-                        # Obtener teclas de gestos
-                        gesture_keys = self.process_gestures(hand_info)
-                        
-                        # Combinar todas las teclas
-                        new_keys = movement_keys.union(gesture_keys)
-                        
-                        # Actualizar teclas presionadas
-                        self.update_key_presses(new_keys)
-                else:
-                    # No hay manos detectadas, restablecer todo excepto la posición virtual del jugador
-                    self.prev_hand_center = None
-                    # Liberar todas las teclas pero mantener la posición virtual
-                    self.update_key_presses(set())
-                
-                # Mostrar la interfaz
-                self.display_interface(frame, hand_info, (delta_x, delta_y))
-                
-                # Mostrar el fotograma
-                cv2.imshow('1942 Arcade Mouse-Like Controller', frame)
-                
-                # Esperar 1ms y verificar si se presiona ESC
-                k = cv2.waitKey(1) & 0xFF
-                if k == 27:  # Tecla ESC
-                    break
-            
-            self.release_resources()
-            
-        except Exception as e:
-            print(f"Error durante el juego: {e}")
-            import traceback
-            traceback.print_exc()
-            self.release_resources()
+    def play_game(self, players=1):
+        """
+        Función principal para jugar al juego arcade 1942 con detección de manos
+        
+        Args:
+            players: Número de jugadores (1 o 2, una mano cada uno)
+        """
+        run_pipeline(Arcade1942Plugin(self, players=players), camera_index=self.camera_index, headless=self.headless,
+                     preview_fps=self.preview_fps, preview_scale=self.preview_scale,
+                     record=self.record_path, replay=self.replay_path)
     
     def adjust_sensitivity(self, new_sensitivity):
         """Ajusta la sensibilidad del controlador"""
@@ -725,6 +818,271 @@ class HandController:
         SMOOTHING_FACTOR = max(0.0, min(1.0, new_smoothing))
         print(f"Factor de suavizado ajustado a: {SMOOTHING_FACTOR}")
 
+class PlayerAssigner:
+    """
+    Asigna las manos detectadas a los jugadores de forma estable entre frames.
+    
+    MediaPipe no mantiene el orden de las manos entre frames, así que cada jugador
+    recuerda dónde estaba su mano, a qué velocidad se movía y su lateralidad. Cada
+    frame se prueban todas las asignaciones posibles (con dos jugadores y dos manos
+    son muy pocas) y se elige la de menor coste:
+    - Un jugador con la mano seguida: la distancia a la posición prevista con su
+      velocidad (suavizada con player_velocity_smoothing), sin aceptar saltos
+      mayores que player_max_jump (así, cuando dos manos con la misma lateralidad
+      se cruzan, cada una sigue con su jugador)
+    - Un jugador sin mano: la distancia a su lado del frame (J1 a la izquierda)
+    - Si la lateralidad no coincide con la última vista: handedness_penalty más
+    - Un jugador que se queda sin mano: player_max_jump
+    Tras player_lost_frames frames sin su mano, el jugador olvida su posición y su
+    lateralidad y vuelve a esperar una mano en su lado.
+    """
+    
+    def __init__(self, players, tuning=None):
+        tuning = tuning or TUNING
+        self.max_jump = tuning.player_max_jump
+        self.lost_frames = tuning.player_lost_frames
+        self.velocity_smoothing = tuning.player_velocity_smoothing
+        self.handedness_penalty = tuning.handedness_penalty
+        self.homes = [((i + 0.5) / players, 0.5) for i in range(players)]
+        self.centers = [None] * players
+        self.velocities = [(0.0, 0.0)] * players
+        self.labels = [None] * players
+        self.missed = [0] * players
+    
+    def _predicted(self, player):
+        """Posición prevista de la mano de un jugador en este frame"""
+        (x, y), (dx, dy) = self.centers[player], self.velocities[player]
+        steps = self.missed[player] + 1
+        return x + dx * steps, y + dy * steps
+    
+    def _cost(self, player, hand):
+        """Coste de asignar una mano (x, y, lateralidad) a un jugador"""
+        x, y, label = hand
+        center = self.centers[player]
+        if center is None:
+            home_x, home_y = self.homes[player]
+            cost = np.hypot(x - home_x, y - home_y)
+        else:
+            predicted_x, predicted_y = self._predicted(player)
+            cost = np.hypot(x - predicted_x, y - predicted_y)
+            if cost > self.max_jump:
+                return None
+        if label is not None and self.labels[player] not in (None, label):
+            cost += self.handedness_penalty
+        return cost
+    
+    def assign(self, hands):
+        """
+        Args:
+            hands: Lista de manos como (centro_x, centro_y, lateralidad), con el centro normalizado (0-1)
+            
+        Returns:
+            Lista con el índice en hands de la mano de cada jugador (None si no tiene)
+        """
+        players = len(self.centers)
+        costs = [[self._cost(player, hand) for hand in hands] for player in range(players)]
+        
+        best, best_cost = [None] * players, None
+        for candidate in permutations(list(range(len(hands))) + [None] * players, players):
+            total = 0.0
+            for player, index in enumerate(candidate):
+                cost = self.max_jump if index is None else costs[player][index]
+                if cost is None:
+                    break
+                total += cost
+            else:
+                if best_cost is None or total < best_cost:
+                    best, best_cost = list(candidate), total
+        
+        for player, index in enumerate(best):
+            if index is None:
+                self.missed[player] += 1
+                if self.missed[player] > self.lost_frames:
+                    self.centers[player] = self.labels[player] = None
+                    self.velocities[player] = (0.0, 0.0)
+            else:
+                x, y, label = hands[index]
+                center = self.centers[player]
+                if center is not None:
+                    # Desplazamiento por frame desde la última posición vista
+                    steps = self.missed[player] + 1
+                    dx, dy = (x - center[0]) / steps, (y - center[1]) / steps
+                    old_dx, old_dy = self.velocities[player]
+                    self.velocities[player] = (old_dx + self.velocity_smoothing * (dx - old_dx),
+                                               old_dy + self.velocity_smoothing * (dy - old_dy))
+                self.centers[player] = (x, y)
+                self.labels[player] = label or self.labels[player]
+                self.missed[player] = 0
+        return best
+
+class Arcade1942Plugin(GamePlugin):
+    """
+    Arcade 1942 para el bucle común: la mano se mueve como un mouse (flechas) y los
+    gestos disparan (Z), hacen el barril (X), START (Enter) y SELECT (Ctrl).
+    
+    Con dos jugadores cada uno controla su avión con una mano: un solo modelo detecta
+    las dos manos, PlayerAssigner mantiene qué mano es de quién y cada jugador tiene su
+    propio HandController (suavizado, posición, tiempos de espera y teclas).
+    """
+    
+    name = 'arcade_1942'
+    title = 'Arcade 1942'
+    window_title = '1942 Arcade Mouse-Like Controller'
+    url = "https://www.free80sarcade.com/1942-2.php"
+    inference_scale = 0.5  # Reducir la imagen a la mitad para procesar más rápido
+    
+    def __init__(self, controller, players=1):
+        self.controller = controller
+        self.capture_size = (controller.frame_width, controller.frame_height)
+        
+        # Un controlador por jugador; el primero es el de la línea de comandos
+        self.controllers = [controller]
+        for player in range(1, players):
+            other = HandController(player=player)
+            other.sensitivity = controller.sensitivity
+            self.controllers.append(other)
+        if players > 1:
+            for player, other in enumerate(self.controllers):
+                other.label = f"J{player + 1}"
+        self.assigner = PlayerAssigner(players) if players > 1 else None
+        self.model = two_player_hands() if players > 1 else hands
+    
+    def start(self):
+        # Posicionar a los jugadores en el centro al inicio
+        for controller in self.controllers:
+            controller.player_x = 0.5
+            controller.player_y = 0.5
+    
+    def instructions(self, headless):
+        lines = [
+            "\n============== INSTRUCCIONES DE JUEGO ==============",
+            "CONTROLES:",
+            "  - Mover la mano como un mouse para controlar el avión",
+            "  - Solo dedo índice extendido: BARRIL/LOOP (tecla X)",
+            "  - Todos los dedos extendidos: DISPARO AUTOMÁTICO (tecla Z)",
+            "  - Pulgar y meñique extendidos para START (tecla Enter)",
+            "  - Pulgar e índice extendidos para SELECT (tecla Ctrl)",
+            "  - Modo headless: Ctrl+C, o ESC/q en la consola para salir" if headless
+            else "  - Presionar ESC para salir",
+        ]
+        if self.assigner is not None:
+            lines += [
+                "\nDOS JUGADORES:",
+                "  - J1 empieza a la izquierda y J2 a la derecha, una mano cada uno",
+                f"  - Teclas de J2: {', '.join(self.controllers[1].keys)}",
+            ]
+        lines += [
+            "\nAJUSTES DE SENSIBILIDAD:",
+            "  - Detecta y sigue el movimiento relativo de la mano",
+            "  - Comportamiento similar al de un mouse",
+            "  - Suavizado de movimiento para mayor precisión",
+            "===================================================\n",
+        ]
+        return lines
+    
+    def preprocess(self, frame):
+        # Reducir la imagen para procesar más rápido (a la mitad, salvo que --autotune elija otra escala)
+        small_image = self.downscale(frame)
+        
+        # Convertir la imagen de BGR a RGB
+        imageRGB = cv2.cvtColor(small_image, cv2.COLOR_BGR2RGB)
+        profiler.lap('cvtColor')
+        return imageRGB
+    
+    def infer(self, image):
+        return self.model.process(image)
+    
+    def detected(self, results):
+        return bool(results.multi_hand_landmarks)
+    
+    def _assign(self, results):
+        """Índice de la mano de cada jugador en los resultados (None si no tiene)"""
+        detected = results.multi_hand_landmarks or []
+        if self.assigner is None:
+            return [len(detected) - 1 if detected else None]
+        
+        handedness = getattr(results, 'multi_handedness', None) or []
+        hands_found = []
+        for i, hand_landmarks in enumerate(detected):
+            # Centro de la palma (nudillo del dedo medio) y lateralidad según MediaPipe
+            palm = hand_landmarks.landmark[mp_hands.HandLandmark.MIDDLE_FINGER_MCP]
+            label = handedness[i].classification[0].label if i < len(handedness) else None
+            hands_found.append((palm.x, palm.y, label))
+        return self.assigner.assign(hands_found)
+    
+    def classify(self, results, frame_shape):
+        detected = results.multi_hand_landmarks or []
+        
+        # Observación de cada jugador: (información de la mano, movimiento, teclas, índice de la mano)
+        observations = []
+        for controller, index in zip(self.controllers, self._assign(results)):
+            # Variables para el movimiento relativo
+            delta_x, delta_y = 0, 0
+            hand_info = None
+            new_keys = set()
+            
+            if index is not None:
+                # Procesar gestos de la mano del jugador (con un jugador, todas las detectadas)
+                hand_landmarks_list = detected if self.assigner is None else [detected[index]]
+                for hand_landmarks in hand_landmarks_list:
+                    # Obtener información de la mano
+                    hand_info = controller.get_hand_info(hand_landmarks, frame_shape)
+                    
+                    # Calcular movimiento relativo
+                    delta_x, delta_y = controller.calculate_relative_movement(hand_info)
+                    
+                    # Actualizar posición del jugador y obtener nuevas teclas a presionar
+                    movement_keys = controller.update_player_position(delta_x, delta_y)
+                    
+                    # Obtener teclas de gestos y combinar todas las teclas
+                    gesture_keys = controller.process_gestures(hand_info)
+                    new_keys = movement_keys.union(gesture_keys)
+            else:
+                # No hay mano del jugador, restablecer todo excepto su posición virtual
+                controller.prev_hand_center = None
+            
+            observations.append((hand_info, (delta_x, delta_y), new_keys, index))
+        return observations
+    
+    def act(self, observation, now):
+        # Actualizar las teclas presionadas de cada jugador (sin mano se liberan todas)
+        for controller, (_, _, new_keys, _) in zip(self.controllers, observation):
+            controller.update_key_presses(new_keys)
+    
+    def render(self, frame, results, observation, fps):
+        # Dibujar landmarks de las manos sobre una copia de la imagen original
+        if results.multi_hand_landmarks:
+            frame = frame.copy()
+            for hand_landmarks in results.multi_hand_landmarks:
+                mp_drawing.draw_landmarks(
+                    frame,
+                    hand_landmarks,
+                    mp_hands.HAND_CONNECTIONS,
+                    mp_drawing_styles.get_default_hand_landmarks_style(),
+                    mp_drawing_styles.get_default_hand_connections_style())
+        
+        # Interfaz completa del primer jugador con los FPS del bucle
+        hand_info, delta_movement, _, _ = observation[0]
+        self.controller.current_fps = fps
+        self.controller.display_interface(frame, hand_info, delta_movement)
+        
+        # Estado compacto del resto de jugadores y etiqueta sobre cada mano
+        height, width = frame.shape[:2]
+        for controller, (hand_info, _, _, _) in zip(self.controllers[1:], observation[1:]):
+            controller.display_player(frame, hand_info)
+        if self.assigner is not None:
+            for controller, (_, _, _, index) in zip(self.controllers, observation):
+                if index is not None:
+                    wrist = results.multi_hand_landmarks[index].landmark[mp_hands.HandLandmark.WRIST]
+                    cv2.putText(frame, controller.label, (int(wrist.x * width), int(wrist.y * height) + 25),
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.7, PLAYER_COLORS[controller.player], 2)
+        return frame
+    
+    def release(self):
+        # Liberar todas las teclas de todos los jugadores antes de salir
+        for controller in self.controllers:
+            controller.update_key_presses(set())
+
 def show_help():
     """Muestra información de ayuda sobre cómo usar este script"""
     print("""
@@ -738,7 +1096,20 @@ Comandos:
   --play              Iniciar el controlador del juego
   --sensitivity=N     Ajustar sensibilidad (0.5-5.0, por defecto 2.5)
   --smoothing=N       Ajustar suavizado (0.0-1.0, por defecto 0.5)
+  --players=N         Número de jugadores (1 o 2; con 2, una mano por jugador)
   --camera=N          Índice de la cámara a utilizar (por defecto 3)
+  --config=ARCHIVO    Teclas y umbrales del juego (por defecto configs/arcade_1942.json)
+  --headless          Jugar sin ventana ni dibujado (salir con Ctrl+C o ESC/q en la consola)
+  --preview-fps=N     Máximo de FPS de la ventana de vista previa (por defecto 15)
+  --preview-scale=N   Escala de la imagen en la vista previa (por defecto 0.75)
+  --record=NOMBRE     Grabar la sesión de cámara (NOMBRE.avi y NOMBRE.csv)
+  --replay=NOMBRE     Usar una sesión grabada en lugar de la cámara
+  --trace=ARCHIVO     Guardar una traza de Chrome/Perfetto con el tiempo de cada etapa
+  --metrics-port=N    Publicar métricas de Prometheus en http://127.0.0.1:N/metrics
+  --memprofile=N      Medir la memoria asignada por frame (instantánea cada N frames)
+  --pacing            Analizar el ritmo de frames (cámara frente a CPU) al salir
+  --autotune=FPS      Ajustar captura y escala de inferencia para llegar a FPS (se guarda por cámara)
+  --flow=K            Inferir como mucho cada K frames y propagar la mano con flujo óptico
   --help              Mostrar este mensaje de ayuda
 
 Características:
@@ -771,24 +1142,33 @@ Ejemplo:
 
 def main():
     """Función principal para analizar argumentos y ejecutar la función apropiada"""
-    parser = argparse.ArgumentParser(description='Arcade 1942 Mouse-Like Controller')
+    parser = create_parser('Arcade 1942 Mouse-Like Controller', default_camera=DEFAULT_CAMERA_INDEX)
     parser.add_argument('--test', action='store_true', help='Probar detección de manos y gestos')
-    parser.add_argument('--play', action='store_true', help='Iniciar el controlador del juego')
-    parser.add_argument('--sensitivity', type=float, default=2.5, 
-                        help='Ajustar sensibilidad (0.5-5.0, por defecto 2.5)')
-    parser.add_argument('--smoothing', type=float, default=0.5, 
-                        help='Ajustar suavizado (0.0-1.0, por defecto 0.5)')
-    parser.add_argument('--camera', type=int, default=3,
-                        help='Índice de la cámara a utilizar (por defecto 3)')
+    parser.add_argument('--sensitivity', type=float, 
+                        help='Ajustar sensibilidad (0.5-5.0, por defecto la de la configuración, 2.5)')
+    parser.add_argument('--players', type=int, default=1, choices=range(1, MAX_PLAYERS + 1),
+                        help='Número de jugadores (2: cada uno controla su avión con una mano)')
+    parser.add_argument('--smoothing', type=float, 
+                        help='Ajustar suavizado (0.0-1.0, por defecto el de la configuración, 0.5)')
     
     # Analizar argumentos
     args = parser.parse_args()
     
     # Mostrar ayuda si no se proporcionan argumentos
-    if len(sys.argv) == 1:
+    if no_arguments():
         show_help()
         return
     
+    # Teclas y umbrales del juego (se releen en cada lanzamiento para recoger los cambios)
+    try:
+        configure(args.config)
+    except ValueError as e:
+        print(f"Error en la configuración: {e}")
+        return
+    
+    # Trazas, métricas, memoria y ritmo de frames si se piden
+    start_instrumentation(args, Arcade1942Plugin.name, sys.modules[__name__])
+    
     # Inicializar controlador
     controller = HandController()
     
@@ -797,14 +1177,22 @@ def main():
         controller.camera_index = args.camera
     
     # Ajustar sensibilidad y suavizado si se especifican
-    controller.adjust_sensitivity(args.sensitivity)
-    controller.adjust_smoothing(args.smoothing)
+    if args.sensitivity is not None:
+        controller.adjust_sensitivity(args.sensitivity)
+    if args.smoothing is not None:
+        controller.adjust_smoothing(args.smoothing)
     
     # Ejecutar la función apropiada
     if args.test:
         controller.test_detection()
     elif args.play:
-        controller.play_game()
+        # El modo headless solo aplica al controlador del juego
+        controller.headless = args.headless
+        controller.preview_fps = args.preview_fps
+        controller.preview_scale = args.preview_scale
+        controller.record_path = args.record
+        controller.replay_path = args.replay
+        controller.play_game(players=args.players)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
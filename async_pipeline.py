@@ -0,0 +1,318 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Bucle de control con asyncio
+
+Variante de controller_pipeline.run_pipeline en la que cada etapa es una tarea de
+asyncio y las etapas se comunican por colas acotadas:
+
+    captura -> inferencia -> clasificación -> envío de teclas
+                                           -> vista previa
+
+- Captura: read() bloquea hasta que la cámara entrega un frame, así que se hace en
+  su propio hilo; si la cámara deja de responder durante CAPTURE_TIMEOUT el bucle
+  termina con un mensaje en lugar de quedarse colgado.
+- Inferencia: el preproceso y el modelo se ejecutan en otro hilo (siempre el mismo,
+  los grafos de MediaPipe no admiten llamadas simultáneas).
+- Clasificación: en el bucle de eventos (es rápida y mantiene el estado del juego).
+- Envío de teclas: en un tercer hilo, porque pyautogui espera tras cada tecla.
+- Vista previa: recibe la última observación; si va atrasada se descarta el frame,
+  el control nunca espera al dibujado.
+
+Las colas entre captura, inferencia, clasificación y envío de teclas tienen tamaño
+PIPELINE_QUEUE_SIZE: si una etapa se atrasa, las anteriores esperan (contrapresión)
+en lugar de acumular frames viejos. La salida (ESC, Ctrl+C, consola) cancela todas
+las tareas a la vez, y un canal lateral (métricas, un socket de control remoto...)
+es una tarea más que se añade con add_task() sin tocar el bucle de frames.
+
+Uso:
+    pipeline = AsyncPipeline(SubwaySurfersPlugin(), camera_index=0)
+    pipeline.add_task(mi_canal_lateral)   # async def mi_canal_lateral(pipeline): ...
+    pipeline.run()
+"""
+
+import time
+import asyncio
+import threading
+import traceback
+import webbrowser
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+
+import cv2
+
+from controller_runtime import (install_exit_handlers, exit_requested,
+                                DEFAULT_PREVIEW_FPS, DEFAULT_PREVIEW_SCALE)
+from controller_pipeline import FpsMeter, find_camera
+from preview_window import PreviewWindow
+from controller_ipc import report_frame
+from session_recorder import open_capture
+from stage_profiler import profiler
+from metrics_server import metrics
+from alloc_tracker import memory_tracker
+from frame_pacing import pacing_analyzer
+
+# Elementos que admite cada cola entre etapas antes de frenar a la anterior
+PIPELINE_QUEUE_SIZE = 2
+
+# Tiempo máximo esperando un frame de la cámara (segundos)
+CAPTURE_TIMEOUT = 5.0
+
+# Cada cuánto se revisa si se ha solicitado la salida (segundos)
+EXIT_POLL = 0.05
+
+# Marca de fin de la secuencia de frames en las colas
+_END = None
+
+
+class AsyncPipeline:
+    """Bucle de control de un juego como tareas de asyncio conectadas por colas acotadas"""
+
+    def __init__(self, plugin, camera_index=None, headless=False,
+                 preview_fps=DEFAULT_PREVIEW_FPS, preview_scale=DEFAULT_PREVIEW_SCALE,
+                 record=None, replay=None):
+        """
+        Args:
+            plugin: GamePlugin del juego
+            camera_index: Índice de la cámara (None para buscarla)
+            headless: Si es True no se dibuja nada ni se abre ventana
+            preview_fps: Máximo de FPS de la ventana de vista previa
+            preview_scale: Escala de la imagen en la vista previa
+            record: Nombre base donde grabar la sesión de cámara (None para no grabar)
+            replay: Nombre base de una sesión grabada a usar en lugar de la cámara
+        """
+        self.plugin = plugin
+        self.camera_index = camera_index
+        self.headless = headless
+        self.preview_fps = preview_fps
+        self.preview_scale = preview_scale
+        self.record = record
+        self.replay = replay
+
+        self.camera = None
+        self.preview = None
+        self._capture_thread = None
+        self._stop_event = threading.Event()
+        self.fps_meter = FpsMeter()
+        self.frame_count = 0
+        self._side_tasks = []
+
+    def add_task(self, task):
+        """
+        Añade un canal lateral que corre junto al bucle de frames.
+
+        Args:
+            task: Función async que recibe el AsyncPipeline; se cancela al salir
+        """
+        self._side_tasks.append(task)
+        return self
+
+    def _open_camera(self):
+        """Abre la cámara o la sesión grabada con la resolución del juego (None si no se pudo)"""
+        if self.camera_index is None and not self.replay:
+            self.camera_index = find_camera()
+        if self.camera_index == -1:
+            print("Error: No se pudo acceder a ninguna cámara.")
+            return None
+
+        camera = pacing_analyzer.wrap(open_capture(self.camera_index, record=self.record, replay=self.replay))
+        width, height = self.plugin.capture_size
+        camera.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        camera.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        if self.plugin.capture_fps:
+            camera.set(cv2.CAP_PROP_FPS, self.plugin.capture_fps)
+
+        if not camera.isOpened():
+            print(f"Error: No se pudo abrir la cámara con índice {self.camera_index}")
+            camera.release()
+            return None
+        metrics.set_source_fps(camera.get(cv2.CAP_PROP_FPS))
+        return camera
+
+    def _read(self):
+        """Lee y voltea un frame (en el hilo de captura)"""
+        start = profiler.now()
+        ok, frame = self.camera.read()
+        profiler.record('capture', start)
+        if not ok:
+            return None
+        return cv2.flip(frame, 1)
+
+    def _infer(self, frame):
+        """Preprocesa el frame y ejecuta el modelo (en el hilo de inferencia)"""
+        start = profiler.now()
+        results = self.plugin.infer(self.plugin.preprocess(frame))
+        profiler.record('inference', start)
+        return results
+
+    def _act(self, observation, now):
+        """Envía las teclas de una observación (en el hilo de envío)"""
+        start = profiler.now()
+        self.plugin.act(observation, now)
+        profiler.record('injection', start)
+
+    def _capture(self, loop, output):
+        """
+        Hilo de captura: lee frames y los pone en la cola esperando a que haya sitio.
+
+        Es un hilo daemon y no un executor para que una cámara colgada en read() no
+        impida salir del proceso.
+        """
+        try:
+            while not self._stop_event.is_set():
+                frame = self._read()
+                if frame is None:
+                    print("Error: No se pudo leer un fotograma de la cámara")
+                # Esperar sitio en la cola (contrapresión) o hasta que el bucle se cancele
+                asyncio.run_coroutine_threadsafe(output.put(frame if frame is not None else _END), loop).result()
+                if frame is None:
+                    return
+        except (CancelledError, RuntimeError):
+            # El bucle de eventos se canceló o se cerró mientras se esperaba sitio en la cola
+            pass
+
+    # Al acabarse los frames cada etapa pasa _END a la siguiente para que vacíe su cola y termine;
+    # al cancelar no hace falta (todas las tareas se cancelan a la vez)
+
+    async def _inference_task(self, loop, executor, source, output):
+        while True:
+            try:
+                frame = await asyncio.wait_for(source.get(), CAPTURE_TIMEOUT)
+            except asyncio.TimeoutError:
+                print(f"Error: La cámara no entregó ningún frame en {CAPTURE_TIMEOUT:.0f} s")
+                break
+            if frame is _END:
+                break
+            results = await loop.run_in_executor(executor, self._infer, frame)
+            await output.put((frame, results))
+        await output.put(_END)
+
+    async def _classification_task(self, source, output, preview_queue):
+        while (item := await source.get()) is not _END:
+            frame, results = item
+            start = profiler.now()
+            observation = self.plugin.classify(results, frame.shape)
+            profiler.record('classification', start)
+            self.fps_meter.tick()
+            await output.put(observation)
+
+            self.frame_count += 1
+            # Contar el frame para las estadísticas del menú, las métricas y la memoria
+            report_frame()
+            metrics.observe_frame(detected=self.plugin.detected(results))
+            memory_tracker.frame()
+
+            # La vista previa solo recibe el frame si lo quiere y tiene sitio (nunca frena el control)
+            if preview_queue is not None and not preview_queue.full() and self.preview.wants_frame():
+                preview_queue.put_nowait((frame, results, observation))
+        await output.put(_END)
+        if preview_queue is not None:
+            await preview_queue.put(_END)
+
+    async def _injection_task(self, loop, executor, source):
+        while (observation := await source.get()) is not _END:
+            await loop.run_in_executor(executor, self._act, observation, time.time())
+
+    async def _preview_task(self, source):
+        while (item := await source.get()) is not _END:
+            frame, results, observation = item
+            start = profiler.now()
+            frame = self.plugin.render(frame, results, observation, self.fps_meter.fps)
+            profiler.record('drawing', start)
+            # Entregar el frame a la vista previa (ESC en la ventana solicita la salida)
+            self.preview.submit(frame)
+
+    async def _exit_task(self):
+        while not exit_requested(check_console=self.headless):
+            await asyncio.sleep(EXIT_POLL)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        frames = asyncio.Queue(PIPELINE_QUEUE_SIZE)
+        results = asyncio.Queue(PIPELINE_QUEUE_SIZE)
+        observations = asyncio.Queue(PIPELINE_QUEUE_SIZE)
+        preview_queue = asyncio.Queue(1) if self.preview is not None else None
+
+        executors = [ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+                     for name in ('inferencia', 'teclas')]
+        inference_executor, injection_executor = executors
+        self._capture_thread = threading.Thread(target=self._capture, args=(loop, frames),
+                                                name='captura', daemon=True)
+        self._capture_thread.start()
+        pipeline = [
+            asyncio.create_task(self._inference_task(loop, inference_executor, frames, results)),
+            asyncio.create_task(self._classification_task(results, observations, preview_queue)),
+            asyncio.create_task(self._injection_task(loop, injection_executor, observations)),
+        ]
+        if preview_queue is not None:
+            pipeline.append(asyncio.create_task(self._preview_task(preview_queue)))
+        others = [asyncio.create_task(self._exit_task())]
+        others += [asyncio.create_task(task(self)) for task in self._side_tasks]
+
+        stages = asyncio.gather(*pipeline)
+        try:
+            # Termina cuando se acaban los frames (todas las etapas vacían sus colas) o se pide la salida
+            done, _ = await asyncio.wait([stages, others[0]], return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if not task.cancelled() and task.exception() is not None:
+                    raise task.exception()
+        finally:
+            self._stop_event.set()
+            for task in [stages] + pipeline + others:
+                task.cancel()
+            await asyncio.gather(stages, *pipeline, *others, return_exceptions=True)
+            # Esperar a que terminen la inferencia y la tecla en curso antes de liberar nada
+            for executor in executors:
+                executor.shutdown(wait=True)
+
+    def run(self):
+        """Ejecuta el bucle hasta que se acaban los frames o se solicita la salida"""
+        try:
+            if self.plugin.url:
+                print(f"Abriendo {self.plugin.title} en el navegador...")
+                webbrowser.open(self.plugin.url)
+
+            self.camera = self._open_camera()
+            if self.camera is None:
+                return
+
+            install_exit_handlers()
+
+            # Crear la ventana en su propio hilo (no hay ventana en modo headless)
+            if not self.headless:
+                self.preview = PreviewWindow(self.plugin.window_title, max_fps=self.preview_fps,
+                                             scale=self.preview_scale).start()
+
+            self.plugin.start()
+            for line in self.plugin.instructions(self.headless):
+                print(line)
+
+            start_time = time.time()
+            asyncio.run(self._run())
+
+            elapsed = time.time() - start_time
+            if self.frame_count and elapsed > 0:
+                print(f"Frames procesados: {self.frame_count} - FPS medio: {self.frame_count / elapsed:.1f}")
+
+        except Exception as e:
+            print(f"Error durante el juego: {e}")
+            traceback.print_exc()
+
+        finally:
+            # Asegurar que se sueltan todas las teclas y se liberan la ventana y la cámara
+            self.plugin.release()
+            if self.preview is not None:
+                self.preview.stop()
+            # La cámara se libera cuando el hilo de captura termina su lectura (si no está colgado)
+            if self._capture_thread is not None:
+                self._capture_thread.join(timeout=2.0)
+            if self.camera is not None:
+                self.camera.release()
+
+
+def run_async_pipeline(plugin, camera_index=None, headless=False,
+                       preview_fps=DEFAULT_PREVIEW_FPS, preview_scale=DEFAULT_PREVIEW_SCALE,
+                       record=None, replay=None):
+    """Ejecuta el bucle asyncio de un juego (mismos argumentos que controller_pipeline.run_pipeline)"""
+    AsyncPipeline(plugin, camera_index=camera_index, headless=headless, preview_fps=preview_fps,
+                  preview_scale=preview_scale, record=record, replay=replay).run()
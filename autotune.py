@@ -0,0 +1,351 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Ajuste automático de la resolución de captura y de la escala de inferencia
+
+Cada juego fija a mano su resolución (480x320 el 1942, 640x480 Geometry Dash y
+Subway Surfers) y cuánto reduce el frame antes del modelo (0.5 las manos, nada la
+pose), sin tener en cuenta la máquina. Con --autotune FPS el bucle se ajusta solo:
+
+- Los ajustes posibles forman una escalera ordenada de más caro a más barato:
+  primero se baja la escala de inferencia (el frame se reduce antes del modelo)
+  con la captura a la resolución del juego, y solo después se pasa a capturar a
+  la mitad, así que la cámara cambia de resolución una sola vez al bajar. Se
+  empieza por el ajuste guardado para esta máquina, juego y cámara, o por el del
+  juego.
+- Cada WINDOW_FRAMES frames se miden los FPS del bucle, la latencia de cada frame
+  (del frame ya leído al envío de teclas, sin la espera a la cámara) y la
+  estabilidad de la detección.
+- Si no se llega al objetivo y el bucle está limitado por el cómputo (no por la
+  cámara), se baja un peldaño. Si sobra margen (la latencia, escalada por los
+  píxeles que recibiría el modelo, cabe en el periodo objetivo), se prueba el
+  peldaño de arriba; si con él no se llega, no se vuelve a probar.
+- Si en un peldaño la detección parpadea (se pierde la mano o la persona con
+  alguien delante), ese peldaño se descarta y se sube uno.
+- Cuando el ajuste se mantiene SETTLE_WINDOWS ventanas seguidas se guarda en
+  .cache/autotune.json, por máquina, juego y cámara (si ningún peldaño estable
+  llega al objetivo, se guarda el más rápido de ellos).
+
+Mientras se graba la sesión (--record) o se reproduce una (--replay) la captura se
+queda en la resolución del juego y solo se ajusta la escala de inferencia: el vídeo
+de la sesión tiene un único tamaño de frame.
+
+Una captura más pequeña que la del juego se amplía a la resolución del juego nada
+más leerla, así que los umbrales en píxeles de los gestos y el dibujado no cambian
+con el ajuste; solo cambia lo que cuesta capturar y lo que recibe el modelo.
+
+Uso:
+    from autotune import autotuner, start_autotune
+
+    start_autotune(30)
+    autotuner.attach(plugin, camera, camera_index)
+    while ...:
+        ok, frame = camera.read()
+        started = time.perf_counter()
+        frame = autotuner.fit(frame)
+        ...
+        autotuner.observe(started, detected)
+"""
+
+import os
+import json
+import atexit
+import platform
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+# Archivo donde se guarda el ajuste de cada máquina, juego y cámara (ignorado por git)
+AUTOTUNE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'autotune.json')
+
+# Escalas de la captura respecto a la resolución del juego
+CAPTURE_SCALES = (1.0, 0.5)
+
+# Escalas de inferencia posibles (respecto a la resolución del juego)
+INFERENCE_SCALES = (1.0, 0.75, 0.5, 0.375, 0.25)
+
+# Frames de cada ventana de medida
+WINDOW_FRAMES = 45
+
+# Frames que se descartan tras cambiar de ajuste (la cámara puede tardar en aplicar la resolución)
+WARMUP_FRAMES = 5
+
+# Fracción del objetivo por debajo de la cual se baja un peldaño
+FPS_TOLERANCE = 0.1
+
+# Fracción del periodo objetivo que puede ocupar la latencia prevista para probar el peldaño de arriba
+UPGRADE_BUDGET = 0.8
+
+# Fracción del intervalo entre frames ocupada por el cómputo a partir de la cual manda la CPU
+CPU_BOUND_FRACTION = 0.8
+
+# Fracción mínima de frames con detección para evaluar la estabilidad (hay alguien delante)
+MIN_PRESENCE = 0.3
+
+# Pérdidas de la detección por frame a partir de las cuales un peldaño es inestable
+MAX_FLICKER = 0.05
+
+# Ventanas seguidas sin cambios para dar el ajuste por bueno y guardarlo
+SETTLE_WINDOWS = 3
+
+
+def _even(value):
+    """Redondea una dimensión a un número par (las cámaras no suelen admitir impares)"""
+    return max(2, int(round(value / 2.0)) * 2)
+
+
+def machine_key(game, camera_index):
+    """Clave del ajuste guardado: máquina, juego y cámara"""
+    return f"{platform.node() or 'local'}|{game}|camera {camera_index}"
+
+
+def build_ladder(capture_size, default_scale, capture_scales=CAPTURE_SCALES):
+    """
+    Escalera de ajustes ordenada de más caro a más barato.
+
+    Con cada resolución de captura se recorren las escalas de inferencia hasta la
+    escala de la captura siguiente, y después se cambia de captura: la cámara no
+    cambia de resolución en cada peldaño.
+
+    Args:
+        capture_size: Resolución (ancho, alto) del juego
+        default_scale: Escala de inferencia del juego
+        capture_scales: Escalas de la captura respecto a la resolución del juego
+
+    Returns:
+        Lista de (resolución de captura, escala de inferencia)
+    """
+    width, height = capture_size
+    scales = sorted(set(INFERENCE_SCALES) | {default_scale}, reverse=True)
+    capture_scales = sorted(capture_scales, reverse=True)
+    ladder = []
+    for index, capture_scale in enumerate(capture_scales):
+        capture = (_even(width * capture_scale), _even(height * capture_scale))
+        # Por debajo de la escala de la captura siguiente es más barato capturar menos
+        floor = capture_scales[index + 1] if index + 1 < len(capture_scales) else 0.0
+        for scale in scales:
+            # Capturar menos de lo que recibe el modelo solo empeora la imagen
+            if floor <= scale <= capture_scale:
+                ladder.append((capture, scale))
+    return ladder
+
+
+def load_settings(path=AUTOTUNE_PATH):
+    """Ajustes guardados ({clave: ajuste}); vacío si no hay archivo o está dañado"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_setting(key, setting, path=AUTOTUNE_PATH):
+    """Guarda el ajuste de una clave conservando los demás"""
+    data = load_settings(path)
+    data[key] = setting
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Escribir en un archivo temporal y renombrarlo para no dejar JSON a medio escribir
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.replace(temp_path, path)
+    except OSError as e:
+        print(f"Autoajuste: no se pudo guardar {path}: {e}")
+
+
+class AutoTuner:
+    """Elige en marcha la resolución de captura y la escala de inferencia para llegar a unos FPS"""
+
+    def __init__(self):
+        self.enabled = False
+        self.target_fps = None
+        self.ladder = []
+        self.level = 0
+        self.key = None
+        self.history = []   # (frame, ajuste, motivo) de cada cambio
+
+        self._plugin = None
+        self._camera = None
+        self._nominal = None
+        self._frames = 0
+        self._warmup = 0
+        self._window = []   # (instante, latencia, detectado) de los frames de la ventana
+        self._too_slow = set()
+        self._unstable = set()
+        self._settled = 0
+        self._saved_level = None
+        self._last = None   # Medidas de la última ventana
+
+    def enable(self, target_fps):
+        """Activa el ajuste para el bucle que se inicie a partir de ahora"""
+        self.enabled = True
+        self.target_fps = float(target_fps)
+
+    def attach(self, plugin, camera, camera_index, replay=None, record=None):
+        """
+        Prepara el ajuste de un juego y aplica el punto de partida.
+
+        Args:
+            plugin: GamePlugin del juego (su capture_size es la resolución de referencia)
+            camera: Captura ya abierta
+            camera_index: Índice de la cámara (para la clave del ajuste guardado)
+            replay: Sesión reproducida (el ajuste no se guarda: no es la cámara)
+            record: Sesión que se graba (la resolución de captura no cambia)
+        """
+        if not self.enabled:
+            return
+        self._plugin = plugin
+        self._camera = camera
+        self._nominal = tuple(plugin.capture_size)
+        # Un solo tamaño de frame en la sesión grabada o reproducida: solo se ajusta la escala de inferencia
+        capture_scales = (1.0,) if record or replay else CAPTURE_SCALES
+        self.ladder = build_ladder(self._nominal, plugin.inference_scale, capture_scales)
+        width, height = self._nominal
+        self.level = self.ladder.index(((_even(width), _even(height)), plugin.inference_scale))
+        self.key = None if replay else machine_key(plugin.name, camera_index)
+
+        # Empezar por el ajuste guardado si se buscaba el mismo objetivo
+        saved = load_settings().get(self.key) if self.key else None
+        if saved and saved.get('target_fps') == self.target_fps:
+            setting = (tuple(saved.get('capture', ())), saved.get('scale'))
+            if setting in self.ladder:
+                self.level = self._saved_level = self.ladder.index(setting)
+        self._apply('inicio' if self._saved_level is None else 'guardado')
+
+    def _apply(self, reason):
+        """Aplica el ajuste del peldaño actual a la cámara y al juego"""
+        (width, height), scale = self.ladder[self.level]
+        self._plugin.inference_scale = scale
+        self._camera.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self._camera.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        self._window = []
+        self._warmup = WARMUP_FRAMES
+        self._settled = 0
+        self.history.append((self._frames, self.ladder[self.level], reason))
+        print(f"Autoajuste: captura {width}x{height}, inferencia x{scale:g} ({reason})")
+
+    def fit(self, frame):
+        """Lleva el frame capturado a la resolución del juego (no hace nada si ya la tiene)"""
+        if not self.enabled or self._nominal is None:
+            return frame
+        width, height = self._nominal
+        if frame.shape[1] == width and frame.shape[0] == height:
+            return frame
+        return cv2.resize(frame, (width, height), interpolation=cv2.INTER_LINEAR)
+
+    def observe(self, started, detected):
+        """
+        Registra un frame del bucle y, al completar una ventana, decide si cambiar de ajuste.
+
+        Args:
+            started: Instante (perf_counter) en que el bucle tuvo el frame leído de la cámara
+            detected: Si el modelo encontró una mano o una persona
+        """
+        if not self.enabled or self._plugin is None:
+            return
+        self._frames += 1
+        if self._warmup > 0:
+            self._warmup -= 1
+            return
+        now = time.perf_counter()
+        self._window.append((now, now - started, bool(detected)))
+        if len(self._window) >= WINDOW_FRAMES:
+            self._evaluate()
+            self._window = []
+
+    def _evaluate(self):
+        """Decide con las medidas de la ventana si bajar, subir o mantener el peldaño"""
+        times, latencies, detections = (np.asarray(column) for column in zip(*self._window))
+        elapsed = times[-1] - times[0]
+        if elapsed <= 0:
+            return
+        fps = (len(times) - 1) / elapsed
+        latency = float(latencies.mean())
+        presence = float(detections.mean())
+        flicker = float(np.sum(detections[:-1] & ~detections[1:])) / len(detections)
+        self._last = {'fps': fps, 'latency_ms': 1000 * latency, 'presence': presence, 'flicker': flicker}
+
+        period = 1.0 / self.target_fps
+        cpu_bound = latency >= CPU_BOUND_FRACTION * elapsed / (len(times) - 1)
+        slow = fps < self.target_fps * (1.0 - FPS_TOLERANCE)
+
+        # Una detección que parpadea con alguien delante: el ajuste es demasiado pobre
+        if presence >= MIN_PRESENCE and flicker > MAX_FLICKER and self.level > 0:
+            self._unstable.add(self.level)
+            self.level -= 1
+            self._apply(f"detección inestable, {flicker:.2f} pérdidas/frame")
+        elif slow and cpu_bound and self.level + 1 < len(self.ladder) and self.level + 1 not in self._unstable:
+            self._too_slow.add(self.level)
+            self.level += 1
+            self._apply(f"{fps:.1f} FPS, latencia {1000 * latency:.0f} ms")
+        elif (not slow and self.level > 0 and self.level - 1 not in self._too_slow
+              and self.level - 1 not in self._unstable
+              and self._predicted_latency(latency, self.level - 1) < UPGRADE_BUDGET * period):
+            self.level -= 1
+            self._apply(f"margen: latencia {1000 * latency:.0f} ms de {1000 * period:.0f} ms")
+        else:
+            self._settled += 1
+            if self._settled == SETTLE_WINDOWS:
+                self._save(fps, latency)
+
+    def _predicted_latency(self, latency, level):
+        """Latencia prevista en otro peldaño, suponiendo que crece con los píxeles que recibe el modelo"""
+        scale = self.ladder[self.level][1]
+        return latency * (self.ladder[level][1] / scale) ** 2
+
+    def _save(self, fps, latency):
+        """Guarda el ajuste actual para esta máquina, juego y cámara"""
+        if self.key is None or self.level == self._saved_level:
+            return
+        (width, height), scale = self.ladder[self.level]
+        save_setting(self.key, {
+            'capture': [width, height],
+            'scale': scale,
+            'target_fps': self.target_fps,
+            'fps': round(fps, 1),
+            'latency_ms': round(1000 * latency, 1),
+            'updated': datetime.now().isoformat(timespec='seconds'),
+        })
+        self._saved_level = self.level
+        print(f"Autoajuste: captura {width}x{height}, inferencia x{scale:g} guardado para {self.key}")
+
+    def print_report(self):
+        """Imprime el ajuste final y sus cambios"""
+        if not self.ladder:
+            return
+        (width, height), scale = self.ladder[self.level]
+        print(f"\nAutoajuste (objetivo {self.target_fps:g} FPS): captura {width}x{height}, inferencia x{scale:g}")
+        if self._last:
+            print(f"  Última ventana: {self._last['fps']:.1f} FPS, latencia media {self._last['latency_ms']:.1f} ms,"
+                  f" detección {100 * self._last['presence']:.0f}% de los frames")
+        if self.key is None:
+            status = "sin guardar (sesión reproducida)"
+        elif self._saved_level == self.level:
+            status = f"guardado en {AUTOTUNE_PATH}"
+        else:
+            status = "sin guardar (no se estabilizó)"
+        print(f"  Cambios: {len(self.history) - 1} - {status}")
+        for frame, ((w, h), s), reason in self.history[1:]:
+            print(f"    frame {frame}: captura {w}x{h}, inferencia x{s:g} ({reason})")
+
+
+# Ajuste compartido por el bucle del controlador
+autotuner = AutoTuner()
+
+
+def start_autotune(target_fps):
+    """
+    Activa el ajuste automático y programa el informe al terminar el proceso.
+
+    Args:
+        target_fps: FPS objetivo (None o 0 para no hacer nada)
+    """
+    if not target_fps:
+        return
+    autotuner.enable(target_fps)
+    atexit.register(autotuner.print_report)
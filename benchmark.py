@@ -0,0 +1,454 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark reproducible de los controladores de juegos
+
+Pasa una secuencia de frames (un clip grabado o frames sintéticos) por las
+mismas funciones que usan los bucles de los tres controladores, sin cámara, sin
+ventanas y con un backend de entrada nulo en lugar de pyautogui, y mide el
+tiempo de cada etapa:
+
+- Geometry Dash: process_frame, detect_hand_landmarks, detect_hand_gesture y JumpTrigger
+- Arcade 1942: HandController.detect_hands, get_hand_info, movimiento,
+  process_gestures y update_key_presses
+- Subway Surfers: detectPose y GameState.update (clasificación de la pose y teclas)
+
+El resultado es un JSON con el rendimiento (frames por segundo) y las latencias
+p50/p95/p99 de cada etapa, para comparar antes y después de cada optimización.
+
+Uso:
+    python benchmark.py                           # Frames sintéticos, todos los juegos
+    python benchmark.py --video clip.mp4          # Clip grabado
+    python benchmark.py --session sesion          # Sesión grabada con --record
+    python benchmark.py --game subway_surfers --frames 500 --output resultados.json
+    python benchmark.py --frames 3000 --memprofile 100  # Memoria por frame y crecimiento
+
+Los frames sintéticos no contienen manos ni personas, por lo que miden sobre todo
+el coste de la detección sin resultados; para medir el camino completo usa un clip
+grabado (el JSON incluye la tasa de detección para interpretar los números).
+
+Con cualquier fuente, también --session, los frames se cargan en memoria y se pasan
+tan rápido como se puede: el benchmark mide el rendimiento máximo y el coste de
+cada etapa, no el ritmo de la cámara. Los instantes grabados de una sesión no se
+reproducen; solo se informa de los FPS a los que se grabó (source.recorded_fps)
+para compararlos con throughput_fps. Para ver el bucle con el ritmo de la
+grabación usa --replay en el controlador (por ejemplo con --pacing).
+"""
+
+import os
+import sys
+import cv2
+import json
+import time
+import argparse
+import platform
+from collections import Counter
+from contextlib import contextmanager, redirect_stdout
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from session_recorder import session_paths, ReplayCapture
+from alloc_tracker import memory_tracker
+
+GAMES = ('geometry_dash', 'arcade_1942', 'subway_surfers')
+
+# Percentiles incluidos en el informe
+PERCENTILES = (50, 95, 99)
+
+
+class NullInput:
+    """Sustituto de pyautogui que no envía eventos y solo cuenta las llamadas"""
+
+    def __init__(self, screen_size=(1920, 1080)):
+        self.calls = Counter()
+        self.screen_size = screen_size
+
+    def size(self):
+        return self.screen_size
+
+    def __getattr__(self, name):
+        # press, keyDown, keyUp, click, moveTo...: se cuentan y no hacen nada
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        def record(*args, **kwargs):
+            self.calls[name] += 1
+        return record
+
+
+@contextmanager
+def null_input(module, backend=None):
+    """Sustituye temporalmente el pyautogui de un módulo de controlador por un NullInput"""
+    original = module.pyautogui
+    backend = backend if backend is not None else NullInput()
+    module.pyautogui = backend
+    try:
+        yield backend
+    finally:
+        module.pyautogui = original
+
+
+class StageTimer:
+    """Acumula las duraciones de cada etapa del pipeline"""
+
+    def __init__(self):
+        self.samples = {}
+        self._last = None
+        self._recording = True
+
+    def start(self):
+        """Marca el inicio de un frame"""
+        self._last = time.perf_counter()
+
+    def lap(self, stage):
+        """Registra el tiempo transcurrido desde la marca anterior como duración de la etapa"""
+        now = time.perf_counter()
+        if self._recording:
+            self.samples.setdefault(stage, []).append(now - self._last)
+        self._last = now
+
+    def recording(self, enabled):
+        """Activa o desactiva el registro (para los frames de calentamiento)"""
+        self._recording = enabled
+
+    def summary(self):
+        """Devuelve las estadísticas de cada etapa en milisegundos"""
+        stages = {}
+        for stage, samples in self.samples.items():
+            values = np.asarray(samples) * 1000.0
+            stats = {f'p{p}_ms': round(float(np.percentile(values, p)), 3) for p in PERCENTILES}
+            stats['mean_ms'] = round(float(values.mean()), 3)
+            stats['max_ms'] = round(float(values.max()), 3)
+            stages[stage] = stats
+        return stages
+
+
+def synthetic_frames(count, width=640, height=480, seed=0):
+    """
+    Genera frames sintéticos reproducibles (fondo con textura y formas en movimiento).
+
+    Args:
+        count: Número de frames
+        width, height: Resolución de los frames
+        seed: Semilla del generador aleatorio
+
+    Returns:
+        Lista de frames BGR
+    """
+    rng = np.random.default_rng(seed)
+    background = cv2.GaussianBlur(rng.integers(0, 256, (height, width, 3), dtype=np.uint8), (0, 0), 3)
+    frames = []
+    for i in range(count):
+        frame = np.roll(background, i * 4, axis=1)
+        center = (int(width / 2 + width / 4 * np.sin(i / 15)), int(height / 2 + height / 4 * np.cos(i / 20)))
+        cv2.circle(frame, center, 60, (80, 140, 200), -1)
+        cv2.rectangle(frame, (center[0] - 30, center[1] + 60), (center[0] + 30, center[1] + 160),
+                      (60, 110, 170), -1)
+        frames.append(frame)
+    return frames
+
+
+def video_frames(path, count, width=None, height=None):
+    """
+    Carga en memoria los frames de un clip (repitiéndolo si es más corto que count).
+
+    La decodificación se hace antes de medir para que no cuente en las etapas.
+
+    Args:
+        path: Ruta del clip de vídeo
+        count: Número de frames a devolver
+        width, height: Resolución a la que se redimensionan los frames (opcional)
+
+    Returns:
+        Lista de frames BGR
+    """
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise IOError(f"No se pudo abrir el vídeo: {path}")
+
+    clip = []
+    while len(clip) < count:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        if width and height:
+            frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        clip.append(frame)
+    capture.release()
+
+    if not clip:
+        raise IOError(f"El vídeo no contiene frames: {path}")
+    return [clip[i % len(clip)] for i in range(count)]
+
+
+def bench_geometry_dash(frames, warmup):
+    """Pipeline de play_geometry_dash en modo headless"""
+    import geometry_dash_hand_controller as gd
+
+    timer = StageTimer()
+    detections = 0
+    with null_input(gd) as backend:
+        jump_trigger = gd.JumpTrigger()
+
+        loop_start = None
+        for i, frame in enumerate(frames):
+            if i == warmup:
+                loop_start = time.perf_counter()
+            timer.recording(i >= warmup)
+            timer.start()
+
+            frame = cv2.flip(frame, 1)
+            processed_frame = gd.process_frame(frame)
+            timer.lap('process_frame')
+
+            results = gd.detect_hand_landmarks(processed_frame)
+            timer.lap('detect_hand_landmarks')
+
+            gesture, hand_closed, landmarks_px = gd.detect_hand_gesture(results, processed_frame.shape)
+            timer.lap('detect_hand_gesture')
+
+            jump_trigger.update(gesture, time.time())
+            timer.lap('act')
+            if i >= warmup:
+                memory_tracker.frame()
+
+            if i >= warmup and landmarks_px is not None:
+                detections += 1
+
+        elapsed = time.perf_counter() - loop_start
+    return timer, detections, elapsed, backend.calls
+
+
+def bench_arcade_1942(frames, warmup):
+    """Pipeline de HandController.play_game en modo headless"""
+    import arcade_1942_mouse_controller as arcade
+
+    timer = StageTimer()
+    detections = 0
+    with null_input(arcade) as backend:
+        controller = arcade.HandController()
+
+        loop_start = None
+        for i, frame in enumerate(frames):
+            if i == warmup:
+                loop_start = time.perf_counter()
+            timer.recording(i >= warmup)
+            timer.start()
+
+            frame = cv2.flip(frame, 1)
+            frame, results = controller.detect_hands(frame, draw=False)
+            timer.lap('detect_hands')
+
+            if results.multi_hand_landmarks:
+                if i >= warmup:
+                    detections += 1
+                for hand_landmarks in results.multi_hand_landmarks:
+                    hand_info = controller.get_hand_info(hand_landmarks, frame.shape)
+                    timer.lap('get_hand_info')
+
+                    delta_x, delta_y = controller.calculate_relative_movement(hand_info)
+                    movement_keys = controller.update_player_position(delta_x, delta_y)
+                    timer.lap('movement')
+
+                    gesture_keys = controller.process_gestures(hand_info)
+                    timer.lap('process_gestures')
+
+                    controller.update_key_presses(movement_keys.union(gesture_keys))
+                    timer.lap('update_key_presses')
+            else:
+                controller.prev_hand_center = None
+                controller.update_key_presses(set())
+                timer.lap('update_key_presses')
+            if i >= warmup:
+                memory_tracker.frame()
+
+        elapsed = time.perf_counter() - loop_start
+        controller.update_key_presses(set())
+    return timer, detections, elapsed, backend.calls
+
+
+def bench_subway_surfers(frames, warmup):
+    """Pipeline de play_game de Subway Surfers con el juego ya iniciado (headless)"""
+    import subway_surfers_pose_detection as subway
+
+    timer = StageTimer()
+    detections = 0
+    with null_input(subway) as backend:
+        state = subway.GameState()
+        state.game_started = True
+        # Línea de referencia de los hombros a media altura del frame
+        state.MID_Y = frames[0].shape[0] // 2
+
+        loop_start = None
+        for i, frame in enumerate(frames):
+            if i == warmup:
+                loop_start = time.perf_counter()
+            timer.recording(i >= warmup)
+            timer.start()
+
+            frame = cv2.flip(frame, 1)
+            frame, results = subway.detectPose(frame, subway.pose_video)
+            timer.lap('detectPose')
+
+            if i >= warmup and results.pose_landmarks:
+                detections += 1
+
+            height, width = frame.shape[:2]
+            state.update(results, width, height)
+            timer.lap('GameState.update')
+            if i >= warmup:
+                memory_tracker.frame()
+
+        elapsed = time.perf_counter() - loop_start
+    return timer, detections, elapsed, backend.calls
+
+
+BENCHMARKS = {
+    'geometry_dash': bench_geometry_dash,
+    'arcade_1942': bench_arcade_1942,
+    'subway_surfers': bench_subway_surfers,
+}
+
+
+def run_benchmark(game, frames, warmup=30, memprofile=None):
+    """
+    Ejecuta el pipeline de un juego sobre los frames y devuelve sus métricas.
+
+    Args:
+        game: Nombre del juego (ver GAMES)
+        frames: Lista de frames BGR
+        warmup: Frames iniciales que no se miden (carga de modelos y cachés)
+        memprofile: Frames entre instantáneas de memoria (None para no medir la memoria)
+
+    Returns:
+        Diccionario con rendimiento, tasa de detección, etapas y entradas enviadas
+        (y memoria por frame si se pidió)
+
+    Raises:
+        ValueError: Si no hay frames
+    """
+    if not frames:
+        raise ValueError("No hay frames que medir")
+    warmup = max(0, min(warmup, len(frames) - 1))
+    if memprofile:
+        # Las muestras de tiempo del propio benchmark crecen con cada frame
+        memory_tracker.start(memprofile, exclude=(os.path.abspath(__file__),))
+    try:
+        timer, detections, elapsed, calls = BENCHMARKS[game](frames, warmup)
+    finally:
+        if memprofile:
+            memory_tracker.stop()
+    measured = len(frames) - warmup
+    result = {
+        'frames': measured,
+        'throughput_fps': round(measured / elapsed, 2) if elapsed > 0 else None,
+        'detection_rate': round(detections / measured, 3) if measured else 0.0,
+        'stages': timer.summary(),
+        'input_calls': dict(calls),
+    }
+    if memprofile:
+        result['memory'] = memory_tracker.report()
+        if result['memory']['growing']:
+            print(f"Aviso: la memoria de {game} crece"
+                  f" {result['memory']['growth_bytes_per_frame']:.0f} bytes/frame")
+    return result
+
+
+def _int_at_least(minimum):
+    """Tipo de argparse para un entero no menor que minimum"""
+    def parse(value):
+        number = int(value)
+        if number < minimum:
+            raise argparse.ArgumentTypeError(f"debe ser al menos {minimum} (es {number})")
+        return number
+    # argparse usa el nombre del tipo en su mensaje de valor no válido
+    parse.__name__ = 'int'
+    return parse
+
+
+positive_int = _int_at_least(1)
+non_negative_int = _int_at_least(0)
+
+
+def environment_info():
+    """Versiones y plataforma para poder comparar resultados entre máquinas"""
+    try:
+        import mediapipe
+        mediapipe_version = mediapipe.__version__
+    except ImportError:
+        mediapipe_version = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'opencv': cv2.__version__,
+        'numpy': np.__version__,
+        'mediapipe': mediapipe_version,
+    }
+
+
+def main():
+    """Función principal que analiza argumentos y ejecuta el benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark de los controladores de juegos')
+    parser.add_argument('--game', choices=GAMES + ('all',), default='all',
+                        help='Controlador a medir (por defecto todos)')
+    parser.add_argument('--video', help='Clip de vídeo a usar en lugar de frames sintéticos')
+    parser.add_argument('--session', help='Sesión grabada con --record a usar en lugar de frames sintéticos'
+                                          ' (sin su ritmo: se mide el rendimiento máximo)')
+    parser.add_argument('--frames', type=positive_int, default=300, help='Número de frames por juego (por defecto 300)')
+    parser.add_argument('--warmup', type=non_negative_int, default=30,
+                        help='Frames iniciales que no se miden (por defecto 30)')
+    parser.add_argument('--width', type=int, default=640, help='Ancho de los frames (por defecto 640)')
+    parser.add_argument('--height', type=int, default=480, help='Alto de los frames (por defecto 480)')
+    parser.add_argument('--seed', type=int, default=0, help='Semilla de los frames sintéticos')
+    parser.add_argument('--output', help='Archivo JSON de salida (por defecto se imprime)')
+    parser.add_argument('--memprofile', type=int, metavar='N',
+                        help='Medir la memoria por frame con tracemalloc (instantánea cada N frames;'
+                             ' los tiempos no son comparables con los de una ejecución normal)')
+    args = parser.parse_args()
+
+    try:
+        if args.session:
+            video_path, _ = session_paths(args.session)
+            frames = video_frames(video_path, args.frames, args.width, args.height)
+            # Los frames se miden sin esperas: los FPS de la grabación solo sirven de referencia
+            replay = ReplayCapture(args.session, realtime=False)
+            recorded_fps = replay.get(cv2.CAP_PROP_FPS)
+            replay.release()
+            source = {'type': 'session', 'path': video_path, 'timing': 'throughput',
+                      'recorded_fps': round(recorded_fps, 2) if recorded_fps else None}
+        elif args.video:
+            frames = video_frames(args.video, args.frames, args.width, args.height)
+            source = {'type': 'video', 'path': args.video}
+        else:
+            frames = synthetic_frames(args.frames, args.width, args.height, args.seed)
+            source = {'type': 'synthetic', 'seed': args.seed}
+    except IOError as e:
+        # Un clip o una sesión que no se puede abrir o no tiene frames
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    height, width = frames[0].shape[:2]
+    source.update(frames=len(frames), warmup=args.warmup, resolution=[width, height])
+
+    games = GAMES if args.game == 'all' else (args.game,)
+    report = {'environment': environment_info(), 'source': source, 'results': {}}
+    # Los mensajes de los controladores van a stderr para no mezclarse con el JSON
+    with redirect_stdout(sys.stderr):
+        for game in games:
+            print(f"Midiendo {game}...")
+            report['results'][game] = run_benchmark(game, frames, args.warmup, args.memprofile)
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+        print(f"Resultados guardados en {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,24 +8,15 @@ import time
 import platform
 import os
 
-def list_available_cameras():
+def iter_available_cameras(max_cameras=10, verbose=False):
     """
-    Intenta encontrar todas las cámaras disponibles en el sistema
-    y muestra sus características
-    """
-    print("=" * 50)
-    print("DETECTOR DE CÁMARAS")
-    print("=" * 50)
-    print(f"Sistema: {platform.system()} {platform.release()}")
-    print(f"Versión de OpenCV: {cv2.__version__}")
-    print("=" * 50)
-    print("Buscando cámaras disponibles...")
-    print("=" * 50)
-    
-    # Número máximo de índices de cámara a probar
-    max_cameras = 10
-    available_cameras = []
+    Genera los índices de las cámaras disponibles a medida que se encuentran,
+    para que quien llama pueda mostrarlas sin esperar a que termine la búsqueda
     
+    Args:
+        max_cameras: Número máximo de índices de cámara a probar
+        verbose: Si es True muestra las características de cada cámara
+    """
     for index in range(max_cameras):
         cap = cv2.VideoCapture(index, cv2.CAP_ANY)  # Probar con diferentes APIs
         if cap.isOpened():
@@ -34,22 +25,42 @@ def list_available_cameras():
             height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
             fps = cap.get(cv2.CAP_PROP_FPS)
             
-            print(f"Cámara {index}: DISPONIBLE")
-            print(f"  - Resolución: {width}x{height}")
-            print(f"  - FPS: {fps}")
+            if verbose:
+                print(f"Cámara {index}: DISPONIBLE")
+                print(f"  - Resolución: {width}x{height}")
+                print(f"  - FPS: {fps}")
             
             # Leer un frame para verificar que funciona
             ret, frame = cap.read()
-            if ret:
-                print(f"  - Lectura de imagen: EXITOSA")
-                available_cameras.append(index)
-            else:
-                print(f"  - Lectura de imagen: ERROR (La cámara existe pero no puede capturar imágenes)")
             
-            # Liberar la cámara
+            # Liberar la cámara antes de entregarla, para que pueda usarse de inmediato
             cap.release()
+            
+            if ret:
+                if verbose:
+                    print(f"  - Lectura de imagen: EXITOSA")
+                yield index
+            elif verbose:
+                print(f"  - Lectura de imagen: ERROR (La cámara existe pero no puede capturar imágenes)")
         else:
-            print(f"Cámara {index}: NO DISPONIBLE")
+            if verbose:
+                print(f"Cámara {index}: NO DISPONIBLE")
+
+def list_available_cameras():
+    """
+    Intenta encontrar todas las cámaras disponibles en el sistema
+    y muestra sus características
+    """
+    print("=" * 50)
+    print("DETECTOR DE CÁMARAS")
+    print("=" * 50)
+    print(f"Sistema: {platform.system()} {platform.release()}")
+    print(f"Versión de OpenCV: {cv2.__version__}")
+    print("=" * 50)
+    print("Buscando cámaras disponibles...")
+    print("=" * 50)
+    
+    available_cameras = list(iter_available_cameras(verbose=True))
     
     print("=" * 50)
     if available_cameras:
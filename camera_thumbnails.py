@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Miniaturas en vivo de las cámaras para el menú de juegos
+
+Un único hilo recorre por turnos las cámaras detectadas, captura a baja resolución
+y entrega miniaturas a pocos FPS (2-5). El coste de la vista previa está limitado
+por un presupuesto de CPU: después de cada vuelta el hilo espera lo necesario para
+que el trabajo de captura y reducción no supere esa fracción del tiempo.
+
+Cada cámara se abre una vez al arrancar el hilo (reabrirla en cada miniatura es
+lento, sobre todo en Windows) y se libera al detenerlo. El menú lo detiene cuando
+las miniaturas no se ven (ventana minimizada) y antes de lanzar un juego o abrir
+la prueba de cámara, para no bloquear los dispositivos.
+
+Si el hilo no termina a tiempo al detenerlo (una cámara que tarda en abrir), el
+capturador lo sigue considerando en marcha y start() no crea un segundo hilo
+sobre las mismas cámaras hasta que el primero termine.
+
+Uso:
+    worker = CameraThumbnailWorker([0, 1], on_frame=mostrar_miniatura).start()
+    ...
+    worker.stop()
+    worker.start([0])   # Reanudar, con otras cámaras si cambiaron
+"""
+
+import cv2
+import time
+import threading
+from PIL import Image
+
+# Valores por defecto de las miniaturas
+THUMBNAIL_SIZE = (128, 96)
+THUMBNAIL_FPS = 3
+THUMBNAIL_CPU_BUDGET = 0.10  # Fracción máxima de un núcleo dedicada a la vista previa
+
+# Resolución pedida a la cámara para que capture y decodifique menos píxeles
+CAPTURE_WIDTH = 320
+CAPTURE_HEIGHT = 240
+
+
+class CameraThumbnailWorker:
+    """Captura miniaturas de varias cámaras por turnos en un hilo propio"""
+
+    def __init__(self, camera_ids, on_frame, fps=THUMBNAIL_FPS, size=THUMBNAIL_SIZE,
+                 cpu_budget=THUMBNAIL_CPU_BUDGET):
+        """
+        Inicializa el capturador de miniaturas.
+
+        Args:
+            camera_ids: Índices de las cámaras a mostrar
+            on_frame: Función (camera_id, imagen PIL RGB) llamada desde el hilo del
+                      capturador con cada miniatura nueva
+            fps: Miniaturas por segundo de cada cámara
+            size: Tamaño (ancho, alto) de las miniaturas
+            cpu_budget: Fracción máxima del tiempo dedicada a capturar y reducir
+        """
+        self.camera_ids = list(camera_ids)
+        self.on_frame = on_frame
+        self.period = 1.0 / fps
+        self.size = size
+        self.cpu_budget = cpu_budget
+
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        """Indica si el hilo está en marcha y no se pidió detenerlo"""
+        return self._thread is not None and not self._stop_event.is_set()
+
+    def start(self, camera_ids=None, timeout=2.0):
+        """
+        Crea el hilo del capturador.
+
+        Args:
+            camera_ids: Cámaras a mostrar en lugar de las anteriores (None para no cambiarlas)
+            timeout: Espera máxima a que termine un hilo anterior que aún no soltó las cámaras
+        """
+        if self._thread is not None:
+            # Un hilo detenido que no terminó a tiempo: esperarlo antes de abrir las cámaras otra vez
+            self._thread.join(timeout=timeout)
+            if self._thread.is_alive():
+                print("Miniaturas de cámara: el capturador anterior sigue abriendo una cámara")
+                return self
+        if camera_ids is not None:
+            self.camera_ids = list(camera_ids)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='camera-thumbnails', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        """
+        Detiene el hilo y espera a que libere las cámaras.
+
+        Returns:
+            True si el hilo terminó; si no, sigue registrado y start() lo esperará
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            if not self._thread.is_alive():
+                self._thread = None
+        return self._thread is None
+
+    def _open_cameras(self):
+        """Abre las cámaras pidiendo una resolución reducida"""
+        captures = {}
+        for camera_id in self.camera_ids:
+            if self._stop_event.is_set():
+                break
+            cap = cv2.VideoCapture(camera_id, cv2.CAP_ANY)
+            if not cap.isOpened():
+                cap.release()
+                continue
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAPTURE_WIDTH)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAPTURE_HEIGHT)
+            # Guardar solo el último frame para que las miniaturas no muestren imágenes atrasadas
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            captures[camera_id] = cap
+        return captures
+
+    def _capture_thumbnail(self, cap):
+        """Lee un frame y lo reduce al tamaño de la miniatura (None si falla la lectura)"""
+        ok, frame = cap.read()
+        if not ok:
+            return None
+        frame = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        return Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+    def _run(self):
+        """Bucle del hilo: una vuelta por todas las cámaras y espera según el presupuesto"""
+        captures = {}
+        try:
+            captures = self._open_cameras()
+            while captures and not self._stop_event.is_set():
+                cycle_start = time.perf_counter()
+                cpu_start = time.thread_time()
+
+                for camera_id, cap in captures.items():
+                    if self._stop_event.is_set():
+                        break
+                    thumbnail = self._capture_thumbnail(cap)
+                    if thumbnail is not None:
+                        self.on_frame(camera_id, thumbnail)
+
+                # Esperar al menos hasta la siguiente vuelta y, si la captura fue cara,
+                # lo suficiente para no pasar del presupuesto de CPU
+                elapsed = time.perf_counter() - cycle_start
+                cpu_used = time.thread_time() - cpu_start
+                wait = max(self.period - elapsed, cpu_used / self.cpu_budget - elapsed)
+                self._stop_event.wait(max(wait, 0.0))
+        except cv2.error as e:
+            print(f"Error en las miniaturas de cámara: {e}")
+        finally:
+            for cap in captures.values():
+                cap.release()
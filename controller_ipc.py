@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Canal de eventos entre un controlador de juego y el menú
+
+Cuando el menú lanza un controlador desde su grupo de procesos pre-cargados
+(ver controller_pool), el proceso del controlador queda conectado al menú por un
+Pipe de multiprocessing. Los controladores informan de sus eventos con report(),
+que no hace nada si el controlador se ejecutó directamente desde la consola.
+
+Eventos enviados por los controladores:
+    'first_frame': se procesó (detección y control) el primer frame de la cámara
+    'stats': cada segundo, con los FPS del bucle, el uso de CPU (% de un núcleo) y
+             la memoria residente (bytes, o None si no se puede medir)
+
+Los controladores solo tienen que llamar a report_frame() en cada frame procesado;
+las estadísticas las envía un hilo propio iniciado con start_stats_reporter().
+"""
+
+import os
+import sys
+import time
+import threading
+
+# Intervalo entre estadísticas enviadas al menú (segundos)
+STATS_INTERVAL = 1.0
+
+# Extremo del Pipe conectado al menú (None si no se lanzó desde el menú)
+_connection = None
+_send_lock = threading.Lock()
+
+# Frames procesados por el bucle del controlador
+_frames = 0
+
+
+def connect(connection):
+    """Conecta este proceso al menú a través de un extremo de Pipe"""
+    global _connection
+    _connection = connection
+
+
+def is_connected():
+    """Indica si este proceso fue lanzado desde el menú"""
+    return _connection is not None
+
+
+def report(event, **data):
+    """
+    Envía un evento al menú sin interrumpir el controlador si el menú ya no escucha.
+
+    Args:
+        event: Nombre del evento
+        **data: Datos adicionales del evento (deben poder serializarse con pickle)
+    """
+    if _connection is None:
+        return
+    try:
+        with _send_lock:
+            _connection.send((event, data))
+    except (OSError, EOFError, ValueError):
+        # El menú se cerró: el controlador sigue funcionando por su cuenta
+        pass
+
+
+def report_frame():
+    """Cuenta un frame procesado; con el primero avisa al menú de que el juego ya se controla"""
+    global _frames
+    _frames += 1
+    if _frames == 1:
+        report('first_frame')
+
+
+def _current_rss():
+    """Memoria residente del proceso en bytes (None si no se puede medir)"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+
+    try:
+        if sys.platform.startswith('linux'):
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+        if os.name == 'nt':
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [('cb', wintypes.DWORD),
+                            ('PageFaultCount', wintypes.DWORD),
+                            ('PeakWorkingSetSize', ctypes.c_size_t),
+                            ('WorkingSetSize', ctypes.c_size_t),
+                            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+                            ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                            ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                            ('PagefileUsage', ctypes.c_size_t),
+                            ('PeakPagefileUsage', ctypes.c_size_t)]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            process = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize
+    except (OSError, ValueError, AttributeError):
+        pass
+    return None
+
+
+def _stats_loop(interval):
+    """Hilo de estadísticas: envía FPS, CPU y memoria al menú cada intervalo"""
+    last_time = time.perf_counter()
+    last_cpu = time.process_time()
+    last_frames = _frames
+
+    while _connection is not None:
+        time.sleep(interval)
+        now = time.perf_counter()
+        cpu = time.process_time()
+        frames = _frames
+
+        elapsed = now - last_time
+        if elapsed > 0:
+            report('stats',
+                   fps=(frames - last_frames) / elapsed,
+                   cpu=100.0 * (cpu - last_cpu) / elapsed,
+                   rss=_current_rss())
+        last_time, last_cpu, last_frames = now, cpu, frames
+
+
+def start_stats_reporter(interval=STATS_INTERVAL):
+    """Inicia el hilo que envía las estadísticas del proceso al menú"""
+    if _connection is None:
+        return
+    threading.Thread(target=_stats_loop, args=(interval,), name='controller-stats', daemon=True).start()
@@ -0,0 +1,327 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Núcleo común de los controladores de juegos
+
+Los tres controladores repetían la búsqueda de la cámara, el bucle de frames, el
+cálculo de FPS, la vista previa, los argumentos de línea de comandos y la
+liberación de teclas, cada uno a su manera. Aquí vive una sola versión del bucle:
+
+    fuente -> preproceso -> inferencia -> clasificación -> acción -> dibujado
+
+Cada juego es un GamePlugin que declara su modelo y sus clasificadores y decide
+qué teclas enviar; el bucle se encarga del resto (cámara o sesión grabada, modo
+headless, vista previa en su hilo, perfilado por etapas, métricas, memoria,
+ritmo de frames y salida ordenada), de modo que cualquier mejora del bucle llega
+a todos los juegos a la vez y un juego nuevo solo necesita su plugin.
+
+Uso:
+    class MiJuego(GamePlugin):
+        name = 'mi_juego'
+        title = 'Mi juego'
+
+        def infer(self, image):
+            return hands.process(image)
+        ...
+
+    run_pipeline(MiJuego(), camera_index=0)
+"""
+
+import sys
+import time
+import argparse
+import traceback
+import webbrowser
+from collections import deque
+
+import cv2
+
+from controller_runtime import (add_runtime_arguments, install_exit_handlers, exit_requested,
+                                DEFAULT_PREVIEW_FPS, DEFAULT_PREVIEW_SCALE)
+from preview_window import PreviewWindow
+from controller_ipc import report_frame
+from session_recorder import open_capture
+from stage_profiler import profiler, start_trace
+from metrics_server import metrics, start_metrics_server
+from alloc_tracker import memory_tracker, start_memory_profile
+from frame_pacing import pacing_analyzer, start_pacing
+from autotune import autotuner, start_autotune
+from landmark_flow import landmark_flow, start_landmark_flow
+
+# Cámara que se usa cuando no se indica ninguna (la confirmada en la instalación de los quioscos)
+DEFAULT_CAMERA_INDEX = 3
+
+# Frames con los que se promedian los FPS que se muestran en pantalla
+FPS_HISTORY_LENGTH = 10
+
+
+def find_camera():
+    """Devuelve el índice de la cámara a usar cuando no se indica ninguna"""
+    print("Buscando cámaras disponibles...")
+    print(f"Usando cámara con índice {DEFAULT_CAMERA_INDEX} (confirmada)")
+    return DEFAULT_CAMERA_INDEX
+
+
+class FpsMeter:
+    """FPS del bucle promediados en los últimos frames (los mismos para todos los juegos)"""
+
+    def __init__(self, length=FPS_HISTORY_LENGTH):
+        self._history = deque(maxlen=length)
+        self._last = None
+        self.fps = 0.0
+
+    def tick(self, now=None):
+        """Registra un frame y actualiza los FPS"""
+        now = time.perf_counter() if now is None else now
+        if self._last is not None and now > self._last:
+            self._history.append(1.0 / (now - self._last))
+            self.fps = sum(self._history) / len(self._history)
+        self._last = now
+        return self.fps
+
+
+class GamePlugin:
+    """
+    Un juego para el bucle común.
+
+    Atributos que declara cada juego:
+        name:          Identificador corto (métricas, registros)
+        title:         Nombre del juego en los mensajes
+        window_title:  Título de la ventana de vista previa
+        url:           Página del juego que se abre al empezar (None para no abrir nada)
+        capture_size:  Resolución (ancho, alto) pedida a la cámara
+        capture_fps:   FPS pedidos a la cámara (None para no pedir nada)
+        inference_scale: Escala a la que se reduce el frame antes del modelo (--autotune la cambia)
+
+    Cada etapa es un método; las que no redefine un juego no hacen nada.
+    """
+
+    name = 'game'
+    title = 'Juego'
+    window_title = 'Game Controller'
+    url = None
+    capture_size = (640, 480)
+    capture_fps = None
+    inference_scale = 1.0
+
+    def start(self):
+        """Prepara el estado de una partida (antes del primer frame)"""
+
+    def instructions(self, headless):
+        """Líneas de instrucciones que se imprimen al empezar"""
+        return []
+
+    def downscale(self, frame):
+        """Reduce el frame a inference_scale (lo devuelve tal cual a escala 1)"""
+        if self.inference_scale == 1.0:
+            return frame
+        frame = cv2.resize(frame, (0, 0), fx=self.inference_scale, fy=self.inference_scale)
+        profiler.lap('resize')
+        return frame
+
+    def preprocess(self, frame):
+        """Convierte el frame BGR (ya volteado) en la entrada del modelo"""
+        image = cv2.cvtColor(self.downscale(frame), cv2.COLOR_BGR2RGB)
+        profiler.lap('cvtColor')
+        return image
+
+    def infer(self, image):
+        """Ejecuta el modelo sobre la entrada preprocesada y devuelve sus resultados"""
+        raise NotImplementedError
+
+    def detected(self, results):
+        """Indica si el modelo encontró una mano o una persona en el frame"""
+        return False
+
+    def classify(self, results, frame_shape):
+        """Convierte los resultados del modelo en una observación del juego (gestos, posturas...)"""
+        return results
+
+    def act(self, observation, now):
+        """Envía al juego las teclas que corresponden a la observación"""
+
+    def render(self, frame, results, observation, fps):
+        """Dibuja el estado sobre el frame y devuelve el frame a mostrar"""
+        return frame
+
+    def release(self):
+        """Suelta las teclas que el juego pudiera mantener pulsadas"""
+
+
+def run_pipeline(plugin, camera_index=None, headless=False,
+                 preview_fps=DEFAULT_PREVIEW_FPS, preview_scale=DEFAULT_PREVIEW_SCALE,
+                 record=None, replay=None):
+    """
+    Ejecuta el bucle de control de un juego hasta que se solicita la salida.
+
+    Args:
+        plugin: GamePlugin del juego
+        camera_index: Índice de la cámara (None para buscarla)
+        headless: Si es True no se dibuja nada ni se abre ventana
+        preview_fps: Máximo de FPS de la ventana de vista previa
+        preview_scale: Escala de la imagen en la vista previa
+        record: Nombre base donde grabar la sesión de cámara (None para no grabar)
+        replay: Nombre base de una sesión grabada a usar en lugar de la cámara
+    """
+    preview = None
+    camera = None
+    try:
+        if plugin.url:
+            print(f"Abriendo {plugin.title} en el navegador...")
+            webbrowser.open(plugin.url)
+
+        # Encontrar una cámara disponible (no hace falta al reproducir una sesión)
+        if camera_index is None and not replay:
+            camera_index = find_camera()
+        if camera_index == -1:
+            print("Error: No se pudo acceder a ninguna cámara.")
+            return
+
+        camera = pacing_analyzer.wrap(open_capture(camera_index, record=record, replay=replay))
+        width, height = plugin.capture_size
+        camera.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        camera.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        if plugin.capture_fps:
+            camera.set(cv2.CAP_PROP_FPS, plugin.capture_fps)
+
+        if not camera.isOpened():
+            print(f"Error: No se pudo abrir la cámara con índice {camera_index}")
+            return
+        metrics.set_source_fps(camera.get(cv2.CAP_PROP_FPS))
+        # Punto de partida del ajuste automático (--autotune)
+        autotuner.attach(plugin, camera, camera_index, replay=replay, record=record)
+
+        install_exit_handlers()
+
+        # Crear la ventana en su propio hilo para no frenar el control (no hay ventana en modo headless)
+        if not headless:
+            preview = PreviewWindow(plugin.window_title, max_fps=preview_fps, scale=preview_scale).start()
+
+        plugin.start()
+        for line in plugin.instructions(headless):
+            print(line)
+
+        fps_meter = FpsMeter()
+        frame_count = 0
+        start_time = time.time()
+
+        while camera.isOpened() and not exit_requested(check_console=headless):
+            profiler.start_frame()
+            ok, frame = camera.read()
+            if not ok:
+                print("Error: No se pudo leer un fotograma de la cámara")
+                break
+            # La latencia que mide --autotune empieza con el frame ya leído: la espera a la
+            # cámara no es cómputo y haría pasar un bucle limitado por la cámara por uno lento
+            started = time.perf_counter()
+            profiler.lap('capture')
+
+            # Voltear horizontalmente para una visualización natural
+            frame = cv2.flip(frame, 1)
+            profiler.lap('flip')
+            fps_meter.tick()
+
+            # Con --autotune la captura puede ser menor que la del juego: se amplía para que
+            # los gestos y el dibujado sigan en la resolución del juego
+            frame = autotuner.fit(frame)
+
+            image = plugin.preprocess(frame)
+            # Con --flow el modelo solo se ejecuta en algunos frames y en el resto se propagan los landmarks
+            results = landmark_flow.infer(plugin.infer, image)
+            profiler.lap('inference')
+
+            observation = plugin.classify(results, frame.shape)
+            profiler.lap('classification')
+
+            plugin.act(observation, time.time())
+            profiler.lap('injection')
+
+            frame_count += 1
+            # Contar el frame para las estadísticas del menú, las métricas y la memoria
+            report_frame()
+            detected = plugin.detected(results)
+            metrics.observe_frame(detected=detected)
+            memory_tracker.frame()
+            autotuner.observe(started, detected)
+
+            # En modo headless o entre frames de la vista previa no se dibuja nada
+            if preview is None or not preview.wants_frame():
+                continue
+
+            frame = plugin.render(frame, results, observation, fps_meter.fps)
+            profiler.lap('drawing')
+
+            # Entregar el frame a la vista previa (ESC en la ventana solicita la salida)
+            preview.submit(frame)
+
+        elapsed = time.time() - start_time
+        if frame_count and elapsed > 0:
+            print(f"Frames procesados: {frame_count} - FPS medio: {frame_count / elapsed:.1f}")
+
+    except Exception as e:
+        print(f"Error durante el juego: {e}")
+        traceback.print_exc()
+
+    finally:
+        # Asegurar que se sueltan todas las teclas y se liberan la ventana y la cámara
+        plugin.release()
+        if preview is not None:
+            preview.stop()
+        if camera is not None:
+            camera.release()
+
+
+def create_parser(description, default_camera=None):
+    """
+    ArgumentParser con las opciones comunes a todos los controladores.
+
+    Args:
+        description: Descripción del controlador
+        default_camera: Cámara por defecto de --camera (None para buscarla)
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--play', action='store_true', help='Iniciar el controlador del juego')
+    camera_help = 'Índice de la cámara a utilizar'
+    if default_camera is not None:
+        camera_help += f' (por defecto {default_camera})'
+    parser.add_argument('--camera', type=int, default=default_camera, help=camera_help)
+    parser.add_argument('--config', metavar='ARCHIVO',
+                        help='Archivo JSON con las teclas y umbrales del juego (por defecto configs/<juego>.json)')
+    add_runtime_arguments(parser)
+    return parser
+
+
+def start_instrumentation(args, game, module=None):
+    """
+    Activa las herramientas de medida pedidas en la línea de comandos.
+
+    Args:
+        args: Argumentos analizados con un parser de create_parser
+        game: Nombre del juego para las métricas
+        module: Módulo del controlador cuyo pyautogui se envuelve para contar las teclas
+    """
+    # Medir las etapas del bucle si se pide una traza
+    start_trace(args.trace)
+    # Publicar las métricas del bucle si se pide un puerto
+    start_metrics_server(args.metrics_port, game, module)
+    # Seguir la memoria asignada por frame si se pide
+    start_memory_profile(args.memprofile)
+    # Analizar el ritmo de frames si se pide
+    start_pacing(args.pacing)
+    # Ajustar la captura y la inferencia a unos FPS objetivo si se pide
+    start_autotune(args.autotune)
+    # Inferir solo en algunos frames y propagar los landmarks con flujo óptico si se pide
+    start_landmark_flow(args.flow)
+
+
+def play_arguments(args):
+    """Argumentos de run_pipeline tomados de la línea de comandos"""
+    return dict(camera_index=args.camera, headless=args.headless,
+                preview_fps=args.preview_fps, preview_scale=args.preview_scale,
+                record=args.record, replay=args.replay)
+
+
+def no_arguments():
+    """Indica si el controlador se ejecutó sin argumentos (para mostrar la ayuda)"""
+    return len(sys.argv) == 1
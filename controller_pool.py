@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Grupo de procesos de controlador pre-cargados para el menú
+
+Lanzar un controlador con subprocess.Popen obliga a pagar, después del clic, el
+arranque del intérprete y la importación de OpenCV, MediaPipe y pyautogui. El
+ControllerPool mantiene un proceso ya importado y en espera por cada tipo de
+controlador (ver controller_worker); al lanzar un juego solo se le envían la
+cámara y el modo por un Pipe. Cuando ese juego termina se pre-carga otro proceso
+para el siguiente lanzamiento.
+
+Los eventos de los procesos (ready, first_frame, exit...) se entregan a la
+función on_event desde un hilo lector por proceso.
+
+Uso:
+    pool = ControllerPool(['arcade_1942_mouse_controller'], on_event=procesar_evento)
+    pool.start()
+    handle = pool.launch('arcade_1942_mouse_controller', ['--play', '--camera=0'])
+    ...
+    pool.shutdown()
+"""
+
+import time
+import threading
+import multiprocessing
+
+import controller_worker
+
+# 'spawn' en todos los sistemas: no se duplica el proceso del menú (Tk, cámaras abiertas)
+_context = multiprocessing.get_context('spawn')
+
+
+class ControllerProcess:
+    """Proceso de un controlador, en espera o ya lanzado"""
+
+    def __init__(self, module_name, process, connection):
+        self.module_name = module_name
+        self.process = process
+        self.connection = connection
+        self.ready = False
+        self.launched_at = None  # time.perf_counter() del lanzamiento
+        self.argv = None
+        self.exited = False
+
+    @property
+    def pid(self):
+        return self.process.pid
+
+    @property
+    def launched(self):
+        return self.launched_at is not None
+
+    def is_alive(self):
+        return not self.exited and self.process.is_alive()
+
+    def request_stop(self):
+        """Pide al controlador que termine de forma ordenada (como ESC o Ctrl+C)"""
+        return self.send(('stop', None))
+
+    def terminate(self):
+        """Termina el proceso a la fuerza si sigue vivo"""
+        if self.process.is_alive():
+            self.process.terminate()
+
+    def send(self, message):
+        """Envía un mensaje al proceso; devuelve False si ya no escucha"""
+        try:
+            self.connection.send(message)
+            return True
+        except (OSError, EOFError, ValueError):
+            return False
+
+
+class ControllerPool:
+    """Mantiene un proceso pre-cargado por tipo de controlador"""
+
+    def __init__(self, module_names, on_event=None):
+        """
+        Inicializa el grupo.
+
+        Args:
+            module_names: Módulos de controlador a pre-cargar
+            on_event: Función (handle, event, data) llamada desde los hilos lectores
+                      con cada evento de los procesos
+        """
+        self.module_names = list(module_names)
+        self.on_event = on_event
+
+        self._idle = {}
+        self._unavailable = set()  # Controladores cuyo módulo no se pudo importar
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def start(self):
+        """Pre-carga un proceso por cada tipo de controlador"""
+        for module_name in self.module_names:
+            self.replenish(module_name)
+
+    def replenish(self, module_name):
+        """Pre-carga un proceso para el controlador si no hay ninguno en espera"""
+        with self._lock:
+            if self._closed or module_name in self._unavailable:
+                return
+            handle = self._idle.get(module_name)
+            if handle is not None and handle.is_alive():
+                return
+            self._idle[module_name] = self._spawn(module_name)
+
+    def launch(self, module_name, argv):
+        """
+        Lanza un controlador usando su proceso pre-cargado (o uno nuevo si no lo hay).
+
+        Args:
+            module_name: Módulo del controlador
+            argv: Argumentos de línea de comandos del controlador
+
+        Returns:
+            El ControllerProcess lanzado, o None si no se pudo usar el grupo
+        """
+        with self._lock:
+            if self._closed or module_name in self._unavailable:
+                return None
+            handle = self._idle.pop(module_name, None)
+            if handle is None or not handle.is_alive():
+                handle = self._spawn(module_name)
+
+        handle.launched_at = time.perf_counter()
+        handle.argv = list(argv)
+        if not handle.send(('launch', list(argv))):
+            return None
+        return handle
+
+    def shutdown(self, timeout=2.0):
+        """Termina los procesos en espera (los juegos lanzados siguen funcionando)"""
+        with self._lock:
+            self._closed = True
+            idle = list(self._idle.values())
+            self._idle.clear()
+
+        for handle in idle:
+            handle.send(('quit', None))
+        for handle in idle:
+            handle.process.join(timeout)
+            if handle.process.is_alive():
+                handle.process.terminate()
+
+    def _spawn(self, module_name):
+        """Crea un proceso que importa el controlador y espera la orden de lanzamiento"""
+        connection, child_connection = _context.Pipe()
+        process = _context.Process(target=controller_worker.serve,
+                                   args=(module_name, child_connection),
+                                   name=f'{module_name}-worker')
+        process.start()
+        child_connection.close()
+
+        handle = ControllerProcess(module_name, process, connection)
+        threading.Thread(target=self._read_events, args=(handle,),
+                         name=f'{module_name}-events', daemon=True).start()
+        return handle
+
+    def _read_events(self, handle):
+        """Hilo lector: entrega los eventos del proceso hasta que termina"""
+        while True:
+            try:
+                event, data = handle.connection.recv()
+            except (EOFError, OSError):
+                break
+
+            if event == 'ready':
+                handle.ready = True
+            elif event == 'error':
+                # No volver a pre-cargar un controlador que no se puede importar
+                with self._lock:
+                    self._unavailable.add(handle.module_name)
+            elif event == 'exit':
+                handle.exited = True
+            self._emit(handle, event, data)
+
+        handle.process.join(1.0)
+        if not handle.exited:
+            handle.exited = True
+            self._emit(handle, 'exit', {'code': handle.process.exitcode})
+        handle.connection.close()
+
+        # El juego terminó: dejar otro proceso listo para el próximo lanzamiento
+        if handle.launched and handle.ready:
+            self.replenish(handle.module_name)
+
+    def _emit(self, handle, event, data):
+        if self.on_event is not None:
+            self.on_event(handle, event, data)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Utilidades de ejecución compartidas por los controladores de juegos
+
+Este módulo agrupa las opciones de línea de comandos y el control de salida que
+comparten los tres controladores (1942, Geometry Dash y Subway Surfers).
+
+Modo headless:
+    Con --headless los controladores no dibujan nada ni abren ventanas de OpenCV,
+    por lo que todo el tiempo del bucle se dedica a captura, detección y envío de
+    teclas. Como no hay ventana para pulsar ESC, la salida se solicita con:
+    - Ctrl+C (SIGINT) o SIGTERM (por ejemplo desde un servicio o un benchmark)
+    - Ctrl+Break (SIGBREAK) en Windows
+    - ESC o 'q' en la consola en Windows, o 'q' + Enter en otros sistemas
+
+Vista previa:
+    Sin --headless la ventana se muestra desde un hilo propio (ver preview_window)
+    limitada a --preview-fps y reducida con --preview-scale, para que la ventana no
+    marque el ritmo del control.
+
+Sesiones:
+    Con --record NOMBRE se graban los frames de la cámara y sus instantes, y con
+    --replay NOMBRE se usan en lugar de la cámara al mismo ritmo (ver session_recorder).
+
+Perfilado:
+    Con --trace salida.json se mide cada etapa del bucle y al salir se escribe una
+    traza de Chrome/Perfetto (ver stage_profiler).
+
+Métricas:
+    Con --metrics-port PUERTO se publican FPS, latencias, detecciones y teclas
+    enviadas en http://127.0.0.1:PUERTO/metrics (ver metrics_server).
+
+Memoria:
+    Con --memprofile N se sigue con tracemalloc la memoria asignada en cada frame,
+    con una instantánea cada N frames y un aviso si crece (ver alloc_tracker).
+
+Ritmo de frames:
+    Con --pacing se mide el intervalo entre frames, la espera en read() y el
+    cómputo de cada frame, y al salir se indica si el límite es la cámara o la CPU
+    (ver frame_pacing).
+
+Ajuste automático:
+    Con --autotune FPS se eligen en marcha la resolución de captura y la escala de
+    inferencia para llegar a esos FPS, y el ajuste se guarda por máquina, juego y
+    cámara (ver autotune). Solo en el bucle común, como --flow.
+
+Flujo óptico:
+    Con --flow K el modelo se ejecuta como mucho una vez cada K frames (menos
+    cuanto más movimiento) y en el resto los landmarks se propagan con flujo
+    óptico (ver landmark_flow). Solo en el bucle común: Subway Surfers lo rechaza
+    con --async y con --hand-camera.
+"""
+
+import os
+import sys
+import signal
+import threading
+
+# Evento global de salida: cualquier hilo o manejador de señal puede activarlo
+_exit_event = threading.Event()
+
+# Teclas de consola que solicitan la salida en modo headless
+EXIT_HOTKEYS = ('\x1b', 'q', 'Q')
+
+# Valores por defecto de la vista previa
+DEFAULT_PREVIEW_FPS = 15
+DEFAULT_PREVIEW_SCALE = 0.75
+
+
+def add_runtime_arguments(parser):
+    """Añade a un ArgumentParser las opciones de ejecución comunes a todos los controladores"""
+    parser.add_argument('--headless', action='store_true',
+                        help='Ejecutar sin ventana ni dibujado (salir con Ctrl+C, ESC o q en la consola)')
+    parser.add_argument('--preview-fps', type=float, default=DEFAULT_PREVIEW_FPS,
+                        help=f'Máximo de FPS de la ventana de vista previa (0 = sin límite, por defecto {DEFAULT_PREVIEW_FPS})')
+    parser.add_argument('--preview-scale', type=float, default=DEFAULT_PREVIEW_SCALE,
+                        help=f'Escala de la imagen en la vista previa (por defecto {DEFAULT_PREVIEW_SCALE})')
+    parser.add_argument('--record', metavar='NOMBRE',
+                        help='Grabar los frames de la cámara en NOMBRE.avi con sus instantes en NOMBRE.csv')
+    parser.add_argument('--replay', metavar='NOMBRE',
+                        help='Usar una sesión grabada con --record en lugar de la cámara')
+    parser.add_argument('--trace', metavar='ARCHIVO',
+                        help='Medir cada etapa del bucle y guardar una traza de Chrome/Perfetto al salir')
+    parser.add_argument('--metrics-port', type=int, metavar='PUERTO',
+                        help='Publicar métricas de Prometheus en http://127.0.0.1:PUERTO/metrics')
+    parser.add_argument('--memprofile', type=int, metavar='N',
+                        help='Medir la memoria asignada por frame con tracemalloc (instantánea cada N frames)')
+    parser.add_argument('--pacing', action='store_true',
+                        help='Analizar el ritmo de frames (espera de la cámara frente a cómputo) e informar al salir')
+    parser.add_argument('--autotune', type=float, metavar='FPS',
+                        help='Ajustar la resolución de captura y la escala de inferencia para llegar a FPS'
+                             ' (el ajuste se guarda por máquina, juego y cámara)')
+    parser.add_argument('--flow', type=int, metavar='K',
+                        help='Ejecutar el modelo como mucho cada K frames (según el movimiento) y propagar'
+                             ' los landmarks con flujo óptico en el resto (no con --async ni --hand-camera)')
+    return parser
+
+
+def request_exit():
+    """Solicita que el bucle principal del controlador termine"""
+    _exit_event.set()
+
+
+def reset_exit():
+    """Limpia una solicitud de salida previa (antes de iniciar un nuevo bucle)"""
+    _exit_event.clear()
+
+
+def _handle_exit_signal(signum, frame):
+    """Manejador de señales que solicita la salida ordenada del bucle"""
+    print(f"\nSeñal {signum} recibida, finalizando...")
+    request_exit()
+
+
+def install_exit_handlers():
+    """
+    Instala los manejadores de señales que solicitan la salida del bucle.
+
+    Solo puede hacerse desde el hilo principal; en otro hilo no hace nada y la
+    salida sigue siendo posible con request_exit().
+    """
+    reset_exit()
+    if threading.current_thread() is not threading.main_thread():
+        return
+
+    signals = [signal.SIGINT, signal.SIGTERM]
+    if hasattr(signal, 'SIGBREAK'):
+        signals.append(signal.SIGBREAK)
+
+    for sig in signals:
+        try:
+            signal.signal(sig, _handle_exit_signal)
+        except (ValueError, OSError):
+            pass
+
+
+def _console_hotkey_pressed():
+    """Comprueba sin bloquear si se pulsó una tecla de salida en la consola"""
+    if os.name == 'nt':
+        import msvcrt
+        while msvcrt.kbhit():
+            if msvcrt.getwch() in EXIT_HOTKEYS:
+                return True
+        return False
+
+    # En POSIX la consola funciona por líneas: se acepta 'q' seguido de Enter
+    if sys.stdin is None or not sys.stdin.isatty():
+        return False
+    import select
+    readable, _, _ = select.select([sys.stdin], [], [], 0)
+    if readable:
+        line = sys.stdin.readline()
+        return line.strip() in EXIT_HOTKEYS
+    return False
+
+
+def exit_requested(check_console=False):
+    """
+    Indica si se ha solicitado la salida del bucle principal.
+
+    Args:
+        check_console: Si es True también se revisa la consola en busca de la tecla de salida
+
+    Returns:
+        True si el controlador debe terminar
+    """
+    if _exit_event.is_set():
+        return True
+    if check_console and _console_hotkey_pressed():
+        request_exit()
+        return True
+    return False
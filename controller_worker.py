@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Proceso de controlador pre-cargado
+
+Cada proceso del grupo de controller_pool importa de antemano el módulo de su
+juego (OpenCV, MediaPipe, pyautogui y los modelos creados al importar), avisa al
+menú con 'ready' y espera. Al pulsar en el menú recibe los argumentos de línea
+de comandos (cámara y modo) por el Pipe y ejecuta el main() del controlador como
+si se hubiera lanzado con esos argumentos.
+
+Mensajes del menú al proceso:
+    ('launch', argv): ejecutar el controlador con esos argumentos
+    ('quit', None): terminar sin ejecutar el controlador
+    ('stop', None): pedir al controlador en marcha que termine (request_exit)
+
+Mensajes del proceso al menú:
+    ('ready', {}): el módulo del controlador ya está importado
+    ('error', {'message': texto}): no se pudo importar el módulo del controlador
+    ('exit', {'code': N}): el controlador terminó
+    y los eventos enviados por el controlador con controller_ipc.report()
+"""
+
+import os
+import sys
+import importlib
+import threading
+import traceback
+
+import controller_ipc
+from controller_runtime import request_exit
+
+
+def _listen_for_commands(connection):
+    """Hilo que atiende las órdenes del menú mientras el controlador está en marcha"""
+    while True:
+        try:
+            command, _ = connection.recv()
+        except (EOFError, OSError):
+            # El menú se cerró: el controlador sigue funcionando por su cuenta
+            return
+        if command == 'stop':
+            request_exit()
+
+
+def serve(module_name, connection):
+    """
+    Punto de entrada del proceso: pre-carga el controlador y espera la orden del menú.
+
+    Args:
+        module_name: Nombre del módulo del controlador (por ejemplo 'arcade_1942_mouse_controller')
+        connection: Extremo del Pipe conectado al menú
+    """
+    # Los módulos de los juegos están junto a este archivo
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    controller_ipc.connect(connection)
+    try:
+        module = importlib.import_module(module_name)
+    except Exception as e:
+        # Sin el módulo (por ejemplo, falta una dependencia) el menú lanzará el juego sin el grupo
+        traceback.print_exc()
+        controller_ipc.report('error', message=str(e))
+        return
+    controller_ipc.report('ready')
+
+    try:
+        command, argv = connection.recv()
+    except (EOFError, OSError):
+        # El menú se cerró antes de usar este proceso
+        return
+    if command != 'launch':
+        return
+
+    # Estadísticas periódicas y órdenes del menú (detener) mientras el controlador funciona
+    controller_ipc.start_stats_reporter()
+    threading.Thread(target=_listen_for_commands, args=(connection,),
+                     name='menu-commands', daemon=True).start()
+
+    exit_code = 0
+    sys.argv = [module.__file__] + list(argv)
+    try:
+        module.main()
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else 0
+    except Exception:
+        traceback.print_exc()
+        exit_code = 1
+    finally:
+        controller_ipc.report('exit', code=exit_code)
@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Análisis del ritmo de frames de los controladores
+
+El FPS de la pantalla no dice por qué el controlador va lento. Con --pacing la
+cámara se envuelve en un PacingCapture que anota, para cada frame, cuándo se pidió
+y cuándo se entregó. De ahí salen:
+
+- Intervalo: tiempo entre dos frames entregados (lo que marca el FPS real)
+- Espera: tiempo bloqueado en read() esperando a la cámara
+- Cómputo: tiempo entre la entrega de un frame y la petición del siguiente
+  (detección, clasificación, teclas y dibujado)
+
+Además se cuentan los frames duplicados (la cámara entrega otra vez el mismo
+contenido) comparando una versión muy reducida de cada frame con la del anterior,
+y los perdidos: si un frame ya estaba esperando en el buffer (read() no bloqueó)
+y el intervalo equivale a varios periodos de la cámara, los frames intermedios se
+descartaron. Un intervalo largo con read() bloqueado no es una pérdida, sino una
+cámara que entrega menos FPS de los nominales (por ejemplo, por la exposición
+automática con poca luz), y el informe lo indica aparte.
+
+Al salir se imprime un histograma de cada magnitud y la clasificación de la
+sesión: limitada por la cámara si el bucle pasa buena parte del tiempo esperando
+en read(), o limitada por la CPU si el cómputo no deja leer al ritmo de la cámara.
+
+Uso:
+    from frame_pacing import pacing_analyzer, start_pacing
+
+    start_pacing(True)
+    camera = pacing_analyzer.wrap(open_capture(0))
+"""
+
+import atexit
+from time import perf_counter_ns
+from collections import deque
+
+import cv2
+import numpy as np
+
+# Frames que conserva el análisis (varias horas a 30 FPS ocupan unos pocos MB)
+PACING_CAPACITY = 200000
+
+# Paso de la versión reducida con la que se detectan frames duplicados
+DUPLICATE_STRIDE = 16
+
+# Fracción del intervalo bloqueada en read() a partir de la cual la cámara marca el ritmo
+CAMERA_BOUND_WAIT = 0.25
+
+# Un intervalo mayor que este número de periodos de la cámara indica frames perdidos
+DROP_FACTOR = 1.5
+
+# Límites de las barras de los histogramas (ms); la última recoge el resto
+HISTOGRAM_EDGES_MS = (0, 2, 5, 10, 16.7, 25, 33.3, 50, 66.7, 100, 200)
+
+HISTOGRAM_WIDTH = 40
+
+
+class PacingAnalyzer:
+    """Registra el instante de petición y entrega de cada frame de la cámara"""
+
+    def __init__(self, capacity=PACING_CAPACITY):
+        self.enabled = False
+        self.source_fps = None
+        self.duplicates = 0
+        self._frames = deque(maxlen=capacity)  # (petición_ns, entrega_ns, duplicado)
+        self._previous_signature = None
+
+    def enable(self):
+        """Activa el análisis para las capturas que se envuelvan a partir de ahora"""
+        self.enabled = True
+
+    def wrap(self, capture):
+        """Envuelve una captura para medir sus lecturas (la devuelve tal cual si está desactivado)"""
+        if not self.enabled:
+            return capture
+        return PacingCapture(capture, self)
+
+    def observe(self, requested, delivered, frame):
+        """Anota un frame entregado por la cámara"""
+        signature = frame[::DUPLICATE_STRIDE, ::DUPLICATE_STRIDE].tobytes()
+        duplicate = signature == self._previous_signature
+        if duplicate:
+            self.duplicates += 1
+        self._previous_signature = signature
+        self._frames.append((requested, delivered, duplicate))
+
+    def analyze(self):
+        """
+        Calcula las series y la clasificación de la sesión.
+
+        Returns:
+            Diccionario con intervalos, esperas y cómputo (ms, por frame), frames
+            perdidos y duplicados, y la clasificación ('camera' o 'cpu'); None si
+            hay menos de dos frames
+        """
+        frames = np.asarray([(requested, delivered) for requested, delivered, _ in list(self._frames)],
+                            dtype=np.float64).reshape(-1, 2) / 1e6
+        if len(frames) < 2:
+            return None
+
+        requested, delivered = frames[1:, 0], frames[1:, 1]
+        intervals = delivered - frames[:-1, 1]
+        waits = delivered - requested
+        compute = requested - frames[:-1, 1]
+
+        # Periodo de la cámara: el nominal o, si no se conoce, los intervalos más cortos
+        if self.source_fps and self.source_fps > 0:
+            period = 1000.0 / self.source_fps
+        else:
+            period = float(np.percentile(intervals, 10))
+        dropped = 0
+        if period > 0:
+            late = (intervals > DROP_FACTOR * period) & (waits < period / 2)
+            dropped = int(np.sum(np.rint(intervals[late] / period) - 1))
+
+        wait_fraction = float(waits.sum() / intervals.sum()) if intervals.sum() > 0 else 0.0
+        bound = 'camera' if wait_fraction >= CAMERA_BOUND_WAIT else 'cpu'
+        return {
+            'frames': len(frames),
+            'period_ms': period,
+            'intervals_ms': intervals,
+            'waits_ms': waits,
+            'compute_ms': compute,
+            'dropped': dropped,
+            'duplicates': self.duplicates,
+            'wait_fraction': wait_fraction,
+            'bound': bound,
+        }
+
+    def print_report(self):
+        """Imprime los histogramas y la clasificación de la sesión"""
+        analysis = self.analyze()
+        if analysis is None:
+            print("Ritmo de frames: no hay suficientes frames para analizar")
+            return
+
+        mean_interval = float(analysis['intervals_ms'].mean())
+        print(f"\nRitmo de frames ({analysis['frames']} frames,"
+              f" {1000.0 / mean_interval if mean_interval > 0 else 0:.1f} FPS medios,"
+              f" periodo de la cámara {analysis['period_ms']:.1f} ms)")
+        for title, key in (('Intervalo entre frames', 'intervals_ms'),
+                           ('Espera en read()', 'waits_ms'),
+                           ('Cómputo por frame', 'compute_ms')):
+            _print_histogram(title, analysis[key])
+
+        print(f"\n  Frames perdidos (estimado): {analysis['dropped']}"
+              f"   Frames duplicados: {analysis['duplicates']}")
+        if analysis['bound'] == 'camera':
+            print(f"  Limitado por la CÁMARA: el bucle espera en read() el"
+                  f" {100 * analysis['wait_fraction']:.0f}% del tiempo; acelerar el cómputo no sube los FPS")
+            median_interval = float(np.median(analysis['intervals_ms']))
+            if median_interval > DROP_FACTOR * analysis['period_ms']:
+                print(f"  La cámara entrega unos {1000.0 / median_interval:.1f} FPS de"
+                      f" {1000.0 / analysis['period_ms']:.1f} nominales (¿exposición automática o poca luz?)")
+        else:
+            print(f"  Limitado por la CPU: solo espera en read() el"
+                  f" {100 * analysis['wait_fraction']:.0f}% del tiempo; el cómputo marca el ritmo")
+
+
+def _print_histogram(title, values):
+    """Histograma de barras horizontales con los límites de HISTOGRAM_EDGES_MS"""
+    edges = list(HISTOGRAM_EDGES_MS) + [max(float(values.max()), HISTOGRAM_EDGES_MS[-1]) + 1]
+    counts, _ = np.histogram(values, bins=edges)
+    print(f"\n  {title}: media {values.mean():.1f} ms, p50 {np.percentile(values, 50):.1f} ms,"
+          f" p95 {np.percentile(values, 95):.1f} ms, máx {values.max():.1f} ms")
+    peak = counts.max() or 1
+    for i, count in enumerate(counts):
+        label = (f"{edges[i]:>5g}-{edges[i + 1]:<5g}" if i < len(HISTOGRAM_EDGES_MS) - 1
+                 else f"{edges[i]:>5g}+     ")
+        bar = '#' * int(round(HISTOGRAM_WIDTH * count / peak))
+        print(f"    {label} ms |{bar:<{HISTOGRAM_WIDTH}}| {count}")
+
+
+class PacingCapture:
+    """Envuelve una captura de OpenCV y mide cada lectura"""
+
+    def __init__(self, capture, analyzer):
+        self.capture = capture
+        self.analyzer = analyzer
+
+    def read(self):
+        requested = perf_counter_ns()
+        ok, frame = self.capture.read()
+        delivered = perf_counter_ns()
+        if ok:
+            if self.analyzer.source_fps is None:
+                self.analyzer.source_fps = self.capture.get(cv2.CAP_PROP_FPS) or 0.0
+            self.analyzer.observe(requested, delivered, frame)
+        return ok, frame
+
+    def __getattr__(self, name):
+        # isOpened, set, get, release... se delegan en la captura original
+        return getattr(self.capture, name)
+
+
+# Análisis compartido por el bucle del controlador
+pacing_analyzer = PacingAnalyzer()
+
+
+def start_pacing(enabled):
+    """
+    Activa el análisis del ritmo de frames y programa el informe al terminar el proceso.
+
+    Args:
+        enabled: Si es False no se hace nada
+    """
+    if not enabled:
+        return
+    pacing_analyzer.enable()
+    atexit.register(pacing_analyzer.print_report)
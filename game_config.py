@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Teclas y umbrales de cada juego, cargados de configs/<juego>.json
+
+Las teclas que envía cada juego y los umbrales de sus gestos (distancia del
+pellizco, distancia de las manos unidas, márgenes de salto y agachado, tiempos
+de espera entre gestos...) se pueden ajustar en la instalación sin tocar el
+código:
+
+    {
+        "keys": {"jump": "space"},
+        "tuning": {"pinch_distance": 30, "debounce": 0.05}
+    }
+
+Cada juego declara sus acciones con su tecla por defecto y una dataclass con sus
+umbrales y valores por defecto. Al arrancar, el archivo se valida (una entrada
+desconocida o de otro tipo es un error, no se ignora) y se compila en:
+
+- keys:   tupla con la tecla de cada acción, indexada por la constante de la
+          acción (KEYS[JUMP]), sin buscar nombres en el bucle
+- tuning: instancia inmutable de la dataclass del juego con los tipos ya
+          convertidos (TUNING.pinch_distance)
+
+Lo que no aparece en el archivo, o todo si el archivo no existe, toma el valor
+por defecto del juego. Los módulos de los juegos arrancan con los valores por
+defecto (default_game_config) y solo leen el archivo desde su main(), donde un
+archivo no válido es un mensaje de error: importarlos (benchmark, landmark_stream,
+los procesos del grupo de controladores) nunca falla por la configuración.
+
+Uso:
+    ACTIONS = (('jump', 'space'),)
+    JUMP = 0
+
+    @dataclass(frozen=True, slots=True)
+    class MiJuegoTuning:
+        pinch_distance: float = 30.0
+
+    config = load_game_config('mi_juego', ACTIONS, MiJuegoTuning)
+    pyautogui.keyDown(config.keys[JUMP])
+"""
+
+import os
+import json
+from dataclasses import dataclass, fields
+
+# Carpeta de los archivos de configuración de los juegos
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'configs')
+
+# Secciones que admite un archivo de configuración
+SECTIONS = ('keys', 'tuning')
+
+
+@dataclass(frozen=True)
+class GameConfig:
+    """Configuración compilada de un juego"""
+    game: str
+    keys: tuple      # Tecla de cada acción, en el orden de las acciones del juego
+    tuning: object   # Instancia de la dataclass de umbrales del juego
+    path: str        # Archivo del que se cargó (None si son los valores por defecto)
+
+
+def config_path(game):
+    """Archivo de configuración por defecto de un juego"""
+    return os.path.join(CONFIG_DIR, f'{game}.json')
+
+
+def _compile_keys(game, actions, bindings):
+    """Tabla de teclas indexada por acción a partir de la sección 'keys'"""
+    names = [name for name, _ in actions]
+    unknown = sorted(set(bindings) - set(names))
+    if unknown:
+        raise ValueError(f"{game}: acciones desconocidas en 'keys': {', '.join(unknown)}"
+                         f" (válidas: {', '.join(names)})")
+
+    keys = []
+    for name, default in actions:
+        key = bindings.get(name, default)
+        if not isinstance(key, str) or not key.strip():
+            raise ValueError(f"{game}: la tecla de '{name}' debe ser un texto no vacío")
+        keys.append(key.strip().lower())
+    return tuple(keys)
+
+
+def _convert(game, name, kind, value):
+    """Convierte un umbral al tipo de su campo (bool, int o float)"""
+    # bool es un int para Python, pero un umbral numérico nunca debería ser true/false
+    if kind is bool:
+        if isinstance(value, bool):
+            return value
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        if kind is float:
+            return float(value)
+        if kind is int and float(value).is_integer():
+            return int(value)
+    raise ValueError(f"{game}: '{name}' debe ser de tipo {kind.__name__} (es {value!r})")
+
+
+def _compile_tuning(game, tuning_class, values):
+    """Instancia de la dataclass de umbrales a partir de la sección 'tuning'"""
+    types = {field.name: field.type for field in fields(tuning_class)}
+    unknown = sorted(set(values) - set(types))
+    if unknown:
+        raise ValueError(f"{game}: umbrales desconocidos en 'tuning': {', '.join(unknown)}"
+                         f" (válidos: {', '.join(types)})")
+    return tuning_class(**{name: _convert(game, name, types[name], value)
+                           for name, value in values.items()})
+
+
+def default_game_config(game, actions, tuning_class):
+    """Configuración de un juego con sus teclas y umbrales por defecto (sin leer archivos)"""
+    return GameConfig(game=game, keys=_compile_keys(game, actions, {}), tuning=tuning_class(), path=None)
+
+
+def load_game_config(game, actions, tuning_class, path=None):
+    """
+    Carga y compila la configuración de un juego.
+
+    Args:
+        game: Nombre del juego (configs/<game>.json)
+        actions: Pares (acción, tecla por defecto) en el orden de sus índices
+        tuning_class: Dataclass con los umbrales del juego y sus valores por defecto
+        path: Archivo a cargar en lugar del del juego (debe existir)
+
+    Returns:
+        GameConfig con la tabla de teclas y los umbrales
+
+    Raises:
+        ValueError: Si el archivo no es válido
+    """
+    explicit = path is not None
+    path = path or config_path(game)
+    data = {}
+    if os.path.exists(path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{game}: {path} no es un JSON válido: {e}") from e
+        if not isinstance(data, dict):
+            raise ValueError(f"{game}: {path} debe contener un objeto JSON")
+    elif explicit:
+        raise ValueError(f"{game}: no existe el archivo de configuración {path}")
+
+    unknown = sorted(set(data) - set(SECTIONS))
+    if unknown:
+        raise ValueError(f"{game}: secciones desconocidas en {path}: {', '.join(unknown)}"
+                         f" (válidas: {', '.join(SECTIONS)})")
+    for section in SECTIONS:
+        if not isinstance(data.get(section, {}), dict):
+            raise ValueError(f"{game}: la sección '{section}' de {path} debe ser un objeto")
+
+    return GameConfig(game=game,
+                      keys=_compile_keys(game, actions, data.get('keys', {})),
+                      tuning=_compile_tuning(game, tuning_class, data.get('tuning', {})),
+                      path=path if data else None)
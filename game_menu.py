@@ -18,6 +18,7 @@ Requirements:
 
 import os
 import sys
+import json
 import cv2
 import time
 import subprocess
@@ -25,11 +26,57 @@ import tkinter as tk
 from tkinter import ttk, messagebox, font
 import importlib.util
 import threading
+import queue
 from PIL import Image, ImageTk
 
 # Import camera detection utility
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from camera_detector import list_available_cameras, test_camera_view
+from camera_detector import iter_available_cameras, test_camera_view
+from thumbnail_cache import load_thumbnail
+from camera_thumbnails import CameraThumbnailWorker, THUMBNAIL_SIZE
+from controller_pool import ControllerPool
+
+# Menu settings kept between sessions (last used camera)
+SETTINGS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "menu_settings.json")
+
+# Frames of the spinner shown while cameras are being detected
+SPINNER_FRAMES = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
+
+def load_menu_settings():
+    """Load the saved menu settings (empty if there are none or they cannot be read)"""
+    try:
+        with open(SETTINGS_PATH, encoding='utf-8') as f:
+            settings = json.load(f)
+        return settings if isinstance(settings, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def save_menu_settings(settings):
+    """Save the menu settings (errors are only reported, the menu keeps working)"""
+    try:
+        os.makedirs(os.path.dirname(SETTINGS_PATH), exist_ok=True)
+        with open(SETTINGS_PATH, 'w', encoding='utf-8') as f:
+            json.dump(settings, f, indent=2)
+    except OSError as e:
+        print(f"Could not save menu settings: {e}")
+
+# Game controller scripts launched from the menu (one pre-loaded process each)
+CONTROLLER_SCRIPTS = [
+    'arcade_1942_mouse_controller.py',
+    'geometry_dash_hand_controller.py',
+    'subway_surfers_pose_detection.py',
+]
+
+# Supervision of the launched games
+STOP_GRACE_MS = 3000           # Time a game has to exit after "stop" before it is terminated
+STATS_TIMEOUT = 3.0            # Seconds without stats before a game is shown as not responding
+HIGH_CPU_PERCENT = 90          # CPU usage (% of one core) shown as a warning
+
+# Responsive layout of the game cards (pixels)
+CARD_MIN_WIDTH = 220            # Narrowest card before dropping a column
+CARDS_HORIZONTAL_PADDING = 110  # Panel paddings, borders and scrollbar around the cards
+CARD_TEXT_MARGIN = 110          # Icon, paddings and margins next to the description
+CARD_MIN_WRAPLENGTH = 120       # Narrowest description wrap
 
 class ComputerVisionGamesMenu:
     """Main menu interface for the Computer Vision Games project"""        
@@ -79,6 +126,20 @@ class ComputerVisionGamesMenu:
         # Store available cameras
         self.cameras = []
         self.selected_camera = tk.IntVar(value=0)
+        self.camera_scan_running = False
+        self.camera_selected_by_user = False
+        
+        # Live camera thumbnails (one PhotoImage per camera, reused for every frame)
+        self.camera_tiles = {}
+        self.thumbnail_worker = None
+        self.previews_hidden = False    # Stopped because the window was minimized
+        
+        # Settings from previous sessions (last used camera is selected by default)
+        self.settings = load_menu_settings()
+        
+        # Calls from background threads are run on the Tk main thread
+        self.ui_queue = queue.Queue()
+        self.root.after(50, self._process_ui_queue)
         
         # Load and store images
         self.load_images()
@@ -94,6 +155,17 @@ class ComputerVisionGamesMenu:
         
         # Create footer
         self.create_footer()
+        
+        # Pre-loaded controller processes (started once the menu is on screen)
+        self.controller_pool = ControllerPool(
+            [os.path.splitext(script)[0] for script in CONTROLLER_SCRIPTS],
+            on_event=lambda handle, event, data: self.post_to_ui(self.on_controller_event, handle, event, data)
+        )
+        self.root.after(300, self.controller_pool.start)
+        
+        # Supervisor of the launched games: controller process -> its row in the footer
+        self.running_games = {}
+        self.root.after(1000, self.refresh_running_games)
           # Load available cameras
         self.load_cameras()
         
@@ -128,7 +200,7 @@ class ComputerVisionGamesMenu:
                             ('pressed', '#000000')])  # Keep black when pressed
     
     def load_images(self):
-        """Load and resize images for the interface"""
+        """Create placeholder images and load the real ones in a background thread"""
         self.images = {}
         img_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "imgs")
         
@@ -139,29 +211,56 @@ class ComputerVisionGamesMenu:
             'subway_surfers': ('subway_surfers_icon.png', 'subway_surfers_wallpaper.jpg')
         }
         
+        # (image key, source path, size) of every variant the interface needs
+        pending = []
         for game, (icon_file, wallpaper_file) in image_files.items():
+            # Icon (square format)
+            icon_path = os.path.join(img_dir, icon_file)
+            if os.path.exists(icon_path):
+                pending.append((f'{game}_icon', icon_path, (64, 64)))
+            
+            # Wallpaper (for background or card backgrounds) and a smaller version for cards
+            wallpaper_path = os.path.join(img_dir, wallpaper_file)
+            if os.path.exists(wallpaper_path):
+                pending.append((f'{game}_wallpaper', wallpaper_path, (300, 150)))
+                pending.append((f'{game}_card', wallpaper_path, (200, 120)))
+        
+        # Placeholders with the card color so the window can be painted right away;
+        # the real images are pasted into them when they are ready
+        for key, _, size in pending:
+            placeholder = Image.new('RGBA', size, self.colors['accent'])
+            self.images[key] = ImageTk.PhotoImage(placeholder)
+        
+        threading.Thread(target=self._load_images_worker, args=(pending,), daemon=True).start()
+    
+    def _load_images_worker(self, pending):
+        """Decode the images (from the thumbnail cache when possible) off the Tk main thread"""
+        for key, path, size in pending:
             try:
-                # Load icon (square format)
-                icon_path = os.path.join(img_dir, icon_file)
-                if os.path.exists(icon_path):
-                    icon_img = Image.open(icon_path)
-                    icon_img = icon_img.resize((64, 64), Image.Resampling.LANCZOS)
-                    self.images[f'{game}_icon'] = ImageTk.PhotoImage(icon_img)
-                
-                # Load wallpaper (for background or card backgrounds)
-                wallpaper_path = os.path.join(img_dir, wallpaper_file)
-                if os.path.exists(wallpaper_path):
-                    wallpaper_img = Image.open(wallpaper_path)
-                    wallpaper_img = wallpaper_img.resize((300, 150), Image.Resampling.LANCZOS)
-                    self.images[f'{game}_wallpaper'] = ImageTk.PhotoImage(wallpaper_img)
-                    
-                    # Create a smaller version for cards
-                    card_img = Image.open(wallpaper_path)
-                    card_img = card_img.resize((200, 120), Image.Resampling.LANCZOS)
-                    self.images[f'{game}_card'] = ImageTk.PhotoImage(card_img)
-                    
+                image = load_thumbnail(path, size)
+                if image.mode not in ('RGB', 'RGBA'):
+                    image = image.convert('RGBA')
+                self.post_to_ui(self._show_loaded_image, key, image)
             except Exception as e:
-                print(f"Could not load image for {game}: {e}")
+                print(f"Could not load image {os.path.basename(path)}: {e}")
+    
+    def _show_loaded_image(self, key, image):
+        """Paste a loaded image into its placeholder (Tk main thread)"""
+        self.images[key].paste(image)
+    
+    def post_to_ui(self, callback, *args):
+        """Queue a call to run on the Tk main thread (safe to call from any thread)"""
+        self.ui_queue.put((callback, args))
+    
+    def _process_ui_queue(self):
+        """Run the calls queued by background threads"""
+        try:
+            while True:
+                callback, args = self.ui_queue.get_nowait()
+                callback(*args)
+        except queue.Empty:
+            pass
+        self.root.after(50, self._process_ui_queue)
     
     def create_scrollable_canvas(self):
         """Create a scrollable canvas for responsive design"""
@@ -261,6 +360,12 @@ class ComputerVisionGamesMenu:
                               font=('Segoe UI', 10, 'bold'))
         camera_label.pack(anchor=tk.W, pady=(0, 8))
         
+        # Camera detection progress (spinner while the cameras are being detected)
+        self.camera_status_label = tk.Label(selection_frame, text="",
+                                          bg=self.colors['secondary'], fg=self.colors['text_secondary'],
+                                          font=('Segoe UI', 9))
+        self.camera_status_label.pack(anchor=tk.W, pady=(0, 4))
+        
         # Custom listbox with better styling
         listbox_frame = tk.Frame(selection_frame, bg=self.colors['accent'], relief='flat', bd=1)
         listbox_frame.pack(fill=tk.X, pady=(0, 15))
@@ -272,6 +377,11 @@ class ComputerVisionGamesMenu:
                                        font=('Segoe UI', 9),
                                        relief='flat', bd=0)
         self.camera_listbox.pack(fill=tk.X, padx=2, pady=2)
+        self.camera_listbox.bind('<<ListboxSelect>>', self.on_camera_selected)
+        
+        # Live thumbnails of the detected cameras (click to select)
+        self.camera_thumbs_frame = tk.Frame(selection_frame, bg=self.colors['secondary'])
+        self.camera_thumbs_frame.pack(fill=tk.X)
         
         # Button container
         button_frame = tk.Frame(camera_frame, bg=self.colors['secondary'])
@@ -302,6 +412,7 @@ class ComputerVisionGamesMenu:
                 'name': 'Arcade 1942',
                 'description': 'Controla el clásico juego de disparos con gestos intuitivos de las manos',
                 'image_key': 'arcade_1942',
+                'script': 'arcade_1942_mouse_controller.py',
                 'command': self.launch_arcade_1942,
                 'color': '#ff6b6b'
             },
@@ -309,6 +420,7 @@ class ComputerVisionGamesMenu:
                 'name': 'Geometry Dash',
                 'description': 'Navega por el juego de plataformas rítmico usando movimientos precisos de las manos',
                 'image_key': 'geometry_dash',
+                'script': 'geometry_dash_hand_controller.py',
                 'command': self.launch_geometry_dash,
                 'color': '#4ecdc4'
             },
@@ -316,45 +428,93 @@ class ComputerVisionGamesMenu:
                 'name': 'Subway Surfers',
                 'description': 'Controla el juego de correr infinito con detección de poses de todo el cuerpo',
                 'image_key': 'subway_surfers',
+                'script': 'subway_surfers_pose_detection.py',
                 'command': self.launch_subway_surfers,
                 'color': '#45b7d1'
             }
         ]
         
+        # Fonts shared by all the cards (created once, not on every relayout)
+        self.card_title_font = font.Font(family="Segoe UI", size=14, weight="bold")
+        self.card_desc_font = font.Font(family="Segoe UI", size=8)
+        
+        # Card widgets are created once and only re-gridded or re-wrapped on resize
+        self.game_cards = []
+        self.layout_columns = None
+        self.layout_wraplength = None
+        self.layout_width = None
+        self.relayout_job = None
+        
         # Create responsive layout
         self.create_responsive_layout()
         
-        # Bind window resize event for responsive behavior        self.root.bind('<Configure>', self.on_responsive_resize)        
+        # Bind window resize event for responsive behavior
+        self.root.bind('<Configure>', self.on_responsive_resize)
+        
+        # Release the cameras while the thumbnails cannot be seen
+        self.root.bind('<Unmap>', self.on_menu_hidden)
+        self.root.bind('<Map>', self.on_menu_shown)
+        
     def create_responsive_layout(self):
-        """Create compact layout with 3 games in a row for 1024x768"""
-        # Clear any existing game cards
-        for widget in self.games_container.winfo_children():
-            widget.destroy()
-        
-        # 3 columns layout - one game per column for compact design
-        cols = 3
-        
-        # Create game cards in 3-column grid (all in one row)
-        for i, game in enumerate(self.games_data):
-            row = 0  # All games in first row
-            col = i  # Each game gets its own column
-            self.create_game_card(self.games_container, game, row, col)
-        
-        # Configure grid weights for optimal spacing
-        for i in range(cols):
-            self.games_container.columnconfigure(i, weight=1)
+        """Create the game cards (only once) and fit them to the current window width"""
+        if not self.game_cards:
+            for i, game in enumerate(self.games_data):
+                self.game_cards.append(self.create_game_card(self.games_container, game, 0, i))
+            
+            # Configure row weight
+            self.games_container.rowconfigure(0, weight=1)
+        
+        self.update_responsive_layout()
+    
+    def update_responsive_layout(self):
+        """Re-grid and re-wrap the existing cards for the current width (no widgets are created)"""
+        self.relayout_job = None
+        
+        width = self.canvas.winfo_width()
+        if width <= 1:
+            # The window has not been mapped yet: keep the compact 3-column layout
+            width = 1024
+        
+        # Width left for the cards once the panel paddings are removed
+        available = max(width - CARDS_HORIZONTAL_PADDING, CARD_MIN_WIDTH)
+        
+        # As many columns as fit (3 games in a row for 1024x768)
+        cols = max(1, min(len(self.game_cards), available // CARD_MIN_WIDTH))
+        if cols != self.layout_columns:
+            for i, card in enumerate(self.game_cards):
+                card['frame'].grid(row=i // cols, column=i % cols)
             
-        # Configure row weight
-        self.games_container.rowconfigure(0, weight=1)        
+            # Configure grid weights for optimal spacing
+            for i in range(len(self.game_cards)):
+                self.games_container.columnconfigure(i, weight=1 if i < cols else 0)
+            self.layout_columns = cols
+        
+        # Wrap the descriptions to the space left next to the icon
+        wraplength = max(available // cols - CARD_TEXT_MARGIN, CARD_MIN_WRAPLENGTH)
+        if wraplength != self.layout_wraplength:
+            for card in self.game_cards:
+                card['desc_label'].configure(wraplength=wraplength)
+            self.layout_wraplength = wraplength
+    
     def on_responsive_resize(self, event):
-        """Handle window resize - maintain optimal layout"""
-        # Only respond to root window resize events
-        if event.widget == self.root:
-            # Maintain the 3-column layout for consistency
-            self.root.after(100, self.create_responsive_layout)
+        """Handle window resize - coalesce the events into a single pending relayout"""
+        # Only respond to root window resize events that change the width
+        if event.widget != self.root or event.width == self.layout_width:
+            return
+        self.layout_width = event.width
+        
+        if self.relayout_job is not None:
+            self.root.after_cancel(self.relayout_job)
+        self.relayout_job = self.root.after(100, self.update_responsive_layout)
     
     def create_game_card(self, parent, game_data, row, col):
-        """Create a compact game card optimized for 3-column layout"""
+        """
+        Create a compact game card optimized for 3-column layout
+        
+        Returns:
+            dict with the card frame, the description label (updated on resize)
+            and the label with the launch time
+        """
         # Card frame with responsive behavior - more compact padding
         card_frame = tk.Frame(parent, bg=self.colors['accent'], relief='flat', bd=1)
         card_frame.grid(row=row, column=col, padx=5, pady=8, sticky="nsew")
@@ -382,15 +542,13 @@ class ComputerVisionGamesMenu:
         text_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
         # Game title
-        title_font = font.Font(family="Segoe UI", size=14, weight="bold")
         title_label = tk.Label(text_frame, text=game_data['name'], 
-                             font=title_font, bg=self.colors['accent'], 
+                             font=self.card_title_font, bg=self.colors['accent'], 
                              fg=self.colors['text_primary'], anchor=tk.W)
         title_label.pack(fill=tk.X)
           # Game description - more compact for 3-column layout
-        desc_font = font.Font(family="Segoe UI", size=8)
         desc_label = tk.Label(text_frame, text=game_data['description'], 
-                            font=desc_font, bg=self.colors['accent'], 
+                            font=self.card_desc_font, bg=self.colors['accent'], 
                             fg=self.colors['text_secondary'], 
                             wraplength=180, justify=tk.LEFT, anchor=tk.W)
         desc_label.pack(fill=tk.X, pady=(3, 0))
@@ -409,6 +567,14 @@ class ComputerVisionGamesMenu:
         launch_btn = ttk.Button(content_frame, text=f"🚀 Lanzar {game_data['name']}", 
                                command=game_data['command'], style='Game.TButton')
         launch_btn.pack(fill=tk.X, pady=(8, 0))
+        
+        # Time from the click to the first controlled frame of the last launch
+        launch_info_label = tk.Label(content_frame, text="", font=('Segoe UI', 8),
+                                   bg=self.colors['accent'], fg=self.colors['text_secondary'])
+        launch_info_label.pack(fill=tk.X, pady=(4, 0))
+        
+        return {'frame': card_frame, 'desc_label': desc_label,
+                'script': game_data['script'], 'launch_info_label': launch_info_label}
     def create_footer(self):
         """Create the footer with credits and exit button"""
         footer_frame = tk.Frame(self.scrollable_frame, bg=self.colors['secondary'], padx=30, pady=20)
@@ -431,6 +597,16 @@ class ComputerVisionGamesMenu:
                                fg=self.colors['text_secondary'])
         version_label.pack(anchor=tk.W)
         
+        # Status of the launched games (replaces the blocking launch dialog)
+        self.status_label = tk.Label(credits_frame, text="",
+                                   font=('Segoe UI', 9), bg=self.colors['secondary'], 
+                                   fg=self.colors['success'], anchor=tk.W, justify=tk.LEFT)
+        self.status_label.pack(anchor=tk.W, pady=(6, 0))
+        
+        # Running games with their live stats and stop/restart buttons
+        self.running_games_frame = tk.Frame(credits_frame, bg=self.colors['secondary'])
+        self.running_games_frame.pack(anchor=tk.W, fill=tk.X)
+        
         # Button container
         button_frame = tk.Frame(footer_frame, bg=self.colors['secondary'])
         button_frame.pack(side=tk.RIGHT)
@@ -440,20 +616,157 @@ class ComputerVisionGamesMenu:
         exit_btn.pack()
         
     def load_cameras(self):
-        """Load all available cameras and update the UI"""
+        """Detect the available cameras in a background thread and add them to the UI as they are found"""
+        if self.camera_scan_running:
+            return
+        self.camera_scan_running = True
+        self.camera_selected_by_user = False
+        
+        # The detection needs the devices: release them from the thumbnails first
+        self.stop_camera_previews()
+        for tile in self.camera_tiles.values():
+            tile['frame'].destroy()
+        self.camera_tiles = {}
+        
+        self.cameras = []
         self.camera_listbox.delete(0, tk.END)
         
-        # Get available cameras
-        self.cameras = list_available_cameras()
+        self.animate_camera_spinner(0)
+        threading.Thread(target=self._camera_scan_worker, daemon=True).start()
+    
+    def _camera_scan_worker(self):
+        """Open the camera devices off the Tk main thread"""
+        try:
+            for cam_id in iter_available_cameras():
+                self.post_to_ui(self.add_camera, cam_id)
+        except Exception as e:
+            print(f"Error detecting cameras: {e}")
+        finally:
+            self.post_to_ui(self.finish_camera_scan)
+    
+    def add_camera(self, cam_id):
+        """Add a detected camera to the list"""
+        self.cameras.append(cam_id)
+        self.camera_listbox.insert(tk.END, f"Camera {cam_id}")
+        
+        # Select the last used camera, or the first one found until it appears,
+        # unless the user already picked one
+        if not self.camera_selected_by_user and (len(self.cameras) == 1 or
+                                                 cam_id == self.settings.get('last_camera')):
+            self.camera_listbox.selection_clear(0, tk.END)
+            self.camera_listbox.selection_set(len(self.cameras) - 1)
+            self.camera_listbox.see(len(self.cameras) - 1)
+    
+    def finish_camera_scan(self):
+        """Stop the spinner and show the result of the detection"""
+        self.camera_scan_running = False
         
         if not self.cameras:
             self.camera_listbox.insert(tk.END, "No se detectaron cámaras")
+            self.camera_status_label.config(text="")
         else:
-            for idx, cam_id in enumerate(self.cameras):
-                self.camera_listbox.insert(tk.END, f"Camera {cam_id}")
-            
-            # Select the first camera by default
-            self.camera_listbox.selection_set(0)
+            self.camera_status_label.config(text=f"✔ Cámaras detectadas: {len(self.cameras)}")
+            self.start_camera_previews()
+    
+    def animate_camera_spinner(self, step):
+        """Animate the spinner while the cameras are being detected"""
+        if not self.camera_scan_running:
+            return
+        frame = SPINNER_FRAMES[step % len(SPINNER_FRAMES)]
+        self.camera_status_label.config(text=f"{frame} Buscando cámaras...")
+        self.root.after(100, self.animate_camera_spinner, step + 1)
+    
+    def create_camera_tile(self, cam_id):
+        """Create the thumbnail tile of a camera"""
+        tile_frame = tk.Frame(self.camera_thumbs_frame, bg=self.colors['accent'], padx=3, pady=3)
+        tile_frame.pack(side=tk.LEFT, padx=(0, 8), pady=(0, 10))
+        
+        photo = ImageTk.PhotoImage(Image.new('RGB', THUMBNAIL_SIZE, self.colors['primary']))
+        image_label = tk.Label(tile_frame, image=photo, bg=self.colors['accent'], cursor='hand2')
+        image_label.pack()
+        
+        caption = tk.Label(tile_frame, text=f"Camera {cam_id}", font=('Segoe UI', 8),
+                         bg=self.colors['accent'], fg=self.colors['text_secondary'])
+        caption.pack()
+        
+        for widget in (tile_frame, image_label, caption):
+            widget.bind('<Button-1>', lambda event, cam_id=cam_id: self.select_camera(cam_id))
+        
+        self.camera_tiles[cam_id] = {'frame': tile_frame, 'photo': photo}
+    
+    def start_camera_previews(self):
+        """Start the live thumbnails of the detected cameras"""
+        self.stop_camera_previews()
+        for cam_id in self.cameras:
+            if cam_id not in self.camera_tiles:
+                self.create_camera_tile(cam_id)
+        
+        # A single worker for the whole menu: it never runs two threads on the same cameras
+        if self.thumbnail_worker is None:
+            self.thumbnail_worker = CameraThumbnailWorker(
+                self.cameras,
+                on_frame=lambda cam_id, image: self.post_to_ui(self.show_camera_thumbnail, cam_id, image)
+            )
+        if self.root.state() == 'iconic':
+            self.previews_hidden = True
+            return
+        self.thumbnail_worker.start(self.cameras)
+    
+    def stop_camera_previews(self):
+        """Stop the live thumbnails and release the camera devices"""
+        if self.thumbnail_worker is not None:
+            self.thumbnail_worker.stop()
+    
+    def show_camera_thumbnail(self, cam_id, image):
+        """Paste a new thumbnail into the tile's PhotoImage (Tk main thread)"""
+        tile = self.camera_tiles.get(cam_id)
+        if tile is not None and self.thumbnail_worker is not None and self.thumbnail_worker.running:
+            tile['photo'].paste(image)
+    
+    def select_camera(self, cam_id):
+        """Select a camera in the list (from its thumbnail)"""
+        if cam_id not in self.cameras:
+            return
+        index = self.cameras.index(cam_id)
+        self.camera_listbox.selection_clear(0, tk.END)
+        self.camera_listbox.selection_set(index)
+        self.camera_listbox.see(index)
+        self.camera_selected_by_user = True
+    
+    def on_camera_selected(self, event):
+        """Remember that the user picked a camera so the detection does not change it"""
+        self.camera_selected_by_user = True
+    
+    def on_menu_hidden(self, event):
+        """Stop the thumbnails while the menu is minimized"""
+        if event.widget is not self.root:
+            return
+        if self.thumbnail_worker is not None and self.thumbnail_worker.running:
+            self.stop_camera_previews()
+            self.previews_hidden = True
+    
+    def on_menu_shown(self, event):
+        """Resume the thumbnails stopped by on_menu_hidden"""
+        if event.widget is not self.root or not self.previews_hidden:
+            return
+        self.previews_hidden = False
+        if not self.camera_scan_running:
+            self.start_camera_previews()
+    
+    def pause_camera_previews(self):
+        """Release the cameras for a game or a test (refreshing the cameras resumes the thumbnails)"""
+        self.previews_hidden = False
+        if self.thumbnail_worker is None or not self.thumbnail_worker.running:
+            return
+        self.stop_camera_previews()
+        self.camera_status_label.config(
+            text="⏸ Vista previa en pausa - pulsa 'Actualizar Cámaras' para reanudarla")
+    
+    def remember_camera(self, camera_id):
+        """Save the camera as the default for the next session"""
+        if self.settings.get('last_camera') != camera_id:
+            self.settings['last_camera'] = camera_id
+            save_menu_settings(self.settings)
     
     def get_selected_camera_id(self):
         """Get the ID of the currently selected camera"""
@@ -473,9 +786,30 @@ class ComputerVisionGamesMenu:
         """Test the currently selected camera"""
         camera_id = self.get_selected_camera_id()
         if camera_id is not None:
+            self.remember_camera(camera_id)
+            
+            # The test window needs the device: release it from the thumbnails
+            self.pause_camera_previews()
+            
             # Run the camera test in a separate thread to avoid freezing the UI
             threading.Thread(target=test_camera_view, args=(camera_id,), daemon=True).start()
     
+    def set_status(self, text, color=None):
+        """Show a message in the footer status line"""
+        self.status_label.config(text=text, fg=color or self.colors['success'])
+    
+    def game_name(self, script_name):
+        """Name shown for a game controller script"""
+        for game in self.games_data:
+            if game['script'] == script_name:
+                return game['name']
+        return script_name
+    
+    def build_game_arguments(self, script_name, camera_id):
+        """Command line arguments of a game controller for the selected camera"""
+        # Every controller shares the command line of controller_pipeline
+        return ["--play", "--camera", str(camera_id)]
+    
     def launch_game(self, script_name, message):
         """Launch a game script with the selected camera"""
         camera_id = self.get_selected_camera_id()
@@ -487,27 +821,162 @@ class ComputerVisionGamesMenu:
                     messagebox.showerror("Error", f"Script del juego no encontrado: {script_name}")
                     return
                 
-                # Launch the game in a separate process
-                messagebox.showinfo("Lanzando Juego", message)
+                # Warn before sharing a camera with a game that is already running
+                for handle, info in self.running_games.items():
+                    if info['camera_id'] == camera_id and handle.is_alive():
+                        in_use_by = self.game_name(f"{handle.module_name}.py")
+                        if not messagebox.askyesno(
+                                "Cámara en uso",
+                                f"La cámara {camera_id} ya la está usando {in_use_by}.\n"
+                                "¿Quieres lanzar el juego de todas formas?"):
+                            return
+                        break
+                
+                self.remember_camera(camera_id)
+                
+                # The game needs the camera: release the devices used by the thumbnails
+                self.pause_camera_previews()
                 
                 # Handle different parameter structures for different games
-                command = [sys.executable, script_path]
+                arguments = self.build_game_arguments(script_name, camera_id)
                 
-                # Special handling for arcade_1942_mouse_controller.py which requires different parameter format
-                if "arcade_1942_mouse_controller.py" in script_name:
-                    command.extend(["--play", f"--camera={str(camera_id)}"])
-                # Special handling for subway_surfers_pose_detection.py which doesn't accept camera parameter
-                elif "subway_surfers_pose_detection.py" in script_name:
-                    command.extend(["--play"])
-                # Default handling for other games (geometry dash, etc.)
+                # Use the pre-loaded controller process (imports already done)
+                handle = self.controller_pool.launch(os.path.splitext(script_name)[0], arguments)
+                if handle is None:
+                    # Without the pool, launch the game in a separate process as a script
+                    self.launch_game_process(script_path, arguments)
                 else:
-                    command.extend(["--play", "--camera", str(camera_id)])
+                    self.add_running_game(handle, camera_id)
                 
-                # Run the game script with the appropriate parameters
-                subprocess.Popen(command)
+                self.set_status(message)
                 
             except Exception as e:
-                messagebox.showerror("Error", f"Falló al lanzar el juego: {str(e)}")        
+                messagebox.showerror("Error", f"Falló al lanzar el juego: {str(e)}")
+    
+    def launch_game_process(self, script_path, arguments):
+        """Launch a game script in a new interpreter (fallback when the pool cannot be used)"""
+        subprocess.Popen([sys.executable, script_path] + arguments)
+    
+    def on_controller_event(self, handle, event, data):
+        """Handle an event from a controller process (Tk main thread)"""
+        if not handle.launched:
+            # Pre-loaded processes waiting for a launch
+            if event == 'error':
+                print(f"Could not preload {handle.module_name}: {data.get('message')}")
+            return
+        
+        script_name = f"{handle.module_name}.py"
+        name = self.game_name(script_name)
+        
+        if event == 'stats':
+            self.update_running_game(handle, data)
+        elif event == 'first_frame':
+            elapsed = time.perf_counter() - handle.launched_at
+            self.set_status(f"✔ {name}: primer frame controlado en {elapsed:.2f} s")
+            for card in self.game_cards:
+                if card['script'] == script_name:
+                    card['launch_info_label'].config(text=f"⏱ Primer frame: {elapsed:.2f} s")
+        elif event == 'error':
+            # The controller could not be pre-loaded: launch it as a script (without supervision)
+            self.remove_running_game(handle)
+            script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), script_name)
+            self.launch_game_process(script_path, handle.argv)
+        elif event == 'exit':
+            info = self.remove_running_game(handle)
+            if info is not None and info['restart']:
+                self.relaunch_game(handle, info['camera_id'])
+            elif handle.ready:
+                self.set_status(f"{name} finalizado", self.colors['text_secondary'])
+    
+    def add_running_game(self, handle, camera_id):
+        """Add a launched game to the supervisor with its stats row in the footer"""
+        row = tk.Frame(self.running_games_frame, bg=self.colors['secondary'])
+        row.pack(anchor=tk.W, fill=tk.X, pady=(4, 0))
+        
+        name = self.game_name(f"{handle.module_name}.py")
+        stats_label = tk.Label(row, text=f"▶ {name} (PID {handle.pid}) · iniciando...",
+                             font=('Segoe UI', 9), bg=self.colors['secondary'],
+                             fg=self.colors['text_secondary'], anchor=tk.W)
+        stats_label.pack(side=tk.LEFT)
+        
+        stop_btn = ttk.Button(row, text="⏹ Detener", style='Small.TButton',
+                            command=lambda: self.stop_game(handle))
+        stop_btn.pack(side=tk.LEFT, padx=(10, 4))
+        restart_btn = ttk.Button(row, text="🔄 Reiniciar", style='Small.TButton',
+                               command=lambda: self.restart_game(handle))
+        restart_btn.pack(side=tk.LEFT)
+        
+        self.running_games[handle] = {
+            'row': row,
+            'stats_label': stats_label,
+            'camera_id': camera_id,
+            'last_stats': time.perf_counter(),
+            'restart': False,
+            'stopping': False,
+        }
+    
+    def remove_running_game(self, handle):
+        """Remove a game from the supervisor (returns its supervisor info, if it had any)"""
+        info = self.running_games.pop(handle, None)
+        if info is not None:
+            info['row'].destroy()
+        return info
+    
+    def update_running_game(self, handle, stats):
+        """Show the stats reported by a running game"""
+        info = self.running_games.get(handle)
+        if info is None:
+            return
+        info['last_stats'] = time.perf_counter()
+        
+        name = self.game_name(f"{handle.module_name}.py")
+        text = f"▶ {name} (PID {handle.pid}) · {stats['fps']:.1f} FPS · CPU {stats['cpu']:.0f}%"
+        if stats.get('rss') is not None:
+            text += f" · RAM {stats['rss'] / (1024 * 1024):.0f} MB"
+        if info['stopping']:
+            text += " · deteniendo..."
+        
+        color = self.colors['warning'] if stats['cpu'] >= HIGH_CPU_PERCENT else self.colors['text_primary']
+        info['stats_label'].config(text=text, fg=color)
+    
+    def refresh_running_games(self):
+        """Flag the games that stopped reporting stats (stuck or frozen)"""
+        now = time.perf_counter()
+        for handle, info in self.running_games.items():
+            if now - info['last_stats'] > STATS_TIMEOUT:
+                name = self.game_name(f"{handle.module_name}.py")
+                info['stats_label'].config(text=f"⚠ {name} (PID {handle.pid}) · sin respuesta",
+                                           fg=self.colors['error'])
+        self.root.after(1000, self.refresh_running_games)
+    
+    def stop_game(self, handle):
+        """Ask a running game to exit and terminate it if it does not within the grace period"""
+        info = self.running_games.get(handle)
+        if info is None or info['stopping']:
+            return
+        info['stopping'] = True
+        
+        handle.request_stop()
+        self.root.after(STOP_GRACE_MS, handle.terminate)
+    
+    def restart_game(self, handle):
+        """Stop a running game and launch it again with the same camera and options"""
+        info = self.running_games.get(handle)
+        if info is None:
+            return
+        info['restart'] = True
+        self.stop_game(handle)
+    
+    def relaunch_game(self, handle, camera_id):
+        """Launch again a game that was restarted"""
+        name = self.game_name(f"{handle.module_name}.py")
+        new_handle = self.controller_pool.launch(handle.module_name, handle.argv)
+        if new_handle is None:
+            self.set_status(f"No se pudo reiniciar {name}", self.colors['error'])
+            return
+        self.add_running_game(new_handle, camera_id)
+        self.set_status(f"Reiniciando {name}...")
+    
     def launch_arcade_1942(self):
         """Launch the Arcade 1942 game controller"""
         self.launch_game(
@@ -532,6 +1001,11 @@ def main():
     root = tk.Tk()
     app = ComputerVisionGamesMenu(root)
     root.mainloop()
+    
+    # Release the cameras used by the thumbnails and the pre-loaded controllers
+    # (the games that are still running keep working on their own)
+    app.stop_camera_previews()
+    app.controller_pool.shutdown()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
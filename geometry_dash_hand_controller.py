@@ -22,9 +22,15 @@ import time
 import pyautogui
 import numpy as np
 import mediapipe as mp
-import argparse
-import webbrowser
 from collections import deque
+from dataclasses import dataclass
+
+from controller_runtime import DEFAULT_PREVIEW_FPS, DEFAULT_PREVIEW_SCALE
+from controller_pipeline import (GamePlugin, run_pipeline, find_camera, create_parser,
+                                 start_instrumentation, play_arguments, no_arguments)
+from game_config import load_game_config, default_game_config
+from hud_overlay import text_layer
+from stage_profiler import profiler
 
 # Configuración para máxima velocidad de respuesta
 pyautogui.PAUSE = 0.0  # Eliminar el retraso entre comandos de PyAutoGUI
@@ -44,41 +50,66 @@ hands = mp_hands.Hands(
     min_tracking_confidence=0.5,
     max_num_hands=1)  # Solo necesitamos una mano para mayor rendimiento
 
-# Historial para suavizado de gestos (evita falsos positivos)
-GESTURE_HISTORY_LENGTH = 3  # Pequeño para mantener la velocidad pero filtrar ruido
-DEBOUNCE_TIME = 0.05  # 50ms de debounce para evitar múltiples activaciones
+# Acciones del juego con su tecla por defecto (la posición es su índice en la tabla de teclas)
+ACTIONS = (('jump', 'space'),)
+JUMP = 0
+
+@dataclass(frozen=True, slots=True)
+class GeometryDashTuning:
+    """Umbrales de los gestos de Geometry Dash (se ajustan en configs/geometry_dash.json)"""
+    pinch_distance: float = 30.0      # Distancia máxima pulgar-índice del pellizco (px del frame completo)
+    finger_extended_margin: int = 30  # Margen para considerar un dedo extendido (px)
+    thumb_extended_margin: int = 20   # Margen para considerar el pulgar extendido (px)
+    gesture_history: int = 3          # Historial para suavizado de gestos (evita falsos positivos)
+    debounce: float = 0.05            # Debounce para evitar múltiples activaciones (segundos)
+
+def configure(path=None):
+    """
+    Carga la configuración del juego y compila la tabla de teclas y los umbrales.
+    
+    Args:
+        path: Archivo JSON a usar en lugar de configs/geometry_dash.json
+    """
+    return _use_config(load_game_config('geometry_dash', ACTIONS, GeometryDashTuning, path))
+
+def _use_config(config):
+    """Aplica una configuración ya compilada a las tablas del módulo"""
+    global CONFIG, KEYS, TUNING
+    CONFIG = config
+    KEYS, TUNING = CONFIG.keys, CONFIG.tuning
+    return CONFIG
 
-def try_available_cameras():
-    """Intenta encontrar cámaras disponibles y devuelve el índice de la primera que funciona"""
-    print("Buscando cámaras disponibles...")
-    
-    # Usar directamente la cámara 3 que sabemos que funciona
-    print("Usando cámara con índice 3 (confirmada)")
-    return 3
-    
-    # Código de respaldo que no se ejecutará
-    max_cameras_to_try = 10
-    for i in range(max_cameras_to_try):
-        print(f"Intentando con cámara {i}...")
-        cap = cv2.VideoCapture(i)
-        if cap.isOpened():
-            ret, frame = cap.read()
-            if ret:
-                print(f"¡Cámara encontrada! Índice: {i}")
-                cap.release()
-                return i
-            cap.release()
-    print("No se encontró ninguna cámara disponible.")
-    return -1
+# Valores por defecto al importar; main() lee configs/geometry_dash.json
+_use_config(default_game_config('geometry_dash', ACTIONS, GeometryDashTuning))
 
-def process_frame(frame):
-    """Preprocesa el frame para acelerar la detección de manos"""
+# Textos fijos del HUD pre-renderizados (se rasterizan una vez y solo se componen en cada frame)
+HUD_INSTRUCTIONS = text_layer("Pellizco (pulgar e índice): Saltar", lambda w, h: (w - 280, 30),
+                              cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+HUD_JUMP = text_layer("JUMP!", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 3)
+HUD_ACTION_JUMP = text_layer("Acción: SALTAR (Espacio)", lambda w, h: (10, h - 70),
+                             cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+HUD_NO_HAND = text_layer("Estado: No se detecta mano", lambda w, h: (10, h - 30),
+                         cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+HUD_HAND_CLOSED = text_layer("Estado: Mano cerrada", lambda w, h: (10, h - 30),
+                             cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+HUD_HAND_OPEN = text_layer("Estado: Mano abierta", lambda w, h: (10, h - 30),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+
+def process_frame(frame, scale=0.5):
+    """
+    Preprocesa el frame para acelerar la detección de manos
+    
+    Args:
+        frame: Frame BGR
+        scale: Escala a la que se reduce (a la mitad por defecto, un buen balance entre velocidad y precisión)
+    """
     # Reducir el tamaño del frame para acelerar el procesamiento
-    # Reducimos a la mitad para un buen balance entre velocidad y precisión
-    small_frame = cv2.resize(frame, (0, 0), fx=0.5, fy=0.5)
+    small_frame = cv2.resize(frame, (0, 0), fx=scale, fy=scale)
+    profiler.lap('resize')
     
     # Convertir a RGB (requerido por MediaPipe)
     rgb_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
+    profiler.lap('cvtColor')
     
     return rgb_frame
 
@@ -97,13 +128,14 @@ def detect_hand_landmarks(frame):
     
     return results
 
-def detect_hand_gesture(results, frame_shape):
+def detect_hand_gesture(results, frame_shape, scale_factor=2.0):
     """
     Detecta gestos específicos de la mano para controlar Geometry Dash.
     
     Args:
         results: Resultados de la detección de manos
         frame_shape: Dimensiones del frame
+        scale_factor: Escala del frame completo respecto a frame_shape (los umbrales están en px del frame completo)
         
     Returns:
         gesture: Gesto detectado ('jump', 'none')
@@ -111,7 +143,7 @@ def detect_hand_gesture(results, frame_shape):
         landmarks_px: Landmarks de la mano en píxeles (si se detectaron)
     """
     height, width = frame_shape[:2]
-    scale_factor = 2.0  # Factor para compensar el frame redimensionado
+    tuning = TUNING
     
     if not results.multi_hand_landmarks:
         return 'none', False, None
@@ -143,14 +175,14 @@ def detect_hand_gesture(results, frame_shape):
     fingers_extended = []
     for i, (tip, base) in enumerate(zip(finger_tips, finger_bases)):
         # Un dedo está extendido si su punta está por encima (Y menor) que su base
-        if tip[1] < base[1] - 30:  # Añadir un umbral de 30px para mayor robustez
+        if tip[1] < base[1] - tuning.finger_extended_margin:  # Umbral para mayor robustez
             fingers_extended.append(True)
         else:
             fingers_extended.append(False)
     
     # Añadir estado del pulgar (el pulgar está extendido si su X es menor que la base del índice para mano derecha)
     thumb_extended = False
-    if thumb_tip[0] < landmarks_px[5][0] - 20:  # Base del índice - umbral
+    if thumb_tip[0] < landmarks_px[5][0] - tuning.thumb_extended_margin:  # Base del índice - umbral
         thumb_extended = True
     
     fingers_extended.insert(0, thumb_extended)
@@ -163,13 +195,52 @@ def detect_hand_gesture(results, frame_shape):
     
     # SALTO: Pellizco (pulgar e índice juntos)
     # La distancia entre la punta del pulgar y la punta del índice debe ser muy pequeña
-    # Umbral reducido a 30 píxeles (era 50) para requerir que estén más juntos
-    if thumb_index_distance < 30:
+    # Umbral pequeño (30 píxeles por defecto) para requerir que estén muy juntos
+    if thumb_index_distance < tuning.pinch_distance:
         return 'jump', hand_closed, landmarks_px
     
     # Sin gesto específico
     return 'none', hand_closed, landmarks_px
 
+class JumpTrigger:
+    """
+    Máquina de estados del salto: pulsa y suelta la tecla de salto según los gestos.
+
+    El salto solo se activa si el pellizco se repite en el historial de gestos (filtra
+    falsos positivos) y ha pasado el debounce desde el salto anterior.
+    """
+    
+    def __init__(self):
+        self.history_length = TUNING.gesture_history
+        self.debounce = TUNING.debounce
+        self.key = KEYS[JUMP]
+        self.gesture_history = deque(['none'] * self.history_length, maxlen=self.history_length)
+        self.last_jump_time = 0
+        self.jump_active = False
+    
+    def update(self, gesture, current_time):
+        """
+        Actualiza el historial con el gesto de un frame y envía la tecla si corresponde.
+        
+        Args:
+            gesture: Gesto detectado en el frame ('jump', 'none')
+            current_time: Instante del frame en segundos
+        """
+        self.gesture_history.append(gesture)
+        
+        # Solo ejecutamos si el mismo gesto se detecta consistentemente
+        if self.gesture_history.count('jump') >= self.history_length - 1:
+            # Verificar debounce para evitar múltiples activaciones
+            if current_time - self.last_jump_time > self.debounce and not self.jump_active:
+                # Presionar la tecla de salto (espacio por defecto)
+                pyautogui.keyDown(self.key)
+                self.jump_active = True
+                self.last_jump_time = current_time
+        elif self.jump_active:
+            # Soltar la tecla de salto cuando no se detecta gesto de salto
+            pyautogui.keyUp(self.key)
+            self.jump_active = False
+
 def calculate_distance(point1, point2):
     """Calcula la distancia euclidiana entre dos puntos"""
     return np.sqrt((point1[0] - point2[0])**2 + (point1[1] - point2[1])**2)
@@ -217,152 +288,114 @@ def draw_hand_landmarks(frame, landmarks_px, gesture):
     
     # Dibujar texto indicando el gesto
     if gesture == 'jump':
-        cv2.putText(output_frame, "JUMP!", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, 
-                    (0, 255, 0), 3)
+        HUD_JUMP.draw(output_frame)
     
     return output_frame
 
-def play_geometry_dash(camera_index=None):
-    """Función principal para jugar Geometry Dash con detección de manos"""
-    try:
-        # Abrir automáticamente la URL de Geometry Dash
-        print("Abriendo Geometry Dash en el navegador...")
-        webbrowser.open("https://geometrygame.org/")
-        
-        # Encontrar una cámara disponible
-        if camera_index is None:
-            camera_index = try_available_cameras()
-        if camera_index == -1:
-            print("Error: No se pudo acceder a ninguna cámara.")
-            return
-        
-        # Inicializar la cámara con resolución reducida para mayor velocidad
-        camera = cv2.VideoCapture(camera_index)
-        camera.set(cv2.CAP_PROP_FRAME_WIDTH, 640)   # Ancho reducido
-        camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)  # Alto reducido
-        camera.set(cv2.CAP_PROP_FPS, 60)  # Intentar mayor FPS si la cámara lo soporta
-        
-        if not camera.isOpened():
-            print(f"Error: No se pudo abrir la cámara con índice {camera_index}")
-            return
+class GeometryDashPlugin(GamePlugin):
+    """
+    Geometry Dash para el bucle común: una mano, pellizco para saltar (tecla espacio).
+    """
+    
+    name = 'geometry_dash'
+    title = 'Geometry Dash'
+    window_title = 'Geometry Dash Hand Controller'
+    url = "https://geometrygame.org/"
+    capture_size = (640, 480)  # Resolución reducida para mayor velocidad
+    capture_fps = 60  # Intentar mayor FPS si la cámara lo soporta
+    inference_scale = 0.5  # Frame reducido a la mitad para el modelo (--autotune puede cambiarlo)
+    
+    def __init__(self):
+        self.jump_trigger = JumpTrigger()
+    
+    def start(self):
+        # Control de gestos y teclas
+        self.jump_trigger = JumpTrigger()
+    
+    def instructions(self, headless):
+        return [
+            "\n============== GEOMETRY DASH HAND CONTROLLER ==============",
+            "CONTROLES SIMPLIFICADOS:",
+            "  - SALTAR (Espacio): Pellizco/pinza con pulgar e índice juntos",
+            "  - Modo headless: Ctrl+C, o ESC/q en la consola para salir" if headless
+            else "  - Presionar ESC en la ventana para salir",
+            "==========================================================\n",
+        ]
+    
+    def preprocess(self, frame):
+        # Preprocesar frame para detección más rápida
+        return process_frame(frame, self.inference_scale)
+    
+    def infer(self, image):
+        return detect_hand_landmarks(image)
+    
+    def detected(self, results):
+        return bool(results.multi_hand_landmarks)
+    
+    def classify(self, results, frame_shape):
+        # Los gestos se miden en px del frame completo, sea cual sea la escala de inferencia
+        return detect_hand_gesture(results, frame_shape, scale_factor=1.0)
+    
+    def act(self, observation, now):
+        # Ejecutar acciones basadas en gestos (historial y debounce del salto)
+        gesture = observation[0]
+        self.jump_trigger.update(gesture, now)
+    
+    def render(self, frame, results, observation, fps):
+        gesture, hand_closed, landmarks_px = observation
         
-        # Crear ventana
-        cv2.namedWindow('Geometry Dash Hand Controller', cv2.WINDOW_NORMAL)
+        # Dibujar landmarks y gestos en el frame
+        if landmarks_px is not None:
+            frame = draw_hand_landmarks(frame, landmarks_px, gesture)
         
-        # Variables para seguimiento de tiempo y FPS
-        prev_time = time.time()
-        fps_history = deque(maxlen=10)
+        # Mostrar FPS en el frame
+        cv2.putText(frame, f"FPS: {int(fps)}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 
+                    1, (0, 255, 0), 2)
         
-        # Variables para el control de gestos y teclas
-        gesture_history = deque(['none'] * GESTURE_HISTORY_LENGTH, maxlen=GESTURE_HISTORY_LENGTH)
-        last_jump_time = 0
-        jump_active = False
+        # Mostrar estado actual
+        if gesture == 'jump':
+            HUD_ACTION_JUMP.draw(frame)
         
-        # Mostrar instrucciones
-        print("\n============== GEOMETRY DASH HAND CONTROLLER ==============")
-        print("CONTROLES SIMPLIFICADOS:")
-        print("  - SALTAR (Espacio): Pellizco/pinza con pulgar e índice juntos")
-        print("  - Presionar ESC en la ventana para salir")
-        print("==========================================================\n")
-        
-        # Bucle principal
-        while camera.isOpened():
-            # Capturar frame
-            success, frame = camera.read()
-            if not success:
-                print("Error al leer frame de la cámara")
-                break
-            
-            # Voltear horizontalmente para visualización natural
-            frame = cv2.flip(frame, 1)
-            
-            # Calcular FPS
-            current_time = time.time()
-            fps = 1 / (current_time - prev_time)
-            fps_history.append(fps)
-            avg_fps = sum(fps_history) / len(fps_history)
-            prev_time = current_time
-            
-            # Preprocesar frame para detección más rápida
-            processed_frame = process_frame(frame)
-            
-            # Detectar landmarks de la mano
-            results = detect_hand_landmarks(processed_frame)
-            
-            # Detectar gestos de la mano
-            gesture, hand_closed, landmarks_px = detect_hand_gesture(results, processed_frame.shape)
-            
-            # Actualizar historial de gestos
-            gesture_history.append(gesture)
-            
-            # Ejecutar acciones basadas en gestos
-            # Solo ejecutamos si el mismo gesto se detecta consistentemente
-            if gesture_history.count('jump') >= GESTURE_HISTORY_LENGTH - 1:
-                current_time = time.time()
-                # Verificar debounce para evitar múltiples activaciones
-                if current_time - last_jump_time > DEBOUNCE_TIME and not jump_active:
-                    # Presionar espacio para saltar
-                    pyautogui.keyDown('space')
-                    jump_active = True
-                    last_jump_time = current_time
-            elif jump_active:
-                # Soltar tecla de espacio cuando no se detecta gesto de salto
-                pyautogui.keyUp('space')
-                jump_active = False
-            
-            # Dibujar landmarks y gestos en el frame
-            if landmarks_px is not None:
-                frame = draw_hand_landmarks(frame, landmarks_px, gesture)
-            
-            # Mostrar FPS en el frame
-            cv2.putText(frame, f"FPS: {int(avg_fps)}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 
-                        1, (0, 255, 0), 2)
-            
-            # Mostrar estado actual
-            if gesture == 'jump':
-                cv2.putText(frame, "Acción: SALTAR (Espacio)", (10, frame.shape[0] - 70), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-                            
-            # Mostrar instrucciones en pantalla
-            cv2.putText(frame, "Pellizco (pulgar e índice): Saltar", (frame.shape[1] - 280, 30), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-            
-            # Mostrar estado de la mano
-            if landmarks_px is None:
-                cv2.putText(frame, "Estado: No se detecta mano", (10, frame.shape[0] - 30), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-            else:
-                cv2.putText(frame, f"Estado: Mano {'cerrada' if hand_closed else 'abierta'}", 
-                            (10, frame.shape[0] - 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-            
-            # Mostrar frame
-            cv2.imshow('Geometry Dash Hand Controller', frame)
-            
-            # Salir con ESC
-            if cv2.waitKey(1) & 0xFF == 27:
-                break
-        
-        # Asegurar que se sueltan todas las teclas
-        pyautogui.keyUp('space')
-        
-        # Liberar recursos
-        camera.release()
-        cv2.destroyAllWindows()
-        
-    except Exception as e:
-        print(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
+        # Mostrar instrucciones en pantalla
+        HUD_INSTRUCTIONS.draw(frame)
         
+        # Mostrar estado de la mano
+        if landmarks_px is None:
+            HUD_NO_HAND.draw(frame)
+        elif hand_closed:
+            HUD_HAND_CLOSED.draw(frame)
+        else:
+            HUD_HAND_OPEN.draw(frame)
+        return frame
+    
+    def release(self):
         # Asegurar que se sueltan todas las teclas
-        pyautogui.keyUp('space')
+        pyautogui.keyUp(KEYS[JUMP])
+
+def play_geometry_dash(camera_index=None, headless=False,
+                       preview_fps=DEFAULT_PREVIEW_FPS, preview_scale=DEFAULT_PREVIEW_SCALE,
+                       record=None, replay=None):
+    """
+    Función principal para jugar Geometry Dash con detección de manos
+    
+    Args:
+        camera_index: Índice de la cámara a utilizar (None para buscarla)
+        headless: Si es True no se dibuja nada ni se abre ventana
+        preview_fps: Máximo de FPS de la ventana de vista previa
+        preview_scale: Escala de la imagen en la vista previa
+        record: Nombre base donde grabar la sesión de cámara (None para no grabar)
+        replay: Nombre base de una sesión grabada a usar en lugar de la cámara
+    """
+    run_pipeline(GeometryDashPlugin(), camera_index=camera_index, headless=headless,
+                 preview_fps=preview_fps, preview_scale=preview_scale,
+                 record=record, replay=replay)
 
 def test_hand_detection(camera_index=None):
     """Función para probar la detección de manos y gestos sin controlar el juego"""
     try:
         # Encontrar una cámara disponible
         if camera_index is None:
-            camera_index = try_available_cameras()
+            camera_index = find_camera()
         if camera_index == -1:
             print("Error: No se pudo acceder a ninguna cámara.")
             return
@@ -425,8 +458,7 @@ def test_hand_detection(camera_index=None):
                         cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2)
             
             # Mostrar instrucciones en pantalla
-            cv2.putText(frame, "Pellizco (pulgar e índice): Saltar", (frame.shape[1] - 280, 30), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+            HUD_INSTRUCTIONS.draw(frame)
             
             # Mostrar frame
             cv2.imshow('Hand Gesture Test', frame)
@@ -455,6 +487,19 @@ detectados por tu cámara web.
 Comandos:
   --test          Probar la detección de gestos de mano
   --play          Iniciar el controlador del juego
+  --camera N      Índice de la cámara a utilizar
+  --config ARCHIVO   Teclas y umbrales del juego (por defecto configs/geometry_dash.json)
+  --headless      Jugar sin ventana ni dibujado (salir con Ctrl+C o ESC/q en la consola)
+  --preview-fps N    Máximo de FPS de la ventana de vista previa (por defecto 15)
+  --preview-scale N  Escala de la imagen en la vista previa (por defecto 0.75)
+  --record NOMBRE    Grabar la sesión de cámara (NOMBRE.avi y NOMBRE.csv)
+  --replay NOMBRE    Usar una sesión grabada en lugar de la cámara
+  --trace ARCHIVO    Guardar una traza de Chrome/Perfetto con el tiempo de cada etapa
+  --metrics-port N   Publicar métricas de Prometheus en http://127.0.0.1:N/metrics
+  --memprofile N     Medir la memoria asignada por frame (instantánea cada N frames)
+  --pacing           Analizar el ritmo de frames (cámara frente a CPU) al salir
+  --autotune FPS     Ajustar captura y escala de inferencia para llegar a FPS (se guarda por cámara)
+  --flow K           Inferir como mucho cada K frames y propagar la mano con flujo óptico
   --help          Mostrar este mensaje de ayuda
 
 Instrucciones:
@@ -476,24 +521,32 @@ Ejemplo:
 
 def main():
     """Función principal que analiza argumentos y ejecuta la función correspondiente"""
-    parser = argparse.ArgumentParser(description='Geometry Dash Hand Controller')
+    parser = create_parser('Geometry Dash Hand Controller')
     parser.add_argument('--test', action='store_true', help='Probar la detección de gestos de mano')
-    parser.add_argument('--play', action='store_true', help='Iniciar el controlador del juego')
-    parser.add_argument('--camera', type=int, help='Índice de la cámara a utilizar')
     
     # Analizar argumentos
     args = parser.parse_args()
     
     # Mostrar ayuda si no se proporcionan argumentos
-    if len(sys.argv) == 1:
+    if no_arguments():
         show_help()
         return
     
+    # Teclas y umbrales del juego (se releen en cada lanzamiento para recoger los cambios)
+    try:
+        configure(args.config)
+    except ValueError as e:
+        print(f"Error en la configuración: {e}")
+        return
+    
+    # Trazas, métricas, memoria y ritmo de frames si se piden
+    start_instrumentation(args, GeometryDashPlugin.name, sys.modules[__name__])
+    
     # Ejecutar la función correspondiente
     if args.test:
         test_hand_detection(camera_index=args.camera)
     elif args.play:
-        play_geometry_dash(camera_index=args.camera)
+        play_geometry_dash(**play_arguments(args))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Compositor de HUD con capas estáticas pre-renderizadas
+
+Los textos de instrucciones y las guías fijas (zona muerta, diagramas) son iguales
+en todos los frames, así que rasterizarlos con cv2.putText en cada iteración es
+trabajo repetido. Una HudLayer dibuja su contenido una sola vez sobre un lienzo
+BGRA del tamaño del frame, lo recorta en tiles que solo cubren las zonas con
+contenido y, en cada frame, copia únicamente esos píxeles sobre la imagen.
+
+Uso:
+    def _dibujar_instrucciones(canvas):
+        height, width = canvas.shape[:2]
+        cv2.putText(canvas, "Texto fijo", (width - 280, 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, opaque((255, 255, 255)), 2)
+
+    INSTRUCCIONES = HudLayer(_dibujar_instrucciones)
+    ...
+    INSTRUCCIONES.draw(frame)
+"""
+
+import cv2
+import numpy as np
+
+# Tamaño del núcleo usado para agrupar píxeles cercanos (letras de una misma línea) en un tile
+_TILE_GROUPING_KERNEL = np.ones((9, 9), np.uint8)
+
+
+def opaque(color):
+    """Convierte un color BGR en un color BGRA totalmente opaco para dibujar en un lienzo de capa"""
+    return (color[0], color[1], color[2], 255)
+
+
+class _HudTile:
+    """Región rectangular de una capa con sus píxeles BGR y su máscara o transparencia"""
+
+    __slots__ = ('x', 'y', 'bgr', 'mask', 'alpha', 'inverse_alpha')
+
+    def __init__(self, x, y, bgr, mask=None, alpha=None):
+        self.x = x
+        self.y = y
+        self.bgr = bgr
+        # Máscara uint8 cuando el tile es totalmente opaco
+        self.mask = mask
+        # Pesos float32 de mezcla cuando hay bordes semitransparentes (antialiasing)
+        self.alpha = alpha
+        self.inverse_alpha = None if alpha is None else 1.0 - alpha
+
+
+class HudLayer:
+    """Capa estática del HUD renderizada una vez por tamaño de frame"""
+
+    def __init__(self, render):
+        """
+        Inicializa la capa.
+
+        Args:
+            render: Función que recibe un lienzo BGRA vacío del tamaño del frame y
+                    dibuja en él el contenido estático (usando colores de opaque())
+        """
+        self._render = render
+        self._shape = None
+        self._tiles = []
+
+    def _build(self, height, width):
+        """Renderiza la capa y la divide en tiles que solo cubren las zonas dibujadas"""
+        canvas = np.zeros((height, width, 4), np.uint8)
+        self._render(canvas)
+
+        alpha = canvas[:, :, 3]
+        grouped = cv2.dilate((alpha > 0).astype(np.uint8), _TILE_GROUPING_KERNEL)
+        count, labels, stats, _ = cv2.connectedComponentsWithStats(grouped)
+
+        tiles = []
+        for label in range(1, count):
+            x, y, w, h = stats[label][:4]
+            tile_alpha = np.where(labels[y:y + h, x:x + w] == label, alpha[y:y + h, x:x + w], 0)
+            if not tile_alpha.any():
+                continue
+            bgr = np.ascontiguousarray(canvas[y:y + h, x:x + w, :3])
+
+            # Los textos y figuras sin antialiasing solo tienen píxeles 0 o 255:
+            # basta una copia con máscara, sin aritmética de mezcla
+            if np.all((tile_alpha == 0) | (tile_alpha == 255)):
+                tiles.append(_HudTile(x, y, bgr, mask=(tile_alpha > 0).astype(np.uint8)))
+                continue
+
+            # Con antialiasing el lienzo queda premultiplicado por la transparencia
+            # (se dibujó sobre negro): se recupera el color original para mezclar
+            weights = tile_alpha.astype(np.float32) / 255.0
+            drawn = weights > 0
+            color = np.zeros_like(bgr)
+            color[drawn] = np.clip(bgr[drawn] / weights[drawn][:, None] + 0.5, 0, 255).astype(np.uint8)
+            tiles.append(_HudTile(x, y, color, alpha=weights))
+
+        self._tiles = tiles
+        self._shape = (height, width)
+
+    def draw(self, frame):
+        """
+        Compone la capa sobre el frame (modificándolo) y lo devuelve.
+
+        Args:
+            frame: Imagen BGR sobre la que se dibuja la capa
+
+        Returns:
+            frame: La misma imagen con la capa aplicada
+        """
+        height, width = frame.shape[:2]
+        if self._shape != (height, width):
+            self._build(height, width)
+
+        for tile in self._tiles:
+            h, w = tile.bgr.shape[:2]
+            roi = frame[tile.y:tile.y + h, tile.x:tile.x + w]
+            if tile.mask is not None:
+                cv2.copyTo(tile.bgr, tile.mask, roi)
+            else:
+                cv2.blendLinear(tile.bgr, roi, tile.alpha, tile.inverse_alpha, roi)
+
+        return frame
+
+
+def blend_circle(frame, center, radius, color, opacity):
+    """
+    Dibuja un círculo relleno semitransparente mezclando solo la región que ocupa.
+
+    Equivale a dibujar el círculo sobre una copia completa del frame y mezclarla con
+    cv2.addWeighted, pero sin copiar ni mezclar los píxeles fuera del círculo.
+
+    Args:
+        frame: Imagen BGR (se modifica)
+        center: Centro (x, y) del círculo en píxeles
+        radius: Radio del círculo en píxeles
+        color: Color BGR del relleno
+        opacity: Opacidad del relleno entre 0 y 1
+    """
+    height, width = frame.shape[:2]
+    cx, cy = center
+    x0, y0 = max(cx - radius, 0), max(cy - radius, 0)
+    x1, y1 = min(cx + radius + 1, width), min(cy + radius + 1, height)
+    if x0 >= x1 or y0 >= y1:
+        return frame
+
+    roi = frame[y0:y1, x0:x1]
+    overlay = roi.copy()
+    cv2.circle(overlay, (cx - x0, cy - y0), radius, color, -1)
+    cv2.addWeighted(overlay, opacity, roi, 1 - opacity, 0, roi)
+    return frame
+
+
+def text_layer(text, position, font_face, font_scale, color, thickness):
+    """
+    Crea una capa con un único texto fijo.
+
+    Args:
+        text: Texto a mostrar
+        position: Posición (x, y) o función (width, height) -> (x, y) para textos
+                  anclados a los bordes del frame
+        font_face, font_scale, color, thickness: Parámetros de cv2.putText (color BGR)
+
+    Returns:
+        HudLayer con el texto
+    """
+    def render(canvas):
+        height, width = canvas.shape[:2]
+        org = position(width, height) if callable(position) else position
+        cv2.putText(canvas, text, org, font_face, font_scale, opaque(color), thickness)
+
+    return HudLayer(render)
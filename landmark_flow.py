@@ -0,0 +1,261 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Propagación de landmarks con flujo óptico entre inferencias de MediaPipe
+
+En CPUs modestas hands.process en cada frame deja el control en unos 15 FPS. Con
+--flow K el modelo solo se ejecuta en algunos frames (fotogramas clave) y en los
+demás los landmarks del último resultado se desplazan con flujo óptico de
+Lucas-Kanade piramidal (cv2.calcOpticalFlowPyrLK) sobre una versión pequeña en
+grises del frame. Los clasificadores reciben en cada frame un resultado con la
+misma forma que el de MediaPipe, así que el control se actualiza al ritmo de la
+cámara pagando la inferencia solo en una parte de los frames.
+
+El intervalo entre inferencias (k) se adapta al movimiento: se estima cuánto se
+mueven los landmarks por frame (con el flujo en los frames propagados y, en los
+fotogramas clave, con lo que se desplazaron desde el frame anterior, así que k
+vuelve a subir aunque se esté infiriendo en cada frame) y se elige k para que entre dos inferencias no se
+acumule más de MOTION_BUDGET del ancho de la imagen (entre 1 y K). Una mano quieta
+se infiere cada K frames; un movimiento rápido vuelve a inferir en cada frame.
+Además se vuelve a inferir en cuanto el flujo pierde demasiados puntos (la mano
+sale de la imagen, se tapa...), y sin nada que seguir se infiere cada K frames
+para encontrar una mano o una persona nueva.
+
+Funciona con los resultados de manos (multi_hand_landmarks) y de pose
+(pose_landmarks) en el bucle común (run_pipeline); no se aplica con --async ni con
+--hand-camera. Al salir se imprime la proporción de frames con inferencia y
+el k medio.
+
+Uso:
+    from landmark_flow import landmark_flow, start_landmark_flow
+
+    start_landmark_flow(4)   # Como mucho 1 de cada 4 frames con inferencia
+    results = landmark_flow.infer(plugin.infer, image)
+"""
+
+import atexit
+
+import cv2
+import numpy as np
+
+from landmark_stream import HandsResult, PoseResult
+from stage_profiler import profiler
+
+# Ancho de la imagen en grises sobre la que se calcula el flujo óptico
+FLOW_WIDTH = 160
+
+# Parámetros de Lucas-Kanade piramidal (ventana, niveles de la pirámide y parada)
+LK_PARAMS = dict(winSize=(15, 15), maxLevel=2,
+                 criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+
+# Fracción de puntos que debe seguir el flujo de cada conjunto de landmarks para no volver a inferir
+MIN_TRACKED = 0.7
+
+# Movimiento acumulado entre dos inferencias que se tolera (fracción del ancho de la imagen)
+MOTION_BUDGET = 0.04
+
+# Peso de cada frame en la media del movimiento por frame
+MOTION_SMOOTHING = 0.3
+
+
+class LandmarkFlow:
+    """Ejecuta el modelo cada k frames y propaga los landmarks con flujo óptico en el resto"""
+
+    def __init__(self):
+        self.enabled = False
+        self.max_interval = 1
+        self.interval = 1
+        self.frames = 0
+        self.inferences = 0
+        self.forced = 0     # Inferencias adelantadas porque el flujo perdió los puntos
+        self._interval_total = 0
+
+        self._gray = None
+        self._points = None     # Por conjunto de landmarks: array (n, 2) en px de la imagen de flujo
+        self._extra = None      # Por conjunto de landmarks: (z, visibilidad) de cada landmark
+        self._results = None    # Último resultado de MediaPipe (o propagado)
+        self._since_inference = 0
+        self._motion = 0.0
+
+    def enable(self, max_interval):
+        """Activa la propagación con como mucho max_interval frames entre inferencias"""
+        self.max_interval = max(int(max_interval), 1)
+        self.interval = self.max_interval
+        self.enabled = self.max_interval > 1
+
+    def infer(self, model, image):
+        """
+        Devuelve el resultado de un frame: el del modelo o el último propagado con flujo óptico.
+
+        Args:
+            model: Función que ejecuta el modelo sobre la imagen (plugin.infer)
+            image: Imagen RGB preprocesada que recibe el modelo
+        """
+        if not self.enabled:
+            return model(image)
+
+        self.frames += 1
+        gray = self._flow_image(image)
+        propagated = None
+        if self._results is not None and self._since_inference < self.interval:
+            propagated = self._propagate(gray)
+            if propagated is None:
+                self.forced += 1
+        self._gray = gray
+
+        if propagated is not None:
+            self._since_inference += 1
+            self._interval_total += self.interval
+            self._results = propagated
+            profiler.lap('optical_flow')
+            return propagated
+
+        # Fotograma clave: inferir y tomar sus landmarks como nuevos puntos de partida
+        results = model(image)
+        self.inferences += 1
+        self._interval_total += self.interval
+        self._since_inference = 1
+        self._results = results
+        previous = self._points
+        self._anchor(results, gray.shape)
+        self._measure(previous, gray.shape)
+        return results
+
+    def _flow_image(self, image):
+        """Versión pequeña en grises de la imagen del modelo"""
+        height, width = image.shape[:2]
+        size = (FLOW_WIDTH, max(1, int(round(height * FLOW_WIDTH / width))))
+        small = cv2.resize(image, size, interpolation=cv2.INTER_AREA) if width > FLOW_WIDTH else image
+        return cv2.cvtColor(small, cv2.COLOR_RGB2GRAY)
+
+    @staticmethod
+    def _landmark_lists(results):
+        """Conjuntos de landmarks de un resultado de manos o de pose"""
+        if hasattr(results, 'multi_hand_landmarks'):
+            return list(results.multi_hand_landmarks or [])
+        landmarks = getattr(results, 'pose_landmarks', None)
+        return [landmarks] if landmarks is not None else []
+
+    def _anchor(self, results, shape):
+        """Guarda los landmarks de una inferencia en px de la imagen de flujo"""
+        height, width = shape[:2]
+        self._points, self._extra = [], []
+        for landmarks in self._landmark_lists(results):
+            self._points.append(np.array([(lm.x * width, lm.y * height) for lm in landmarks.landmark],
+                                         dtype=np.float32))
+            # Solo la pose trae visibilidad: en las manos el campo no está puesto y protobuf
+            # devolvería 0.0, con lo que mp_drawing no dibujaría ningún landmark propagado
+            self._extra.append([(lm.z, lm.visibility if lm.HasField('visibility') else None)
+                                for lm in landmarks.landmark])
+        # Sin nada que seguir se espera hasta K frames para buscar una mano o una persona nueva
+        if not self._points:
+            self.interval = self.max_interval
+
+    def _measure(self, previous, shape):
+        """
+        Estima el movimiento por frame en un fotograma clave.
+
+        Los puntos anteriores son los del frame anterior (inferidos o propagados), así
+        que su distancia a los de la inferencia es el movimiento de un frame. Cada
+        conjunto se compara con el anterior de centro más cercano.
+        """
+        if not previous or not self._points:
+            return
+        moves = []
+        for points in self._points:
+            center = points.mean(axis=0)
+            candidates = [old for old in previous if len(old) == len(points)]
+            if not candidates:
+                continue
+            old = min(candidates, key=lambda old: np.hypot(*(old.mean(axis=0) - center)))
+            displacement = points - old
+            moves.append(float(np.median(np.hypot(displacement[:, 0], displacement[:, 1]))))
+        if moves:
+            self._adapt(max(moves) / shape[1])
+
+    def _propagate(self, gray):
+        """
+        Desplaza los landmarks del frame anterior con flujo óptico.
+
+        Returns:
+            Resultado con los landmarks desplazados, o None si hay que volver a inferir
+        """
+        if not self._points:
+            # Nada que seguir: el resultado vacío sigue valiendo hasta la siguiente inferencia
+            return self._results
+        if self._gray is None or self._gray.shape != gray.shape:
+            return None
+
+        counts = [len(points) for points in self._points]
+        previous = np.concatenate(self._points).reshape(-1, 1, 2)
+        current, status, _ = cv2.calcOpticalFlowPyrLK(self._gray, gray, previous, None, **LK_PARAMS)
+        if current is None:
+            return None
+        current, status = current.reshape(-1, 2), status.reshape(-1).astype(bool)
+
+        points, moves, start = [], [], 0
+        for count in counts:
+            end = start + count
+            tracked = status[start:end]
+            if tracked.mean() < MIN_TRACKED:
+                return None
+            displacement = current[start:end] - previous[start:end, 0]
+            # Los puntos perdidos se mueven con la mediana de los que el flujo sí siguió
+            median = np.median(displacement[tracked], axis=0)
+            displacement[~tracked] = median
+            points.append(previous[start:end, 0] + displacement)
+            moves.append(float(np.median(np.hypot(displacement[:, 0], displacement[:, 1]))))
+            start = end
+
+        self._points = points
+        self._adapt(max(moves) / gray.shape[1])
+        return self._results_from_points(gray.shape)
+
+    def _adapt(self, motion):
+        """Ajusta k al movimiento por frame (fracción del ancho de la imagen)"""
+        self._motion += MOTION_SMOOTHING * (motion - self._motion)
+        if self._motion <= 0:
+            self.interval = self.max_interval
+        else:
+            self.interval = int(np.clip(MOTION_BUDGET / self._motion, 1, self.max_interval))
+
+    def _results_from_points(self, shape):
+        """Resultado con la forma del de MediaPipe a partir de los puntos propagados"""
+        height, width = shape[:2]
+        landmark_lists = []
+        for points, extra in zip(self._points, self._extra):
+            landmark_lists.append([(x / width, y / height, z) if visibility is None
+                                   else (x / width, y / height, z, visibility)
+                                   for (x, y), (z, visibility) in zip(points.tolist(), extra)])
+        if hasattr(self._results, 'multi_hand_landmarks'):
+            results = HandsResult(landmark_lists)
+            # La lateralidad no cambia entre inferencias
+            results.multi_handedness = getattr(self._results, 'multi_handedness', None)
+            return results
+        return PoseResult(landmark_lists[0])
+
+    def print_report(self):
+        """Imprime cuántos frames se infirieron y el intervalo medio"""
+        if not self.frames:
+            return
+        print(f"\nFlujo óptico: {self.inferences} inferencias en {self.frames} frames"
+              f" ({100.0 * self.inferences / self.frames:.0f}%), k medio {self._interval_total / self.frames:.1f}"
+              f" (máximo {self.max_interval}), {self.forced} inferencias adelantadas por puntos perdidos")
+
+
+# Propagación compartida por el bucle del controlador
+landmark_flow = LandmarkFlow()
+
+
+def start_landmark_flow(max_interval):
+    """
+    Activa la propagación de landmarks y programa el informe al terminar el proceso.
+
+    Args:
+        max_interval: Máximo de frames entre inferencias (None, 0 o 1 para inferir en todos)
+    """
+    if not max_interval or max_interval <= 1:
+        return
+    landmark_flow.enable(max_interval)
+    atexit.register(landmark_flow.print_report)
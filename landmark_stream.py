@@ -0,0 +1,656 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Secuencias de landmarks para probar la lógica de gestos sin cámara ni MediaPipe
+
+La lógica de los controladores (clasificadores de gestos y máquinas de estados que
+envían las teclas) recibe objetos de resultados de MediaPipe. Este módulo los
+reconstruye a partir de secuencias de landmarks guardadas en archivos .npy, para
+pasar millones de frames por esa lógica y medir su corrección y su coste por frame
+sin cámara ni modelo.
+
+Formato de las secuencias (.npy, float32, coordenadas normalizadas como MediaPipe):
+    manos: (frames, 21, 3) con x, y, z de una mano, o (frames, manos, 21, 3)
+    pose:  (frames, 33, 4) con x, y, z y visibilidad
+Un frame (o una mano) con todos los valores NaN significa "sin detección".
+
+Las secuencias pueden ser sintéticas (plantillas de gestos y posturas con ruido y
+movimiento, con la etiqueta de cada frame) o extraídas una vez con MediaPipe de una
+sesión grabada con --record (ver session_recorder).
+
+Uso:
+    python landmark_stream.py generate --game subway_surfers --frames 100000 --output poses.npy
+    python landmark_stream.py extract --session sesion --kind hands --output manos.npy
+    python landmark_stream.py run --game geometry_dash --frames 1000000
+    python landmark_stream.py run --game arcade_1942 --input manos.npy
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import importlib
+from contextlib import contextmanager, redirect_stdout
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark import NullInput, null_input, PERCENTILES
+
+GAMES = ('geometry_dash', 'arcade_1942', 'subway_surfers')
+
+# Módulo del controlador y tipo de landmarks de cada juego
+GAME_MODULES = {'geometry_dash': 'geometry_dash_hand_controller',
+                'arcade_1942': 'arcade_1942_mouse_controller',
+                'subway_surfers': 'subway_surfers_pose_detection'}
+GAME_KINDS = {'geometry_dash': 'hands', 'arcade_1942': 'hands', 'subway_surfers': 'pose'}
+
+HAND_LANDMARKS = 21
+POSE_LANDMARKS = 33
+
+# Ritmo simulado de la cámara para las máquinas de estados que usan el reloj
+DEFAULT_STREAM_FPS = 30.0
+
+
+class Landmark:
+    """Landmark normalizado con los mismos atributos que el de MediaPipe"""
+    __slots__ = ('x', 'y', 'z', 'visibility')
+
+    def __init__(self, x, y, z, visibility=None):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.visibility = visibility  # Solo los landmarks de pose la tienen
+
+    def HasField(self, name):
+        # Lo usa mp_drawing.draw_landmarks para saltar los landmarks poco visibles
+        return getattr(self, name, None) is not None
+
+
+class LandmarkList:
+    """Equivalente a NormalizedLandmarkList: la lista de landmarks está en .landmark"""
+    __slots__ = ('landmark',)
+
+    def __init__(self, points):
+        self.landmark = [Landmark(*point) for point in points]
+
+
+class HandsResult:
+    """Resultado con la forma del de mp.solutions.hands (None si no hay manos)"""
+    __slots__ = ('multi_hand_landmarks', 'multi_handedness')
+
+    def __init__(self, hands):
+        self.multi_hand_landmarks = [LandmarkList(hand) for hand in hands] or None
+        self.multi_handedness = None
+
+
+class PoseResult:
+    """Resultado con la forma del de mp.solutions.pose (None si no hay persona)"""
+    __slots__ = ('pose_landmarks',)
+
+    def __init__(self, points):
+        self.pose_landmarks = LandmarkList(points) if points is not None else None
+
+
+def load_landmarks(path):
+    """
+    Carga una secuencia de landmarks sin leerla entera en memoria.
+
+    Returns:
+        Array (frames, ...) mapeado desde el archivo
+    """
+    array = np.load(path, mmap_mode='r')
+    if array.ndim not in (3, 4) or array.shape[-1] not in (3, 4):
+        raise ValueError(f"Secuencia de landmarks no válida {array.shape}: {path}")
+    return array
+
+
+def iter_results(array, kind):
+    """
+    Convierte una secuencia de landmarks en resultados con la forma de los de MediaPipe.
+
+    Args:
+        array: Secuencia (ver el formato en la cabecera del módulo)
+        kind: 'hands' o 'pose'
+
+    Yields:
+        Un HandsResult o PoseResult por frame
+    """
+    for frame in array:
+        frame = frame.tolist()
+        if kind == 'pose':
+            yield PoseResult(None if frame[0][0] != frame[0][0] else frame)
+            continue
+        # Una sola mano por frame o varias (las manos con NaN no se detectaron)
+        hands = frame if isinstance(frame[0][0], list) else [frame]
+        yield HandsResult([hand for hand in hands if hand[0][0] == hand[0][0]])
+
+
+# ---------------------------------------------------------------------------
+# Secuencias sintéticas
+# ---------------------------------------------------------------------------
+
+# Dedos extendidos (pulgar, índice, medio, anular, meñique) de cada gesto de mano
+HAND_GESTURES = {
+    'open': (True, True, True, True, True),
+    'fist': (False, False, False, False, False),
+    'pinch': (False, True, False, False, False),  # Pulgar tocando la punta del índice
+    'index': (False, True, False, False, False),
+    'start': (True, False, False, False, True),
+    'select': (True, True, False, False, False),
+    'phone': (True, True, False, False, True),
+}
+
+# Base de cada dedo (índice, medio, anular, meñique) relativa a la muñeca
+_FINGER_BASES = ((-0.04, -0.15), (0.0, -0.15), (0.04, -0.15), (0.08, -0.13))
+
+
+def hand_template(gesture):
+    """
+    Landmarks de una mano derecha (vista en espejo) haciendo un gesto, relativos a la muñeca.
+
+    Returns:
+        Array (21, 3)
+    """
+    fingers = HAND_GESTURES[gesture]
+    points = np.zeros((HAND_LANDMARKS, 3), np.float32)
+
+    # Pulgar: CMC, MCP, IP y punta
+    points[1] = (-0.04, -0.03, 0)
+    points[2] = (-0.07, -0.07, 0)
+    if fingers[0]:
+        points[3] = (-0.11, -0.10, 0)
+        points[4] = (-0.15, -0.13, 0)
+    else:
+        # Doblado sobre la palma
+        points[3] = (-0.05, -0.07, 0)
+        points[4] = (-0.03, -0.02, 0)
+
+    # Índice, medio, anular y meñique: MCP, PIP, DIP y punta
+    for finger, (base_x, base_y) in enumerate(_FINGER_BASES):
+        first = 5 + 4 * finger
+        offsets = (0, -0.06, -0.10, -0.14) if fingers[finger + 1] else (0, -0.03, 0.0, 0.03)
+        for joint, offset in enumerate(offsets):
+            points[first + joint] = (base_x, base_y + offset, 0)
+
+    if gesture == 'pinch':
+        points[3] = (-0.06, -0.20, 0)
+        points[4] = points[8] + (0.01, 0.01, 0)
+    return points
+
+
+# Postura de cada estado de pose: centro de los hombros en X, desplazamiento vertical
+# respecto a estar de pie y manos juntas
+POSE_STATES = {
+    'center': (0.5, 0.0, False),
+    'left': (0.25, 0.0, False),
+    'right': (0.75, 0.0, False),
+    'jump': (0.5, -0.08, False),
+    'crouch': (0.5, 0.3, False),
+    'joined': (0.5, 0.0, True),
+}
+
+# Altura de los hombros de pie (normalizada)
+POSE_SHOULDER_Y = 0.35
+
+# Cuerpo relativo al centro de los hombros (los brazos se colocan aparte)
+_POSE_BODY = {
+    0: (0.0, -0.12), 1: (-0.02, -0.14), 2: (-0.03, -0.14), 3: (-0.04, -0.14),
+    4: (0.02, -0.14), 5: (0.03, -0.14), 6: (0.04, -0.14), 7: (-0.05, -0.13),
+    8: (0.05, -0.13), 9: (-0.015, -0.09), 10: (0.015, -0.09),
+    11: (0.1, 0.0), 12: (-0.1, 0.0),
+    23: (0.06, 0.3), 24: (-0.06, 0.3), 25: (0.06, 0.45), 26: (-0.06, 0.45),
+    27: (0.06, 0.6), 28: (-0.06, 0.6), 29: (0.06, 0.62), 30: (-0.06, 0.62),
+    31: (0.08, 0.63), 32: (-0.08, 0.63),
+}
+
+# Codos, muñecas y manos (meñique, índice y pulgar) con los brazos abiertos o las manos juntas
+_POSE_ARMS = {
+    False: {13: (0.14, 0.15), 14: (-0.14, 0.15), 15: (0.2, 0.3), 16: (-0.2, 0.3)},
+    True: {13: (0.1, 0.15), 14: (-0.1, 0.15), 15: (0.01, 0.15), 16: (-0.01, 0.15)},
+}
+
+
+def pose_template(state):
+    """
+    Landmarks de pose de una persona en un estado (ver POSE_STATES), en coordenadas de imagen.
+
+    Returns:
+        Array (33, 4)
+    """
+    center_x, offset_y, joined = POSE_STATES[state]
+    center_y = POSE_SHOULDER_Y + offset_y
+
+    points = np.zeros((POSE_LANDMARKS, 4), np.float32)
+    points[:, 3] = 1.0
+    for index, (x, y) in {**_POSE_BODY, **_POSE_ARMS[joined]}.items():
+        points[index, :2] = (center_x + x, center_y + y)
+    # Meñique, índice y pulgar junto a cada muñeca
+    for wrist, first in ((15, 17), (16, 18)):
+        for k in range(3):
+            points[first + 2 * k, :2] = points[wrist, :2] + (0.0, 0.02 + 0.01 * k)
+    return points
+
+
+def random_script(states, frames, seed=0, min_length=5, max_length=40):
+    """
+    Genera un guion aleatorio de estados de duración variable.
+
+    Args:
+        states: Estados posibles (gestos, posturas o 'none' para "sin detección")
+        frames: Número total de frames
+        seed: Semilla del generador
+
+    Returns:
+        Lista de (estado, frames)
+    """
+    rng = np.random.default_rng(seed)
+    script = []
+    remaining = frames
+    while remaining > 0:
+        length = int(min(remaining, rng.integers(min_length, max_length + 1)))
+        script.append((states[rng.integers(len(states))], length))
+        remaining -= length
+    return script
+
+
+def synthetic_sequence(script, kind, seed=0, jitter=0.003, sway=0.05):
+    """
+    Crea una secuencia sintética de landmarks a partir de un guion de estados.
+
+    Args:
+        script: Lista de (estado, frames); el estado 'none' es un frame sin detección
+        kind: 'hands' (estados de HAND_GESTURES) o 'pose' (estados de POSE_STATES)
+        seed: Semilla del ruido
+        jitter: Desviación del ruido de cada landmark (normalizada)
+        sway: Amplitud del movimiento lento de toda la mano o el cuerpo
+
+    Returns:
+        (secuencia, etiquetas): array con el formato del módulo y el estado de cada frame
+    """
+    rng = np.random.default_rng(seed)
+    count = sum(length for _, length in script)
+    shape = (count, HAND_LANDMARKS, 3) if kind == 'hands' else (count, POSE_LANDMARKS, 4)
+    sequence = np.full(shape, np.nan, np.float32)
+    labels = []
+
+    templates = {}
+    frame = 0
+    for state, length in script:
+        labels.extend([state] * length)
+        if state != 'none':
+            if state not in templates:
+                templates[state] = hand_template(state) if kind == 'hands' else pose_template(state)
+            sequence[frame:frame + length] = templates[state]
+        frame += length
+
+    detected = ~np.isnan(sequence[:, 0, 0])
+    t = np.arange(count, dtype=np.float32)
+    if kind == 'hands':
+        # La mano se mueve por la imagen con la muñeca cerca del centro
+        sequence[:, :, 0] += 0.5 + sway * np.sin(t / 45)[:, None]
+        sequence[:, :, 1] += 0.75 + sway * np.cos(t / 60)[:, None]
+    else:
+        # El cuerpo se balancea poco en horizontal para no cambiar de carril
+        sequence[:, :, 0] += (sway / 5) * np.sin(t / 30)[:, None]
+
+    noise = rng.normal(0.0, jitter, (count, shape[1], 3)).astype(np.float32)
+    sequence[detected, :, :3] += noise[detected]
+    return sequence, labels
+
+
+def synthetic_game_sequence(game, frames, seed=0):
+    """Secuencia sintética con un guion aleatorio adecuado para un juego"""
+    if GAME_KINDS[game] == 'hands':
+        script = random_script(list(HAND_GESTURES) + ['none'], frames, seed)
+    else:
+        # Empezar con las manos juntas para iniciar el juego y fijar la altura de referencia
+        script = [('center', 5), ('joined', 12), ('center', 10)]
+        script += random_script(list(POSE_STATES) + ['none'], max(frames - 27, 0), seed)
+    return synthetic_sequence(script, GAME_KINDS[game], seed)
+
+
+# ---------------------------------------------------------------------------
+# Extracción de landmarks de una sesión grabada
+# ---------------------------------------------------------------------------
+
+def extract_landmarks(session, kind, max_hands=1):
+    """
+    Pasa MediaPipe una sola vez por una sesión grabada (o un vídeo) y devuelve sus landmarks.
+
+    Los frames se voltean como en los controladores, así que las coordenadas son las
+    que ve la lógica de gestos.
+
+    Args:
+        session: Nombre base de una sesión de session_recorder o ruta de un vídeo
+        kind: 'hands' o 'pose'
+        max_hands: Manos por frame a extraer
+
+    Returns:
+        Array con el formato del módulo
+    """
+    import cv2
+    import mediapipe as mp
+    from session_recorder import ReplayCapture
+
+    if os.path.exists(session) and not session.lower().endswith('.avi'):
+        capture = cv2.VideoCapture(session)
+    else:
+        capture = ReplayCapture(session, realtime=False)
+    if kind == 'hands':
+        model = mp.solutions.hands.Hands(static_image_mode=False, model_complexity=0,
+                                         max_num_hands=max_hands, min_detection_confidence=0.5)
+    else:
+        model = mp.solutions.pose.Pose(static_image_mode=False, model_complexity=1,
+                                       min_detection_confidence=0.7, min_tracking_confidence=0.7)
+
+    frames = []
+    while True:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        results = model.process(cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB))
+        if kind == 'hands':
+            points = np.full((max_hands, HAND_LANDMARKS, 3), np.nan, np.float32)
+            for i, hand in enumerate((results.multi_hand_landmarks or [])[:max_hands]):
+                points[i] = [(p.x, p.y, p.z) for p in hand.landmark]
+            frames.append(points[0] if max_hands == 1 else points)
+        else:
+            points = np.full((POSE_LANDMARKS, 4), np.nan, np.float32)
+            if results.pose_landmarks:
+                points[:] = [(p.x, p.y, p.z, p.visibility) for p in results.pose_landmarks.landmark]
+            frames.append(points)
+    capture.release()
+    model.close()
+    return np.asarray(frames, np.float32)
+
+
+# ---------------------------------------------------------------------------
+# Ejecución de la lógica de cada juego
+# ---------------------------------------------------------------------------
+
+class RecordingInput(NullInput):
+    """NullInput que además guarda la secuencia de eventos (frame, acción, argumentos, argumentos con nombre)"""
+
+    def __init__(self):
+        super().__init__()
+        self.events = []
+        self.frame = 0
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        def record(*args, **kwargs):
+            self.calls[name] += 1
+            self.events.append((self.frame, name, args, kwargs))
+        return record
+
+
+class SimulatedClock:
+    """Sustituto del módulo time cuyo time() avanza al ritmo de los frames de la secuencia"""
+
+    def __init__(self, fps=DEFAULT_STREAM_FPS, start=1000.0):
+        self.period = 1.0 / fps
+        self.now = start
+
+    def advance(self):
+        self.now += self.period
+
+    def time(self):
+        return self.now
+
+    def __getattr__(self, name):
+        # sleep, perf_counter...: los del módulo time real
+        return getattr(time, name)
+
+
+@contextmanager
+def simulated_time(module, clock):
+    """Sustituye temporalmente el módulo time de un controlador por un SimulatedClock"""
+    original = module.time
+    module.time = clock
+    try:
+        yield clock
+    finally:
+        module.time = original
+
+
+class Mismatches:
+    """Cuenta por etiqueta los frames en que un clasificador no da lo esperado"""
+
+    def __init__(self):
+        self.checked = 0
+        self.by_label = {}
+
+    def check(self, label, ok):
+        self.checked += 1
+        if not ok:
+            self.by_label[label] = self.by_label.get(label, 0) + 1
+
+    def summary(self):
+        return {'checked': self.checked, 'mismatches': sum(self.by_label.values()),
+                'by_label': dict(sorted(self.by_label.items()))}
+
+
+def run_geometry_dash(results, labels, backend, fps, width, height):
+    """detect_hand_gesture y JumpTrigger de Geometry Dash"""
+    import geometry_dash_hand_controller as gd
+
+    # El controlador detecta sobre el frame reducido a la mitad
+    frame_shape = (height // 2, width // 2, 3)
+    trigger = gd.JumpTrigger()
+    mismatches = Mismatches()
+    durations = []
+    now = 0.0
+
+    for i, result in enumerate(results):
+        backend.frame = i
+        start = time.perf_counter()
+        gesture, hand_closed, landmarks_px = gd.detect_hand_gesture(result, frame_shape)
+        trigger.update(gesture, now)
+        durations.append(time.perf_counter() - start)
+        now += 1.0 / fps
+
+        label = labels[i] if labels else None
+        if label == 'none':
+            mismatches.check(label, landmarks_px is None)
+        elif label is not None:
+            fingers = HAND_GESTURES[label]
+            mismatches.check(label, (gesture == 'jump') == (label == 'pinch')
+                             and hand_closed == (sum(fingers) <= 1))
+    return durations, mismatches
+
+
+def run_arcade_1942(results, labels, backend, fps, width, height):
+    """get_hand_info, movimiento, process_gestures y update_key_presses de Arcade 1942"""
+    import arcade_1942_mouse_controller as arcade
+
+    frame_shape = (height, width, 3)
+    clock = SimulatedClock(fps)
+    mismatches = Mismatches()
+    durations = []
+
+    with simulated_time(arcade, clock):
+        controller = arcade.HandController()
+        for i, result in enumerate(results):
+            backend.frame = i
+            clock.advance()
+            start = time.perf_counter()
+            hand_info = None
+            if result.multi_hand_landmarks:
+                for hand_landmarks in result.multi_hand_landmarks:
+                    hand_info = controller.get_hand_info(hand_landmarks, frame_shape)
+                    delta_x, delta_y = controller.calculate_relative_movement(hand_info)
+                    movement_keys = controller.update_player_position(delta_x, delta_y)
+                    gesture_keys = controller.process_gestures(hand_info)
+                    controller.update_key_presses(movement_keys.union(gesture_keys))
+            else:
+                controller.prev_hand_center = None
+                controller.update_key_presses(set())
+            durations.append(time.perf_counter() - start)
+
+            label = labels[i] if labels else None
+            if label == 'none':
+                mismatches.check(label, hand_info is None)
+            elif label is not None:
+                thumb, index, middle, ring, pinky = HAND_GESTURES[label]
+                expected = {
+                    'is_barrel_roll': index and not (thumb or middle or ring or pinky),
+                    'is_auto_shoot': sum(HAND_GESTURES[label]) >= 4,
+                    'is_start': thumb and pinky and not (index or middle or ring),
+                    'is_select': thumb and index and not (middle or ring or pinky),
+                    'is_pause': thumb and index and pinky and not (middle or ring),
+                }
+                mismatches.check(label, hand_info is not None and
+                                 all(hand_info[key] == value for key, value in expected.items()))
+        controller.update_key_presses(set())
+    return durations, mismatches
+
+
+# Posición horizontal y postura esperadas de cada estado de pose
+_EXPECTED_POSE = {
+    'center': ('Center', 'Standing'), 'left': ('Left', 'Standing'), 'right': ('Right', 'Standing'),
+    'jump': ('Center', 'Jumping'), 'crouch': ('Center', 'Crouching'), 'joined': ('Center', 'Standing'),
+}
+
+
+def run_subway_surfers(results, labels, backend, fps, width, height):
+    """GameState (clasificadores de pose y teclas) de Subway Surfers"""
+    import subway_surfers_pose_detection as subway
+
+    state = subway.GameState()
+    mismatches = Mismatches()
+    durations = []
+
+    for i, result in enumerate(results):
+        backend.frame = i
+        start = time.perf_counter()
+        state.update(result, width, height)
+        durations.append(time.perf_counter() - start)
+
+        label = labels[i] if labels else None
+        if label == 'none':
+            mismatches.check(label, state.hand_status is None)
+        elif label is not None:
+            horizontal, posture = _EXPECTED_POSE[label]
+            ok = (state.hand_status == 'Hands Joined') == (label == 'joined')
+            if state.position_classified:
+                ok = ok and state.horizontal_position == horizontal
+            if state.posture is not None:
+                ok = ok and state.posture == posture
+            mismatches.check(label, ok)
+    return durations, mismatches
+
+
+RUNNERS = {
+    'geometry_dash': run_geometry_dash,
+    'arcade_1942': run_arcade_1942,
+    'subway_surfers': run_subway_surfers,
+}
+
+
+def run_stream(game, sequence, labels=None, fps=DEFAULT_STREAM_FPS, width=640, height=480):
+    """
+    Pasa una secuencia de landmarks por la lógica de un juego.
+
+    Args:
+        game: Nombre del juego (ver GAMES)
+        sequence: Secuencia de landmarks
+        labels: Estado de cada frame (secuencias sintéticas) para comprobar los clasificadores
+        fps: Ritmo simulado de la cámara
+        width, height: Resolución del frame de cámara simulado
+
+    Returns:
+        (informe, eventos): diccionario con el rendimiento, el coste por frame, las
+        llamadas de entrada y los errores de los clasificadores, y la lista de eventos
+        (ver RecordingInput) enviados al juego
+    """
+    module = importlib.import_module(GAME_MODULES[game])
+    with null_input(module, RecordingInput()) as backend:
+        start = time.perf_counter()
+        durations, mismatches = RUNNERS[game](iter_results(sequence, GAME_KINDS[game]), labels,
+                                              backend, fps, width, height)
+        elapsed = time.perf_counter() - start
+
+    values = np.asarray(durations) * 1e6
+    per_frame = {f'p{p}_us': round(float(np.percentile(values, p)), 2) for p in PERCENTILES}
+    per_frame['mean_us'] = round(float(values.mean()), 2)
+    report = {
+        'frames': len(durations),
+        # Incluye la conversión de los landmarks en objetos de resultados
+        'frames_per_second': round(len(durations) / elapsed, 1),
+        'logic_per_frame': per_frame,
+        'input_calls': dict(backend.calls),
+        'classifier_check': mismatches.summary() if labels else None,
+    }
+    return report, backend.events
+
+
+def main():
+    """Función principal que analiza argumentos y ejecuta la acción elegida"""
+    parser = argparse.ArgumentParser(description='Secuencias de landmarks sin cámara ni MediaPipe')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    generate = subparsers.add_parser('generate', help='Crear una secuencia sintética')
+    generate.add_argument('--game', choices=GAMES, required=True)
+    generate.add_argument('--frames', type=int, default=10000)
+    generate.add_argument('--seed', type=int, default=0)
+    generate.add_argument('--output', required=True, help='Archivo .npy (las etiquetas van a .labels.json)')
+
+    extract = subparsers.add_parser('extract', help='Extraer landmarks de una sesión grabada con --record')
+    extract.add_argument('--session', required=True, help='Sesión de session_recorder o vídeo')
+    extract.add_argument('--kind', choices=('hands', 'pose'), required=True)
+    extract.add_argument('--max-hands', type=int, default=1)
+    extract.add_argument('--output', required=True, help='Archivo .npy')
+
+    run = subparsers.add_parser('run', help='Pasar una secuencia por la lógica de un juego')
+    run.add_argument('--game', choices=GAMES, required=True)
+    run.add_argument('--input', help='Secuencia .npy (por defecto, sintética)')
+    run.add_argument('--frames', type=int, default=100000, help='Frames de la secuencia sintética')
+    run.add_argument('--seed', type=int, default=0)
+    run.add_argument('--fps', type=float, default=DEFAULT_STREAM_FPS, help='Ritmo simulado de la cámara')
+    run.add_argument('--events', help='Archivo JSON donde guardar los eventos de teclado y ratón')
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        sequence, labels = synthetic_game_sequence(args.game, args.frames, args.seed)
+        np.save(args.output, sequence)
+        with open(os.path.splitext(args.output)[0] + '.labels.json', 'w', encoding='utf-8') as f:
+            json.dump(labels, f)
+        print(f"Secuencia guardada en {args.output}: {sequence.shape}")
+
+    elif args.command == 'extract':
+        sequence = extract_landmarks(args.session, args.kind, args.max_hands)
+        np.save(args.output, sequence)
+        detected = int((~np.isnan(sequence.reshape(len(sequence), -1)[:, 0])).sum()) if len(sequence) else 0
+        print(f"Landmarks guardados en {args.output}: {len(sequence)} frames, {detected} con detección")
+
+    else:
+        if args.input:
+            sequence = load_landmarks(args.input)
+            labels_path = os.path.splitext(args.input)[0] + '.labels.json'
+            labels = None
+            if os.path.exists(labels_path):
+                with open(labels_path, encoding='utf-8') as f:
+                    labels = json.load(f)
+        else:
+            sequence, labels = synthetic_game_sequence(args.game, args.frames, args.seed)
+
+        # Los mensajes de los controladores (uno por gesto) no deben costar tiempo de consola
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            report, events = run_stream(args.game, sequence, labels, args.fps)
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+
+        if args.events:
+            with open(args.events, 'w', encoding='utf-8') as f:
+                json.dump([[frame, action, list(call_args), call_kwargs]
+                           for frame, action, call_args, call_kwargs in events], f)
+            print(f"{len(events)} eventos guardados en {args.events}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Métricas de los controladores en formato de texto de Prometheus
+
+En una instalación con varios quioscos interesa recoger de forma centralizada
+cómo va cada controlador: FPS, latencia de la inferencia, proporción de frames con
+mano o pose detectada, teclas enviadas por segundo y frames de cámara perdidos.
+Con --metrics-port PUERTO el controlador atiende en http://127.0.0.1:PUERTO/metrics
+desde un hilo propio (ThreadingHTTPServer) y cualquier cliente HTTP, o un
+Prometheus/agente local, puede leer las métricas.
+
+El bucle de visión no toma ningún cerrojo: solo incrementa contadores y añade
+instantes a deques de tamaño fijo (operaciones atómicas con el GIL), y el hilo
+del servidor calcula las tasas al atender cada petición. Las duraciones de cada
+etapa salen de los totales del perfilador (ver stage_profiler), y las teclas se
+cuentan envolviendo el pyautogui del módulo del controlador.
+
+Métricas publicadas:
+    controller_info{game,pid}                  1 (identifica el juego y el proceso)
+    controller_frames_total                    Frames procesados
+    controller_detections_total                Frames con mano o pose detectada
+    controller_dropped_frames_total            Frames de la cámara que el bucle no llegó a leer (estimado)
+    controller_input_events_total{action}      Eventos enviados con pyautogui (keyDown, press...)
+    controller_fps                             FPS de los últimos RATE_WINDOW segundos
+    controller_detection_ratio                 Proporción de frames con detección en la ventana
+    controller_input_events_per_second         Eventos de entrada por segundo en la ventana
+    controller_stage_seconds_{sum,count}{stage} Tiempo acumulado por etapa (inference, capture...)
+
+Uso:
+    from metrics_server import metrics, start_metrics_server
+
+    start_metrics_server(9100, 'geometry_dash', sys.modules[__name__])
+    metrics.set_source_fps(camera.get(cv2.CAP_PROP_FPS))
+    while ...:
+        ...
+        metrics.observe_frame(detected=results.multi_hand_landmarks is not None)
+"""
+
+import os
+import time
+import threading
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from stage_profiler import profiler
+
+# Solo se atienden conexiones locales: la recogida central pasa por un agente del quiosco
+METRICS_HOST = '127.0.0.1'
+
+# Segundos de historia con los que se calculan FPS, tasa de detección y eventos por segundo
+RATE_WINDOW = 5.0
+
+# Instantes que conservan las ventanas (de sobra para RATE_WINDOW a 200 FPS)
+WINDOW_CAPACITY = 1024
+
+# Llamadas de pyautogui que se cuentan como eventos de entrada
+INPUT_ACTIONS = ('keyDown', 'keyUp', 'press', 'click', 'mouseDown', 'mouseUp', 'hotkey')
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class ControllerMetrics:
+    """Contadores del bucle de un controlador, actualizados sin cerrojos"""
+
+    def __init__(self):
+        self.game = None
+        self.frames = 0
+        self.detections = 0
+        self.dropped_frames = 0
+        self.input_events = Counter()
+
+        self._source_period = None  # Segundos entre frames de la cámara (None si no se conoce)
+        self._first_frame = None
+        self._last_frame = None
+        self._frame_times = deque(maxlen=WINDOW_CAPACITY)      # (instante, detección)
+        self._input_times = deque(maxlen=WINDOW_CAPACITY)
+
+    def set_source_fps(self, fps):
+        """Indica los FPS nominales de la cámara para estimar los frames perdidos"""
+        self._source_period = 1.0 / fps if fps and fps > 0 else None
+
+    def observe_frame(self, detected):
+        """
+        Cuenta un frame procesado por el bucle.
+
+        Args:
+            detected: Si en el frame se detectó una mano o una pose
+        """
+        now = time.perf_counter()
+        self.frames += 1
+        if detected:
+            self.detections += 1
+        self._frame_times.append((now, detected))
+        if self._first_frame is None:
+            self._first_frame = now
+
+        # Si entre dos lecturas la cámara pudo entregar varios frames, el resto se perdió
+        if self._last_frame is not None and self._source_period is not None:
+            missed = int((now - self._last_frame) / self._source_period + 0.5) - 1
+            if missed > 0:
+                self.dropped_frames += missed
+        self._last_frame = now
+
+    def observe_input(self, action):
+        """Cuenta un evento de entrada enviado al juego"""
+        self.input_events[action] += 1
+        self._input_times.append(time.perf_counter())
+
+    def rates(self, window=RATE_WINDOW):
+        """
+        Calcula las tasas de la ventana reciente.
+
+        Returns:
+            (fps, proporción de frames con detección, eventos de entrada por segundo)
+        """
+        now = time.perf_counter()
+        since = now - window
+        frames = [detected for timestamp, detected in list(self._frame_times) if timestamp >= since]
+        inputs = sum(1 for timestamp in list(self._input_times) if timestamp >= since)
+
+        # Al arrancar todavía no ha pasado una ventana completa
+        if self._first_frame is not None:
+            window = max(min(window, now - self._first_frame), 1e-3)
+        detection_ratio = sum(frames) / len(frames) if frames else 0.0
+        return len(frames) / window, detection_ratio, inputs / window
+
+    def render(self):
+        """Devuelve todas las métricas en el formato de texto de Prometheus"""
+        fps, detection_ratio, inputs_per_second = self.rates()
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in samples:
+                lines.append(f'{name}{_format_labels(labels)} {value}')
+
+        metric('controller_info', 'gauge', 'Controlador de juego que publica las métricas',
+               [({'game': self.game or 'unknown', 'pid': os.getpid()}, 1)])
+        metric('controller_frames_total', 'counter', 'Frames procesados por el bucle',
+               [({}, self.frames)])
+        metric('controller_detections_total', 'counter', 'Frames con mano o pose detectada',
+               [({}, self.detections)])
+        metric('controller_dropped_frames_total', 'counter',
+               'Frames de la cámara que el bucle no llegó a leer (estimado)',
+               [({}, self.dropped_frames)])
+        metric('controller_input_events_total', 'counter', 'Eventos de entrada enviados al juego',
+               [({'action': action}, count) for action, count in sorted(self.input_events.items())])
+        metric('controller_fps', 'gauge', f'Frames por segundo en los últimos {RATE_WINDOW:g} s',
+               [({}, f'{fps:.3f}')])
+        metric('controller_detection_ratio', 'gauge',
+               f'Proporción de frames con detección en los últimos {RATE_WINDOW:g} s',
+               [({}, f'{detection_ratio:.4f}')])
+        metric('controller_input_events_per_second', 'gauge',
+               f'Eventos de entrada por segundo en los últimos {RATE_WINDOW:g} s',
+               [({}, f'{inputs_per_second:.3f}')])
+
+        totals = sorted(profiler.stage_totals().items())
+        lines.append('# HELP controller_stage_seconds Duración de cada etapa del bucle')
+        lines.append('# TYPE controller_stage_seconds summary')
+        for stage, (count, seconds) in totals:
+            lines.append(f'controller_stage_seconds_sum{_format_labels({"stage": stage})} {seconds:.9f}')
+            lines.append(f'controller_stage_seconds_count{_format_labels({"stage": stage})} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels):
+    """Etiquetas en la sintaxis de Prometheus ({} vacío se omite)"""
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for value in labels.values())
+    return '{' + ','.join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + '}'
+
+
+class CountingInput:
+    """Envuelve pyautogui y cuenta los eventos de entrada que envía el controlador"""
+
+    def __init__(self, backend, metrics):
+        self._backend = backend
+        # Las envolturas se crean una vez para no añadir trabajo a cada llamada
+        for action in INPUT_ACTIONS:
+            function = getattr(backend, action, None)
+            if function is not None:
+                setattr(self, action, self._wrap(action, function, metrics))
+
+    @staticmethod
+    def _wrap(action, function, metrics):
+        def call(*args, **kwargs):
+            metrics.observe_input(action)
+            return function(*args, **kwargs)
+        return call
+
+    def __getattr__(self, name):
+        # size, FAILSAFE, moveTo... se delegan en pyautogui
+        return getattr(self._backend, name)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Atiende GET /metrics con el texto de las métricas"""
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = metrics.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Sin una línea en la consola por cada lectura de las métricas
+        pass
+
+
+# Métricas compartidas por el bucle del controlador y el servidor
+metrics = ControllerMetrics()
+
+_server = None
+
+
+def start_metrics_server(port, game, module=None):
+    """
+    Publica las métricas del controlador en http://127.0.0.1:port/metrics.
+
+    Args:
+        port: Puerto local (None para no hacer nada, 0 para uno libre)
+        game: Nombre del juego para la etiqueta de controller_info
+        module: Módulo del controlador cuyo pyautogui se envuelve para contar las teclas
+
+    Returns:
+        El servidor iniciado, o None si no se pidió o no se pudo abrir el puerto
+    """
+    global _server
+    if port is None:
+        return None
+
+    try:
+        server = ThreadingHTTPServer((METRICS_HOST, port), _MetricsHandler)
+    except OSError as e:
+        print(f"Aviso: no se pudieron publicar las métricas en el puerto {port}: {e}")
+        return None
+    server.daemon_threads = True
+
+    metrics.game = game
+    if module is not None and not isinstance(module.pyautogui, CountingInput):
+        module.pyautogui = CountingInput(module.pyautogui, metrics)
+    # Sin --trace solo hacen falta los totales por etapa, no el buffer de eventos
+    if not profiler.enabled:
+        profiler.enable(capacity=0)
+
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    _server = server
+    print(f"Métricas en http://{METRICS_HOST}:{server.server_address[1]}/metrics")
+    return server
+
+
+def stop_metrics_server():
+    """Detiene el servidor de métricas si está en marcha"""
+    global _server
+    if _server is not None:
+        _server.shutdown()
+        _server.server_close()
+        _server = None
@@ -0,0 +1,378 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Entrada con varias cámaras y una tubería por cámara
+
+En el stand se usan dos cámaras: una abierta que ve el cuerpo entero y otra cerca
+de las manos. Cada cámara tiene su propia tubería (captura, volteo, conversión de
+color e inferencia con su modelo) en un hilo propio: OpenCV y MediaPipe sueltan el
+GIL mientras trabajan, así que las dos inferencias corren en paralelo y la cámara
+lenta no frena a la rápida.
+
+El bucle principal fusiona los resultados por instante de captura. Cada resultado
+de la cámara principal (el cuerpo) se empareja con el de la secundaria (las manos)
+capturado más cerca en el tiempo, siempre que el desfase no supere max_skew:
+
+- Si la secundaria aún no ha entregado un frame tan reciente, se espera como
+  mucho hasta max_skew después de la captura principal
+- Si no llega a tiempo, el frame principal se procesa solo (la secundaria no
+  decide nada en ese frame) y se cuenta como no emparejado
+
+Después cada plugin clasifica y actúa sobre su parte, como en controller_pipeline.
+Al terminar se imprime el desfase de las parejas y la latencia de la fusión: el
+tiempo desde la captura del frame más reciente de la pareja hasta que la pareja
+está lista para clasificar (inferencia más espera).
+
+Uso:
+    run_multi_camera(SubwaySurfersPlugin(), PinchPausePlugin(...),
+                     primary_camera=0, secondary_camera=1, max_skew=0.05)
+"""
+
+import time
+import threading
+import traceback
+import webbrowser
+from collections import deque, namedtuple
+
+import cv2
+import numpy as np
+
+from controller_runtime import (install_exit_handlers, exit_requested,
+                                DEFAULT_PREVIEW_FPS, DEFAULT_PREVIEW_SCALE)
+from controller_pipeline import FpsMeter
+from preview_window import PreviewWindow
+from controller_ipc import report_frame
+from session_recorder import open_capture
+from stage_profiler import profiler
+from metrics_server import metrics
+from alloc_tracker import memory_tracker
+from frame_pacing import pacing_analyzer
+
+# Desfase máximo entre las capturas de una pareja (segundos)
+MAX_SKEW = 0.05
+
+# Resultados recientes que guarda cada tubería para emparejar
+RESULT_HISTORY = 8
+
+# Espera máxima por un resultado de la cámara principal antes de revisar la salida (segundos)
+MERGE_POLL = 0.5
+
+# Medidas de la fusión que se conservan para el informe
+STATS_CAPACITY = 100000
+
+# Ancho de la imagen de la cámara secundaria incrustada en la vista previa (fracción)
+INSET_WIDTH = 0.3
+
+# Resultado de una tubería: instante de captura (perf_counter), número de frame, frame volteado y resultados
+Sample = namedtuple('Sample', 'timestamp sequence frame results')
+
+
+class CameraPipeline:
+    """Captura e inferencia de una cámara en un hilo propio"""
+
+    def __init__(self, name, plugin, camera_index, condition, record=None, replay=None):
+        """
+        Args:
+            name: Nombre de la cámara en los mensajes y la traza ('cuerpo', 'manos'...)
+            plugin: GamePlugin cuyo infer() se ejecuta sobre los frames de esta cámara
+            camera_index: Índice de la cámara
+            condition: Condición compartida con la que se avisa de cada resultado nuevo
+            record: Nombre base donde grabar la sesión de esta cámara (None para no grabar)
+            replay: Nombre base de una sesión a reproducir en lugar de la cámara
+        """
+        self.name = name
+        self.plugin = plugin
+        self.camera_index = camera_index
+        self.condition = condition
+        self.record = record
+        self.replay = replay
+        self.samples = deque(maxlen=RESULT_HISTORY)
+        self.finished = False
+        self.frames = 0
+        self.camera = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def open(self, pacing=False):
+        """
+        Abre la cámara con la resolución del plugin.
+
+        Args:
+            pacing: Si es True la cámara se mide con el análisis del ritmo de frames (si está activado)
+
+        Returns:
+            True si la cámara se abrió
+        """
+        camera = open_capture(self.camera_index, record=self.record, replay=self.replay)
+        self.camera = pacing_analyzer.wrap(camera) if pacing else camera
+        width, height = self.plugin.capture_size
+        self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        if self.plugin.capture_fps:
+            self.camera.set(cv2.CAP_PROP_FPS, self.plugin.capture_fps)
+        if not self.camera.isOpened():
+            print(f"Error: No se pudo abrir la cámara de {self.name} con índice {self.camera_index}")
+            return False
+        return True
+
+    def start(self):
+        """Arranca el hilo de la tubería"""
+        self._thread = threading.Thread(target=self._run, name=f'camara-{self.name}', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Detiene el hilo y libera la cámara"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        if self.camera is not None:
+            self.camera.release()
+
+    def latest(self):
+        """Último resultado de la tubería (None si aún no hay ninguno)"""
+        return self.samples[-1] if self.samples else None
+
+    def _run(self):
+        try:
+            while not self._stop_event.is_set():
+                start = profiler.now()
+                ok, frame = self.camera.read()
+                timestamp = time.perf_counter()
+                if not ok:
+                    print(f"Error: No se pudo leer un fotograma de la cámara de {self.name}")
+                    break
+                profiler.record(f'capture[{self.name}]', start)
+
+                # Voltear horizontalmente y convertir a RGB para el modelo
+                start = profiler.now()
+                frame = cv2.flip(frame, 1)
+                image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                results = self.plugin.infer(image)
+                profiler.record(f'inference[{self.name}]', start)
+
+                self.frames += 1
+                with self.condition:
+                    self.samples.append(Sample(timestamp, self.frames, frame, results))
+                    self.condition.notify_all()
+        except Exception as e:
+            print(f"Error en la cámara de {self.name}: {e}")
+            traceback.print_exc()
+        finally:
+            with self.condition:
+                self.finished = True
+                self.condition.notify_all()
+
+
+class TimestampMerger:
+    """Empareja cada resultado de la cámara principal con el de la secundaria más cercano en el tiempo"""
+
+    def __init__(self, primary, secondary, condition, max_skew=MAX_SKEW):
+        self.primary = primary
+        self.secondary = secondary
+        self.condition = condition
+        self.max_skew = max_skew
+        self.merged = 0
+        self.paired = 0
+        self.skews = deque(maxlen=STATS_CAPACITY)      # Desfase de cada pareja (s)
+        self.latencies = deque(maxlen=STATS_CAPACITY)  # Latencia de cada fusión (s)
+        self._last_sequence = 0
+
+    def _nearest(self, timestamp):
+        """Resultado de la cámara secundaria capturado más cerca de timestamp"""
+        if not self.secondary.samples:
+            return None
+        return min(self.secondary.samples, key=lambda sample: abs(sample.timestamp - timestamp))
+
+    def next(self, timeout=MERGE_POLL):
+        """
+        Espera al siguiente resultado de la cámara principal y lo empareja.
+
+        Returns:
+            (resultado principal, resultado secundario o None), o None si no llegó
+            ningún resultado principal nuevo en timeout segundos
+        """
+        with self.condition:
+            if not self.condition.wait_for(
+                    lambda: self.primary.finished or
+                    (self.primary.samples and self.primary.samples[-1].sequence > self._last_sequence),
+                    timeout):
+                return None
+            primary = self.primary.latest()
+            if primary is None or primary.sequence <= self._last_sequence:
+                return None
+            self._last_sequence = primary.sequence
+
+            # Si la secundaria va por detrás, esperarla hasta max_skew después de la captura principal
+            deadline = primary.timestamp + self.max_skew
+            secondary = self._nearest(primary.timestamp)
+            while (not self.secondary.finished and
+                   (secondary is None or abs(secondary.timestamp - primary.timestamp) > self.max_skew) and
+                   (secondary is None or secondary.timestamp < primary.timestamp)):
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+                secondary = self._nearest(primary.timestamp)
+
+        self.merged += 1
+        if secondary is not None and abs(secondary.timestamp - primary.timestamp) > self.max_skew:
+            secondary = None
+        newest = primary.timestamp
+        if secondary is not None:
+            self.paired += 1
+            self.skews.append(secondary.timestamp - primary.timestamp)
+            newest = max(newest, secondary.timestamp)
+        self.latencies.append(time.perf_counter() - newest)
+        return primary, secondary
+
+    def print_report(self):
+        """Imprime el desfase de las parejas y la latencia de la fusión"""
+        if not self.merged:
+            return
+        print(f"\nFusión de cámaras: {self.merged} frames de {self.primary.name},"
+              f" {self.paired} emparejados con {self.secondary.name}"
+              f" ({100.0 * self.paired / self.merged:.0f}%, desfase máximo {1000 * self.max_skew:.0f} ms)")
+        print(f"  Frames procesados: {self.primary.name} {self.primary.frames},"
+              f" {self.secondary.name} {self.secondary.frames}")
+        for title, values in (('Desfase (secundaria - principal)', self.skews),
+                              ('Latencia de la fusión', self.latencies)):
+            if values:
+                values = 1000.0 * np.asarray(values)
+                print(f"  {title}: media {values.mean():.1f} ms, p50 {np.percentile(values, 50):.1f} ms,"
+                      f" p95 {np.percentile(values, 95):.1f} ms, máx {np.abs(values).max():.1f} ms")
+
+
+def _paste_inset(frame, inset):
+    """Incrusta una imagen reducida en la esquina superior derecha del frame"""
+    height, width = frame.shape[:2]
+    inset_width = int(width * INSET_WIDTH)
+    inset_height = int(inset.shape[0] * inset_width / inset.shape[1])
+    if inset_width <= 0 or inset_height <= 0 or inset_height > height:
+        return
+    small = cv2.resize(inset, (inset_width, inset_height), interpolation=cv2.INTER_AREA)
+    frame[:inset_height, width - inset_width:] = small
+    cv2.rectangle(frame, (width - inset_width, 0), (width - 1, inset_height - 1), (255, 255, 255), 1)
+
+
+def run_multi_camera(primary_plugin, secondary_plugin, primary_camera, secondary_camera,
+                     headless=False, preview_fps=DEFAULT_PREVIEW_FPS,
+                     preview_scale=DEFAULT_PREVIEW_SCALE, record=None, replay=None,
+                     max_skew=MAX_SKEW):
+    """
+    Ejecuta un juego con dos cámaras hasta que se solicita la salida.
+
+    Args:
+        primary_plugin: GamePlugin de la cámara principal (marca el ritmo y dibuja la vista previa)
+        secondary_plugin: GamePlugin de la cámara secundaria (classify recibe None si no hay pareja
+                          o si su frame ya se clasificó con otro de la principal)
+        primary_camera: Índice de la cámara principal
+        secondary_camera: Índice de la cámara secundaria
+        headless: Si es True no se dibuja nada ni se abre ventana
+        preview_fps: Máximo de FPS de la ventana de vista previa
+        preview_scale: Escala de la imagen en la vista previa
+        record: Nombre base donde grabar la sesión de la cámara principal (None para no grabar)
+        replay: Nombre base de una sesión a reproducir en lugar de la cámara principal
+        max_skew: Desfase máximo entre las capturas de una pareja (segundos)
+    """
+    condition = threading.Condition()
+    primary = CameraPipeline('cuerpo', primary_plugin, primary_camera, condition, record=record, replay=replay)
+    secondary = CameraPipeline('manos', secondary_plugin, secondary_camera, condition)
+    merger = TimestampMerger(primary, secondary, condition, max_skew=max_skew)
+    preview = None
+    try:
+        if primary_plugin.url:
+            print(f"Abriendo {primary_plugin.title} en el navegador...")
+            webbrowser.open(primary_plugin.url)
+
+        # El ritmo de frames (--pacing) se analiza en la cámara principal, que marca el ritmo del bucle
+        if not primary.open(pacing=True) or not secondary.open():
+            return
+        metrics.set_source_fps(primary.camera.get(cv2.CAP_PROP_FPS))
+
+        install_exit_handlers()
+
+        # Crear la ventana en su propio hilo para no frenar el control (no hay ventana en modo headless)
+        if not headless:
+            preview = PreviewWindow(primary_plugin.window_title, max_fps=preview_fps, scale=preview_scale).start()
+
+        primary_plugin.start()
+        secondary_plugin.start()
+        for line in primary_plugin.instructions(headless) + secondary_plugin.instructions(headless):
+            print(line)
+
+        primary.start()
+        secondary.start()
+
+        fps_meter = FpsMeter()
+        frame_count = 0
+        start_time = time.time()
+        last_secondary = 0  # Último frame de la cámara secundaria ya clasificado
+
+        while not exit_requested(check_console=headless):
+            # Esperar al siguiente resultado de la cámara principal y a su pareja
+            profiler.start_frame()
+            pair = merger.next()
+            if pair is None:
+                if primary.finished:
+                    break
+                continue
+            profiler.lap('merge')
+            fps_meter.tick()
+            sample, hand_sample = pair
+
+            # Una secundaria más lenta repite su frame en varias parejas: solo se clasifica la
+            # primera vez (contar de nuevo el mismo frame rompería las cuentas de frames seguidos)
+            # y en las demás se pasa None, aunque se siga dibujando en el recuadro
+            fresh = hand_sample is not None and hand_sample.sequence > last_secondary
+            if fresh:
+                last_secondary = hand_sample.sequence
+            observation = primary_plugin.classify(sample.results, sample.frame.shape)
+            secondary_observation = secondary_plugin.classify(
+                hand_sample.results if fresh else None,
+                hand_sample.frame.shape if fresh else None)
+            profiler.lap('classification')
+
+            now = time.time()
+            primary_plugin.act(observation, now)
+            secondary_plugin.act(secondary_observation, now)
+            profiler.lap('injection')
+
+            frame_count += 1
+            # Contar el frame para las estadísticas del menú, las métricas y la memoria
+            report_frame()
+            metrics.observe_frame(detected=primary_plugin.detected(sample.results))
+            memory_tracker.frame()
+
+            # En modo headless o entre frames de la vista previa no se dibuja nada
+            if preview is None or not preview.wants_frame():
+                continue
+
+            frame = primary_plugin.render(sample.frame, sample.results, observation, fps_meter.fps)
+            if hand_sample is not None:
+                inset = secondary_plugin.render(hand_sample.frame.copy(), hand_sample.results,
+                                                secondary_observation, fps_meter.fps)
+                _paste_inset(frame, inset)
+            profiler.lap('drawing')
+
+            # Entregar el frame a la vista previa (ESC en la ventana solicita la salida)
+            preview.submit(frame)
+
+        elapsed = time.time() - start_time
+        if frame_count and elapsed > 0:
+            print(f"Frames procesados: {frame_count} - FPS medio: {frame_count / elapsed:.1f}")
+
+    except Exception as e:
+        print(f"Error durante el juego: {e}")
+        traceback.print_exc()
+
+    finally:
+        # Detener las tuberías y asegurar que se sueltan todas las teclas y se libera la ventana
+        primary.stop()
+        secondary.stop()
+        primary_plugin.release()
+        secondary_plugin.release()
+        if preview is not None:
+            preview.stop()
+        merger.print_report()
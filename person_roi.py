@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Región de la persona para la pose de Subway Surfers
+
+El jugador de Subway Surfers ocupa una franja vertical del frame; con una cámara
+gran angular el resto es fondo. Con --person-roi el modelo de pose recibe solo un
+recorte con margen alrededor de la persona, localizada con:
+
+    - la caja de los landmarks de la pose del frame anterior (si se detectó), y
+    - el primer plano de un sustractor de fondo MOG2 calculado sobre una versión
+      pequeña en grises del frame (lo que se mueve respecto al fondo).
+
+Los landmarks del recorte se pasan a coordenadas del frame completo antes de
+devolverlos, así que checkLeftRight/checkJumpCrouch y el dibujado no cambian.
+
+MediaPipe reduce cualquier entrada a un tamaño fijo, así que recortar no abarata una
+llamada por sí solo: el jugador llega al modelo más grande (mejor detección y menos
+pérdidas de seguimiento en gran angular) y, sin persona y sin nada moviéndose, el
+modelo no se ejecuta salvo una búsqueda en el frame completo cada SEARCH_INTERVAL
+frames (para encontrar a alguien que entra quieto).
+
+El modelo en modo vídeo sigue a la persona de un frame al siguiente en coordenadas
+normalizadas de su entrada, así que un recorte que se mueve le daría una posición
+previa equivocada. Por eso los recortes van a una instancia propia del modelo (la
+del frame completo sigue con sus búsquedas), el recorte solo cambia cuando la
+persona se acerca a su borde o se queda pequeña dentro de él, y al cambiar se
+reinicia el seguimiento de esa instancia.
+
+La caja de la persona se toma de los resultados que usa el bucle (observe), que
+con --flow pueden ser landmarks propagados y no los de la última inferencia.
+
+Uso:
+    from person_roi import person_roi, start_person_roi
+
+    start_person_roi(True, lambda: mp_pose.Pose(static_image_mode=False))
+    results = person_roi.infer(pose_video.process, image)
+    person_roi.observe(results)   # Con los resultados que se clasifican
+"""
+
+import atexit
+
+import cv2
+import numpy as np
+
+from landmark_stream import PoseResult
+from stage_profiler import profiler
+
+# Ancho de la imagen en grises sobre la que trabaja el sustractor de fondo
+MASK_WIDTH = 160
+
+# Frames de historia del sustractor y umbral de la distancia al fondo
+BACKGROUND_HISTORY = 300
+BACKGROUND_THRESHOLD = 25
+
+# Área mínima de una mancha de primer plano (fracción de la imagen) para tenerla en cuenta
+MIN_BLOB = 0.002
+
+# Visibilidad mínima de un landmark para entrar en la caja de la persona
+MIN_VISIBILITY = 0.5
+
+# Margen alrededor de la persona (fracción de su ancho y alto en cada lado)
+PADDING = 0.3
+
+# Margen que debe quedar entre la persona y el borde del recorte para no moverlo
+KEEP_MARGIN = 0.1
+
+# Tamaño mínimo del recorte (fracción del ancho y del alto del frame)
+MIN_ROI = 0.3
+
+# Proporción del área del recorte sobre la necesaria a partir de la que se ajusta
+MAX_SLACK = 2.0
+
+# Frames sin persona ni movimiento entre dos búsquedas en el frame completo
+SEARCH_INTERVAL = 15
+
+
+class PersonRoi:
+    """Recorta la entrada del modelo de pose a la región de la persona"""
+
+    def __init__(self):
+        self.enabled = False
+        self.frames = 0
+        self.inferences = 0
+        self.full_frames = 0    # Inferencias sobre el frame completo (búsquedas y sin región)
+        self.moves = 0          # Cambios del recorte
+        self._area_total = 0.0
+
+        self._subtractor = None
+        self._crop_model = None     # Instancia del modelo para los recortes
+        self._crop_changed = True   # El recorte cambió: reiniciar el seguimiento de esa instancia
+        self._kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+        self._roi = None        # Recorte actual (x0, y0, x1, y1) normalizado
+        self._pose_box = None   # Caja de la pose del frame anterior (x0, y0, x1, y1) normalizada
+        self._idle = 0          # Frames seguidos sin persona ni movimiento
+
+    def enable(self, crop_model):
+        """
+        Activa el recorte a la región de la persona.
+
+        Args:
+            crop_model: Modelo de pose propio para los recortes (con process() y reset())
+        """
+        self._crop_model = crop_model
+        self._subtractor = cv2.createBackgroundSubtractorMOG2(
+            history=BACKGROUND_HISTORY, varThreshold=BACKGROUND_THRESHOLD, detectShadows=False)
+        self.enabled = True
+
+    def infer(self, model, image):
+        """
+        Ejecuta el modelo de pose sobre la región de la persona.
+
+        Args:
+            model: Función que ejecuta el modelo sobre el frame completo (pose_video.process)
+            image: Imagen RGB preprocesada del frame completo
+
+        Returns:
+            Resultado del modelo con los landmarks en coordenadas del frame completo
+        """
+        if not self.enabled:
+            return model(image)
+
+        start = profiler.now()
+        self.frames += 1
+        foreground = self._foreground(image)
+        roi = self._locate(foreground)
+        profiler.record('person_roi', start)
+
+        if roi is None:
+            # Nadie a la vista: el modelo no se ejecuta
+            return PoseResult(None)
+
+        height, width = image.shape[:2]
+        x0, y0, x1, y1 = (int(round(roi[0] * width)), int(round(roi[1] * height)),
+                          int(round(roi[2] * width)), int(round(roi[3] * height)))
+        self.inferences += 1
+        self._area_total += (x1 - x0) * (y1 - y0) / float(width * height)
+        if (x0, y0, x1, y1) == (0, 0, width, height):
+            self.full_frames += 1
+            results = model(image)
+        else:
+            if self._crop_changed:
+                # La posición previa del seguimiento era relativa al recorte anterior
+                self._crop_model.reset()
+                self._crop_changed = False
+            results = self._crop_model.process(np.ascontiguousarray(image[y0:y1, x0:x1]))
+            self._to_frame(results, x0, y0, x1 - x0, y1 - y0, width, height)
+        return results
+
+    def observe(self, results):
+        """Toma la caja de la persona de los resultados que usa el bucle en este frame"""
+        if self.enabled:
+            self._pose_box = self._box(results)
+
+    def _foreground(self, image):
+        """Caja normalizada de lo que se mueve respecto al fondo (None si no hay nada)"""
+        height, width = image.shape[:2]
+        size = (MASK_WIDTH, max(1, int(round(height * MASK_WIDTH / width))))
+        small = cv2.resize(image, size, interpolation=cv2.INTER_AREA) if width > MASK_WIDTH else image
+        mask = self._subtractor.apply(cv2.cvtColor(small, cv2.COLOR_RGB2GRAY))
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self._kernel)
+
+        count, _, stats, _ = cv2.connectedComponentsWithStats(mask)
+        blobs = stats[1:count]
+        blobs = blobs[blobs[:, cv2.CC_STAT_AREA] >= MIN_BLOB * mask.size]
+        if not len(blobs):
+            return None
+        mask_height, mask_width = mask.shape
+        left, top = blobs[:, cv2.CC_STAT_LEFT], blobs[:, cv2.CC_STAT_TOP]
+        right = left + blobs[:, cv2.CC_STAT_WIDTH]
+        bottom = top + blobs[:, cv2.CC_STAT_HEIGHT]
+        return (left.min() / mask_width, top.min() / mask_height,
+                right.max() / mask_width, bottom.max() / mask_height)
+
+    def _locate(self, foreground):
+        """
+        Elige el recorte del frame.
+
+        Returns:
+            Recorte (x0, y0, x1, y1) normalizado, o None si no hay que ejecutar el modelo
+        """
+        target = _union(self._pose_box, foreground)
+        if target is None:
+            # Sin persona ni movimiento: buscar en el frame completo de vez en cuando
+            self._roi = None
+            self._crop_changed = True
+            self._idle += 1
+            if self._idle < SEARCH_INTERVAL:
+                return None
+            self._idle = 0
+            return (0.0, 0.0, 1.0, 1.0)
+        self._idle = 0
+
+        padded = _pad(target, PADDING, MIN_ROI)
+        if self._roi is None or not _contains(self._roi, _pad(target, KEEP_MARGIN)) \
+                or _area(self._roi) > MAX_SLACK * _area(padded):
+            if self._roi is not None:
+                self.moves += 1
+            self._roi = padded
+            self._crop_changed = True
+        return self._roi
+
+    @staticmethod
+    def _box(results):
+        """Caja normalizada de los landmarks visibles de la pose (None sin persona)"""
+        landmarks = results.pose_landmarks
+        if landmarks is None:
+            return None
+        points = [(lm.x, lm.y) for lm in landmarks.landmark
+                  if (getattr(lm, 'visibility', None) or 0.0) >= MIN_VISIBILITY]
+        if not points:
+            return None
+        xs, ys = zip(*points)
+        return (min(xs), min(ys), max(xs), max(ys))
+
+    @staticmethod
+    def _to_frame(results, x0, y0, roi_width, roi_height, width, height):
+        """Pasa los landmarks del recorte a coordenadas normalizadas del frame completo"""
+        if results.pose_landmarks is None:
+            return
+        for lm in results.pose_landmarks.landmark:
+            lm.x = (x0 + lm.x * roi_width) / width
+            lm.y = (y0 + lm.y * roi_height) / height
+            # z tiene la escala de x
+            lm.z = lm.z * roi_width / width
+
+    def print_report(self):
+        """Imprime cuántos frames se infirieron y el tamaño medio del recorte"""
+        if not self.frames:
+            return
+        mean_area = 100.0 * self._area_total / self.inferences if self.inferences else 0.0
+        print(f"\nRegión de la persona: {self.inferences} inferencias en {self.frames} frames"
+              f" ({100.0 * self.inferences / self.frames:.0f}%), recorte medio del {mean_area:.0f}% del frame,"
+              f" {self.full_frames} en el frame completo, {self.moves} cambios de recorte")
+
+
+def _union(first, second):
+    """Unión de dos cajas (cualquiera puede ser None)"""
+    if first is None or second is None:
+        return first or second
+    return (min(first[0], second[0]), min(first[1], second[1]),
+            max(first[2], second[2]), max(first[3], second[3]))
+
+
+def _pad(box, padding, minimum=0.0):
+    """Caja con un margen proporcional a su tamaño, de al menos minimum y dentro del frame"""
+    x0, y0, x1, y1 = box
+    half_width = max((x1 - x0) * (0.5 + padding), minimum / 2)
+    half_height = max((y1 - y0) * (0.5 + padding), minimum / 2)
+    center_x, center_y = (x0 + x1) / 2, (y0 + y1) / 2
+    return (max(0.0, center_x - half_width), max(0.0, center_y - half_height),
+            min(1.0, center_x + half_width), min(1.0, center_y + half_height))
+
+
+def _contains(outer, inner):
+    """Indica si la caja inner está dentro de outer"""
+    return outer[0] <= inner[0] and outer[1] <= inner[1] and outer[2] >= inner[2] and outer[3] >= inner[3]
+
+
+def _area(box):
+    """Área de una caja normalizada"""
+    return max(0.0, box[2] - box[0]) * max(0.0, box[3] - box[1])
+
+
+# Recorte compartido por el plugin de Subway Surfers
+person_roi = PersonRoi()
+
+
+def start_person_roi(enabled, crop_model_factory):
+    """
+    Activa el recorte a la región de la persona y programa el informe al terminar el proceso.
+
+    Args:
+        enabled: Si es False la pose se infiere sobre el frame completo
+        crop_model_factory: Crea el modelo de pose propio de los recortes (solo si se activa)
+    """
+    if not enabled:
+        return
+    person_roi.enable(crop_model_factory())
+    atexit.register(person_roi.print_report)
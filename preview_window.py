@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Ventana de vista previa desacoplada del bucle de control
+
+Con cv2.imshow y cv2.waitKey dentro del bucle principal, el gestor de ventanas marca
+el ritmo de las decisiones de gestos. PreviewWindow muestra los frames anotados desde
+su propio hilo, a una tasa limitada (por ejemplo 15 FPS) y reducidos de tamaño, de
+forma que el bucle de control solo entrega el último frame y sigue a la velocidad
+de la cámara.
+
+Todas las llamadas de HighGUI (namedWindow, imshow, waitKey, destroyWindow) se hacen
+desde el hilo de la vista previa. Esto funciona en Windows y Linux; en macOS HighGUI
+exige el hilo principal, por lo que allí conviene usar --headless.
+
+Uso:
+    preview = PreviewWindow('Mi ventana', max_fps=15, scale=0.75)
+    preview.start()
+    while not exit_requested():
+        ...
+        if preview.wants_frame():
+            dibujar(frame)
+            preview.submit(frame)
+    preview.stop()
+
+ESC en la ventana o cerrarla solicita la salida con controller_runtime.request_exit().
+"""
+
+import cv2
+import time
+import threading
+
+from controller_runtime import request_exit, DEFAULT_PREVIEW_FPS, DEFAULT_PREVIEW_SCALE
+from stage_profiler import profiler
+
+
+class PreviewWindow:
+    """Muestra el último frame anotado en un hilo propio a una tasa limitada"""
+
+    def __init__(self, window_name, max_fps=DEFAULT_PREVIEW_FPS, scale=DEFAULT_PREVIEW_SCALE):
+        """
+        Inicializa la vista previa.
+
+        Args:
+            window_name: Título de la ventana de OpenCV
+            max_fps: Máximo de frames por segundo mostrados (0 = sin límite)
+            scale: Factor de escala aplicado al frame antes de mostrarlo
+        """
+        self.window_name = window_name
+        self.period = 1.0 / max_fps if max_fps and max_fps > 0 else 0.0
+        self.scale = scale
+
+        self._frame = None
+        self._lock = threading.Lock()
+        self._frame_ready = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._next_due = 0.0
+
+    def start(self):
+        """Crea el hilo de la vista previa"""
+        self._thread = threading.Thread(target=self._run, name='preview-window', daemon=True)
+        self._thread.start()
+        return self
+
+    def wants_frame(self):
+        """
+        Indica si el próximo frame entregado se mostrará.
+
+        El bucle de control puede usarlo para dibujar las anotaciones solo en los
+        frames que realmente llegan a la ventana.
+        """
+        return time.perf_counter() >= self._next_due
+
+    def submit(self, frame):
+        """
+        Entrega un frame anotado para mostrarlo sin bloquear.
+
+        El frame no debe modificarse después de entregarlo. Si todavía no toca mostrar
+        otro frame según max_fps, se descarta.
+
+        Returns:
+            True si el frame se aceptó para mostrarse
+        """
+        now = time.perf_counter()
+        if now < self._next_due:
+            return False
+        self._next_due = now + self.period
+
+        with self._lock:
+            self._frame = frame
+        self._frame_ready.set()
+        return True
+
+    def stop(self):
+        """Detiene el hilo y cierra la ventana"""
+        self._stop_event.set()
+        self._frame_ready.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def _poll_window(self):
+        """Procesa los eventos de la ventana y solicita la salida con ESC o al cerrarla"""
+        key = cv2.waitKey(1) & 0xFF
+        if key == 27:  # Tecla ESC
+            request_exit()
+        elif cv2.getWindowProperty(self.window_name, cv2.WND_PROP_VISIBLE) < 1:
+            request_exit()
+
+    def _run(self):
+        """Bucle del hilo de la vista previa"""
+        try:
+            cv2.namedWindow(self.window_name, cv2.WINDOW_NORMAL)
+            while not self._stop_event.is_set():
+                # Sin frames nuevos, seguir atendiendo los eventos de la ventana
+                if not self._frame_ready.wait(timeout=0.05):
+                    self._poll_window()
+                    continue
+
+                with self._lock:
+                    frame = self._frame
+                    self._frame = None
+                    self._frame_ready.clear()
+
+                if frame is None:
+                    continue
+
+                # La reducción y el imshow cuentan como una etapa en el hilo de la vista previa
+                start = profiler.now()
+                if self.scale != 1.0:
+                    frame = cv2.resize(frame, (0, 0), fx=self.scale, fy=self.scale,
+                                       interpolation=cv2.INTER_AREA)
+
+                cv2.imshow(self.window_name, frame)
+                self._poll_window()
+                profiler.record('imshow', start)
+        except cv2.error as e:
+            print(f"Error en la vista previa: {e}")
+            request_exit()
+        finally:
+            try:
+                cv2.destroyWindow(self.window_name)
+            except cv2.error:
+                pass
@@ -0,0 +1,291 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Grabación y reproducción de sesiones de cámara
+
+Para reproducir un fallo ("no detectó mi salto") hace falta la entrada exacta que
+vio el controlador. Con --record los controladores guardan los frames tal como
+llegan de la cámara (antes de voltearlos o dibujar) y el instante de cada uno; con
+--replay los vuelven a leer en lugar de la cámara, con el mismo ritmo.
+
+Una sesión son dos archivos con el mismo nombre base:
+    sesion.avi: frames en MJPEG de alta calidad
+    sesion.csv: índice con una línea por frame guardado:
+                frame, número de captura y segundos desde el primer frame
+
+La escritura la hace un hilo propio a través de una cola limitada: si el disco no
+da abasto se descartan frames (quedan como huecos en la columna de captura) en
+lugar de frenar el bucle de visión.
+
+Uso:
+    camera = open_capture(0, record='sesion')    # Cámara 0 grabando la sesión
+    camera = open_capture(None, replay='sesion') # Reproducir la sesión grabada
+"""
+
+import os
+import csv
+import cv2
+import time
+import queue
+import atexit
+import threading
+
+# Calidad JPEG de los frames grabados (0-100)
+RECORD_QUALITY = 95
+
+# Frames que pueden esperar al hilo de escritura antes de empezar a descartar
+RECORD_QUEUE_SIZE = 64
+
+# FPS nominales del contenedor si la cámara no los informa (el ritmo real va en el índice)
+DEFAULT_RECORD_FPS = 30.0
+
+INDEX_FIELDS = ('frame', 'capture', 'timestamp')
+
+
+def session_paths(path):
+    """
+    Devuelve las rutas (vídeo, índice) de una sesión.
+
+    Args:
+        path: Nombre base de la sesión, con o sin la extensión .avi o .csv
+    """
+    base, extension = os.path.splitext(path)
+    if extension.lower() not in ('.avi', '.csv'):
+        base = path
+    return base + '.avi', base + '.csv'
+
+
+class SessionRecorder:
+    """Guarda frames y sus instantes en disco desde un hilo propio"""
+
+    def __init__(self, path, fps=DEFAULT_RECORD_FPS, quality=RECORD_QUALITY,
+                 queue_size=RECORD_QUEUE_SIZE):
+        """
+        Inicializa el grabador.
+
+        Args:
+            path: Nombre base de la sesión (ver session_paths)
+            fps: FPS nominales del contenedor de vídeo
+            quality: Calidad JPEG de los frames (0-100)
+            queue_size: Frames pendientes de escribir antes de descartar
+        """
+        self.video_path, self.index_path = session_paths(path)
+        self.fps = fps or DEFAULT_RECORD_FPS
+        self.quality = quality
+
+        self.captured = 0   # Frames recibidos
+        self.written = 0    # Frames guardados
+        self.dropped = 0    # Frames descartados por la cola llena
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._start_time = None
+        self._thread = None
+
+    def start(self):
+        """Crea el hilo de escritura"""
+        directory = os.path.dirname(os.path.abspath(self.video_path))
+        os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name='session-recorder', daemon=True)
+        self._thread.start()
+        # Cerrar el vídeo aunque el controlador termine sin liberar la cámara (por un error)
+        atexit.register(self.close)
+        return self
+
+    def write(self, frame, timestamp=None):
+        """
+        Encola un frame para grabarlo sin bloquear (lo descarta si la cola está llena).
+
+        Args:
+            frame: Frame BGR tal como lo entregó la cámara (no debe modificarse después)
+            timestamp: Instante de captura en segundos de time.perf_counter() (por defecto, ahora)
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        if self._start_time is None:
+            self._start_time = timestamp
+
+        capture_number = self.captured
+        self.captured += 1
+        try:
+            self._queue.put_nowait((frame, capture_number, timestamp - self._start_time))
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout=10.0):
+        """Termina de escribir los frames pendientes y cierra los archivos"""
+        if self._thread is None:
+            return
+        # El aviso de fin no puede perderse aunque la cola esté llena
+        self._queue.put(None)
+        self._thread.join(timeout=timeout)
+        self._thread = None
+        atexit.unregister(self.close)
+        print(f"Sesión grabada en {self.video_path}: {self.written} frames"
+              f" ({self.dropped} descartados)")
+
+    def _run(self):
+        """Bucle del hilo: escribe cada frame en el vídeo y su línea en el índice"""
+        writer = None
+        try:
+            with open(self.index_path, 'w', newline='', encoding='utf-8') as index_file:
+                index = csv.writer(index_file)
+                index.writerow(INDEX_FIELDS)
+
+                while True:
+                    item = self._queue.get()
+                    if item is None:
+                        break
+                    frame, capture_number, timestamp = item
+
+                    if writer is None:
+                        height, width = frame.shape[:2]
+                        size = (width, height)
+                        writer = cv2.VideoWriter(self.video_path, cv2.VideoWriter_fourcc(*'MJPG'),
+                                                 self.fps, (width, height))
+                        writer.set(cv2.VIDEOWRITER_PROP_QUALITY, self.quality)
+                        if not writer.isOpened():
+                            print(f"Error: No se pudo crear el vídeo de la sesión {self.video_path}")
+                            break
+
+                    # VideoWriter descarta sin avisar los frames de otro tamaño y el índice dejaría
+                    # de corresponder al vídeo: se llevan al tamaño del primero
+                    if (frame.shape[1], frame.shape[0]) != size:
+                        frame = cv2.resize(frame, size, interpolation=cv2.INTER_LINEAR)
+                    writer.write(frame)
+                    index.writerow((self.written, capture_number, f'{timestamp:.6f}'))
+                    self.written += 1
+                    if self._queue.empty():
+                        index_file.flush()
+        except (OSError, cv2.error) as e:
+            print(f"Error al grabar la sesión: {e}")
+        finally:
+            if writer is not None:
+                writer.release()
+
+
+class RecordingCapture:
+    """Envuelve una captura de OpenCV y graba cada frame leído"""
+
+    def __init__(self, capture, recorder):
+        self.capture = capture
+        self.recorder = recorder
+
+    def read(self):
+        ok, frame = self.capture.read()
+        if ok:
+            # Los controladores voltean el frame en una copia, así que se puede encolar sin copiarlo
+            self.recorder.write(frame)
+        return ok, frame
+
+    def release(self):
+        self.capture.release()
+        self.recorder.close()
+
+    def __getattr__(self, name):
+        # isOpened, set, get... se delegan en la captura original
+        return getattr(self.capture, name)
+
+
+class ReplayCapture:
+    """
+    Lee una sesión grabada con la interfaz de cv2.VideoCapture.
+
+    Con realtime=True cada frame se entrega en el mismo instante (relativo a la
+    primera lectura) en que se capturó, de modo que el controlador ve el mismo ritmo
+    que durante la grabación. Todos los frames se entregan una vez y en orden: si el
+    controlador va más lento que la grabación se entregan sin esperar.
+    """
+
+    def __init__(self, path, realtime=True):
+        """
+        Abre la sesión.
+
+        Args:
+            path: Nombre base de la sesión (ver session_paths)
+            realtime: Si es True se respeta el ritmo de la grabación
+        """
+        self.video_path, self.index_path = session_paths(path)
+        self.realtime = realtime
+        self.capture = cv2.VideoCapture(self.video_path)
+        self.timestamps = self._load_timestamps()
+
+        self.position = 0
+        self._start_time = None
+
+    def _load_timestamps(self):
+        """Lee los instantes del índice (o los calcula con los FPS del vídeo si no hay índice)"""
+        try:
+            with open(self.index_path, newline='', encoding='utf-8') as index_file:
+                return [float(row['timestamp']) for row in csv.DictReader(index_file)]
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Aviso: índice de sesión no válido ({e}), se usan los FPS del vídeo")
+
+        fps = self.capture.get(cv2.CAP_PROP_FPS) or DEFAULT_RECORD_FPS
+        frame_count = int(self.capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        return [i / fps for i in range(frame_count)]
+
+    def isOpened(self):
+        return self.capture.isOpened()
+
+    def read(self):
+        if self.position >= len(self.timestamps):
+            return False, None
+        ok, frame = self.capture.read()
+        if not ok:
+            return False, None
+
+        now = time.perf_counter()
+        if self._start_time is None:
+            self._start_time = now - self.timestamps[self.position]
+        elif self.realtime:
+            delay = self._start_time + self.timestamps[self.position] - now
+            if delay > 0:
+                time.sleep(delay)
+        self.position += 1
+        return True, frame
+
+    def get(self, prop_id):
+        if prop_id == cv2.CAP_PROP_FPS:
+            if len(self.timestamps) > 1 and self.timestamps[-1] > 0:
+                return (len(self.timestamps) - 1) / self.timestamps[-1]
+            return self.capture.get(prop_id)
+        if prop_id == cv2.CAP_PROP_FRAME_COUNT:
+            return float(len(self.timestamps))
+        if prop_id == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.position)
+        if prop_id == cv2.CAP_PROP_POS_MSEC:
+            return 1000.0 * self.timestamps[self.position - 1] if self.position else 0.0
+        return self.capture.get(prop_id)
+
+    def set(self, prop_id, value):
+        # La resolución y los FPS son los de la grabación
+        return False
+
+    def release(self):
+        self.capture.release()
+
+
+def open_capture(camera_index, record=None, replay=None):
+    """
+    Abre la fuente de frames de un controlador.
+
+    Args:
+        camera_index: Índice de la cámara (se ignora al reproducir una sesión)
+        record: Nombre base donde grabar la sesión (None para no grabar)
+        replay: Nombre base de una sesión a reproducir en lugar de la cámara
+
+    Returns:
+        Un objeto con la interfaz de cv2.VideoCapture
+    """
+    if replay:
+        capture = ReplayCapture(replay)
+        print(f"Reproduciendo la sesión {capture.video_path} ({len(capture.timestamps)} frames)")
+    else:
+        capture = cv2.VideoCapture(camera_index)
+
+    if record and capture.isOpened():
+        recorder = SessionRecorder(record, fps=capture.get(cv2.CAP_PROP_FPS)).start()
+        print(f"Grabando la sesión en {recorder.video_path}")
+        capture = RecordingCapture(capture, recorder)
+    return capture
@@ -21,10 +21,59 @@ import cv2
 import pyautogui
 from time import time
 from math import hypot
+from dataclasses import dataclass
 import mediapipe as mp
 import matplotlib.pyplot as plt
-import argparse
-import webbrowser
+
+from controller_runtime import DEFAULT_PREVIEW_FPS, DEFAULT_PREVIEW_SCALE
+from controller_pipeline import (GamePlugin, run_pipeline, find_camera, create_parser,
+                                 start_instrumentation, play_arguments, no_arguments)
+from game_config import load_game_config, default_game_config
+from multi_camera import run_multi_camera, MAX_SKEW
+from async_pipeline import run_async_pipeline
+from hud_overlay import HudLayer, text_layer, opaque
+from stage_profiler import profiler
+from person_roi import person_roi, start_person_roi
+
+# Actions of the game with their default key (the position is their index in the key table)
+ACTIONS = (
+    ('left', 'left'),
+    ('right', 'right'),
+    ('jump', 'up'),
+    ('crouch', 'down'),
+    ('pause', 'space'),
+)
+LEFT, RIGHT, JUMP, CROUCH, PAUSE = range(len(ACTIONS))
+
+@dataclass(frozen=True, slots=True)
+class SubwaySurfersTuning:
+    '''Thresholds of the Subway Surfers pose controls (tuned in configs/subway_surfers.json)'''
+    hands_joined_distance: int = 180  # Max distance between the wrists to count as joined hands (px)
+    hands_joined_frames: int = 10     # Consecutive frames with the hands joined to start or pause
+    jump_margin: int = 15             # Rise of the shoulders over MID_Y that counts as a jump (px)
+    crouch_margin: int = 100          # Drop of the shoulders under MID_Y that counts as crouching (px)
+    start_click_x: int = 1300         # Screen position clicked to start the game
+    start_click_y: int = 800
+    pinch_pause_distance: int = 30    # Max thumb-index distance of the pinch that pauses (px of the hand camera)
+    pinch_pause_frames: int = 3       # Consecutive pinched frames of the hand camera that toggle the pause
+
+def configure(path=None):
+    '''
+    Loads the game configuration and compiles its key table and thresholds.
+    Args:
+        path: JSON file to use instead of configs/subway_surfers.json.
+    '''
+    return _useConfig(load_game_config('subway_surfers', ACTIONS, SubwaySurfersTuning, path))
+
+def _useConfig(config):
+    '''Applies an already compiled configuration to the tables of the module.'''
+    global CONFIG, KEYS, TUNING
+    CONFIG = config
+    KEYS, TUNING = CONFIG.keys, CONFIG.tuning
+    return CONFIG
+
+# Defaults on import; main() reads configs/subway_surfers.json
+_useConfig(default_game_config('subway_surfers', ACTIONS, SubwaySurfersTuning))
 
 # Initialize mediapipe pose class
 mp_pose = mp.solutions.pose
@@ -37,6 +86,37 @@ pose_video = mp_pose.Pose(static_image_mode=False, model_complexity=1, min_detec
 # Initialize mediapipe drawing class
 mp_drawing = mp.solutions.drawing_utils
 
+def _draw_join_hands_hint(canvas):
+    '''Render the blinking part of the start instructions (hint text and joined hands diagram).'''
+    frame_height, frame_width = canvas.shape[:2]
+    green = opaque((0, 255, 0))
+    cv2.putText(canvas, 'Como si rezaras o aplaudieras', (frame_width//2 - 200, frame_height - 60), 
+                cv2.FONT_HERSHEY_PLAIN, 1, green, 2)
+    
+    # Dibujar manos juntas como un simple diagrama
+    hand_center_x = frame_width // 2
+    hand_center_y = frame_height // 2
+    cv2.circle(canvas, (hand_center_x - 30, hand_center_y), 40, green, 2)
+    cv2.circle(canvas, (hand_center_x + 30, hand_center_y), 40, green, 2)
+    
+    # Línea para juntar las manos
+    cv2.line(canvas, (hand_center_x - 10, hand_center_y), 
+             (hand_center_x + 10, hand_center_y), green, 5)
+
+# Pre-rendered static HUD layers (rasterized once, only composited on every frame)
+HUD_JOIN_HANDS = text_layer('JUNTA TUS MANOS FRENTE A TI', lambda w, h: (w//2 - 250, h - 100),
+                            cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 3)
+HUD_JOIN_HANDS_HINT = HudLayer(_draw_join_hands_hint)
+HUD_HANDS_JOINED = text_layer('¡MANOS UNIDAS!', (10, 130), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 3)
+HUD_PAUSE_RESUME = text_layer('¡PAUSA/CONTINUAR!', lambda w, h: (w//2 - 150, 100),
+                              cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 3)
+HUD_NO_PERSON = text_layer('No se detecta persona - Ponte frente a la camara', lambda w, h: (10, h - 50),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+
+# Drawing specifications for the pose landmarks (created once instead of on every frame)
+POSE_LANDMARK_SPEC = mp_drawing.DrawingSpec(color=(255,255,255), thickness=3, circle_radius=3)
+POSE_CONNECTION_SPEC = mp_drawing.DrawingSpec(color=(49,125,237), thickness=2, circle_radius=2)
+
 def detectPose(image, pose, draw=False, display=False):
     '''
     This function performs the pose detection on the most prominent person in an image.
@@ -48,28 +128,26 @@ def detectPose(image, pose, draw=False, display=False):
                  resultant image and returns nothing.
     Returns:
         output_image: The input image with the detected pose landmarks drawn if it was specified.
+                      When nothing is drawn this is the input image itself (no copy is made).
         results:      The output of the pose landmarks detection on the input image.
     '''
     
-    # Create a copy of the input image
-    output_image = image.copy()
-    
     # Convert the image from BGR into RGB format
     imageRGB = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    profiler.lap('cvtColor')
     
     # Perform the Pose Detection
     results = pose.process(imageRGB)
+    profiler.lap('inference')
     
-    # Check if any landmarks are detected and are specified to be drawn
-    if results.pose_landmarks and draw:
+    # Only copy the input image when something has to be drawn on it
+    output_image = image
+    if draw or display:
+        output_image = image.copy()
     
-        # Draw Pose Landmarks on the output image
-        mp_drawing.draw_landmarks(image=output_image, landmark_list=results.pose_landmarks,
-                                  connections=mp_pose.POSE_CONNECTIONS,
-                                  landmark_drawing_spec=mp_drawing.DrawingSpec(color=(255,255,255),
-                                                                               thickness=3, circle_radius=3),
-                                  connection_drawing_spec=mp_drawing.DrawingSpec(color=(49,125,237),
-                                                                               thickness=2, circle_radius=2))
+    # Check if any landmarks are detected and are specified to be drawn
+    if draw:
+        drawPoseLandmarks(output_image, results)
 
     # Check if the original input image and the resultant image are specified to be displayed
     if display:
@@ -85,6 +163,163 @@ def detectPose(image, pose, draw=False, display=False):
         # Return the output image and the results of pose landmarks detection
         return output_image, results
 
+def classifyHandsJoined(results, width, height):
+    '''
+    This function classifies whether the hands of the person are joined, using only the pose landmarks.
+    Args:
+        results: The output of the pose landmarks detection (with pose landmarks detected).
+        width:   The width of the image the landmarks were detected on.
+        height:  The height of the image the landmarks were detected on.
+    Returns:
+        hand_status:        The classified status of the hands ('Hands Joined' or 'Hands Not Joined').
+        euclidean_distance: The distance in pixels between both wrists.
+    '''
+    
+    landmarks = results.pose_landmarks.landmark
+    
+    # Get the left and right wrist landmarks x and y coordinates.
+    left_wrist = landmarks[mp_pose.PoseLandmark.LEFT_WRIST]
+    right_wrist = landmarks[mp_pose.PoseLandmark.RIGHT_WRIST]
+    
+    # Calculate the euclidean distance between the left and right wrist.
+    euclidean_distance = int(hypot(left_wrist.x * width - right_wrist.x * width,
+                                   left_wrist.y * height - right_wrist.y * height))
+    
+    # Compare the distance between the wrists with a appropriate threshold to check if both hands are joined.
+    # Umbral amplio (180 por defecto, valor original: 130) para que sea más fácil detectar las manos unidas
+    if euclidean_distance < TUNING.hands_joined_distance:
+        return 'Hands Joined', euclidean_distance
+    
+    return 'Hands Not Joined', euclidean_distance
+
+def classifyLeftRight(results, width):
+    '''
+    This function classifies the horizontal position (left, center, right) of the person from the pose landmarks.
+    Args:
+        results: The output of the pose landmarks detection (with pose landmarks detected).
+        width:   The width of the image the landmarks were detected on.
+    Returns:
+        horizontal_position: The horizontal position ('Left', 'Center', 'Right') of the person, or None.
+    '''
+    
+    landmarks = results.pose_landmarks.landmark
+    
+    # Retreive the x-coordinate of the left and right shoulder landmarks.
+    left_x = int(landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER].x * width)
+    right_x = int(landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER].x * width)
+    
+    # Check if the person is at left that is when both shoulder landmarks x-corrdinates
+    # are less than or equal to the x-corrdinate of the center of the image.
+    if (right_x <= width//2 and left_x <= width//2):
+        return 'Left'
+    
+    # Check if the person is at right that is when both shoulder landmarks x-corrdinates
+    # are greater than or equal to the x-corrdinate of the center of the image.
+    if (right_x >= width//2 and left_x >= width//2):
+        return 'Right'
+    
+    # Check if the person is at center that is when right shoulder landmark x-corrdinate is greater than or equal to
+    # and left shoulder landmark x-corrdinate is less than or equal to the x-corrdinate of the center of the image.
+    if (right_x >= width//2 and left_x <= width//2):
+        return 'Center'
+    
+    return None
+
+def classifyJumpCrouch(results, height, MID_Y=250):
+    '''
+    This function classifies the posture (Jumping, Crouching or Standing) of the person from the pose landmarks.
+    Args:
+        results: The output of the pose landmarks detection (with pose landmarks detected).
+        height:  The height of the image the landmarks were detected on.
+        MID_Y:   The intial center y-coordinate of both shoulders landmarks of the person recorded during starting
+                 the game.
+    Returns:
+        posture: The posture ('Jumping', 'Crouching' or 'Standing') of the person.
+    '''
+    
+    landmarks = results.pose_landmarks.landmark
+    
+    # Retreive the y-coordinate of the left and right shoulder landmarks.
+    left_y = int(landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER].y * height)
+    right_y = int(landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER].y * height)
+    
+    # Calculate the y-coordinate of the mid-point of both shoulders.
+    actual_mid_y = abs(right_y + left_y) // 2
+    
+    # Check if the person has jumped that is when the y-coordinate of the mid-point 
+    # of both shoulders is less than the lower bound.
+    if (actual_mid_y < MID_Y-TUNING.jump_margin):
+        return 'Jumping'
+    
+    # Check if the person has crouched that is when the y-coordinate of the mid-point 
+    # of both shoulders is greater than the upper bound.
+    if (actual_mid_y > MID_Y+TUNING.crouch_margin):
+        return 'Crouching'
+    
+    # Otherwise the person is standing and the y-coordinate of the mid-point 
+    # of both shoulders is between the upper and lower bounds.
+    return 'Standing'
+
+def drawPoseLandmarks(image, results):
+    '''
+    This function draws the detected pose landmarks on the image (in place).
+    '''
+    if results is not None and results.pose_landmarks:
+        mp_drawing.draw_landmarks(image=image, landmark_list=results.pose_landmarks,
+                                  connections=mp_pose.POSE_CONNECTIONS,
+                                  landmark_drawing_spec=POSE_LANDMARK_SPEC,
+                                  connection_drawing_spec=POSE_CONNECTION_SPEC)
+    return image
+
+def drawHandsStatus(image, hand_status, euclidean_distance):
+    '''
+    This function writes the classified hands status and the distance between the wrists on the image (in place).
+    '''
+    
+    # Set the color value to green if the hands are joined, otherwise to red.
+    color = (0, 255, 0) if hand_status == 'Hands Joined' else (0, 0, 255)
+    
+    # Write the classified hands status on the image. 
+    cv2.putText(image, hand_status, (10, 30), cv2.FONT_HERSHEY_PLAIN, 2, color, 3)
+    
+    # Write the the distance between the wrists on the image. 
+    cv2.putText(image, f'Distance: {euclidean_distance}', (10, 70),
+                cv2.FONT_HERSHEY_PLAIN, 2, color, 3)
+    return image
+
+def drawHorizontalPosition(image, horizontal_position):
+    '''
+    This function writes the horizontal position of the person and draws a line at the center of the image (in place).
+    '''
+    height, width, _ = image.shape
+    
+    # Write the horizontal position of the person on the image (if it could be classified).
+    if horizontal_position is not None:
+        cv2.putText(image, horizontal_position, (5, height - 10), cv2.FONT_HERSHEY_PLAIN, 2, (255, 255, 255), 3)
+    
+    # Draw a line at the center of the image.
+    cv2.line(image, (width//2, 0), (width//2, height), (255, 255, 255), 2)
+    return image
+
+def drawPosture(image, posture, MID_Y):
+    '''
+    This function writes the posture of the person and draws a line at the intial center y-coordinate (in place).
+    '''
+    height, width, _ = image.shape
+    
+    # Write the posture of the person on the image. 
+    cv2.putText(image, posture, (5, height - 50), cv2.FONT_HERSHEY_PLAIN, 2, (255, 255, 255), 3)
+    
+    # Draw a line at the intial center y-coordinate of the person (threshold).
+    cv2.line(image, (0, MID_Y),(width, MID_Y),(255, 255, 255), 2)
+    return image
+
+def _showOutputImage(output_image):
+    '''Display an output image with matplotlib.'''
+    plt.figure(figsize=[10,10])
+    plt.imshow(output_image[:,:,::-1]);plt.title("Output Image");plt.axis('off');
+    plt.show()
+
 def checkHandsJoined(image, results, draw=False, display=False):
     '''
     This function checks whether the hands of the person are joined or not in an image.
@@ -95,63 +330,24 @@ def checkHandsJoined(image, results, draw=False, display=False):
         display: A boolean value that is if set to true the function displays the resultant image and returns nothing.
     Returns:
         output_image: The same input image but with the classified hands status written, if it was specified.
+                      When nothing is drawn this is the input image itself (no copy is made).
         hand_status:  The classified status of the hands whether they are joined or not.
     '''
     
     # Get the height and width of the input image.
     height, width, _ = image.shape
     
-    # Create a copy of the input image to write the hands status label on.
-    output_image = image.copy()
+    # Classify the hands status from the landmarks only.
+    hand_status, euclidean_distance = classifyHandsJoined(results, width, height)
     
-    # Get the left wrist landmark x and y coordinates.
-    left_wrist_landmark = (results.pose_landmarks.landmark[mp_pose.PoseLandmark.LEFT_WRIST].x * width,
-                          results.pose_landmarks.landmark[mp_pose.PoseLandmark.LEFT_WRIST].y * height)
-
-    # Get the right wrist landmark x and y coordinates.
-    right_wrist_landmark = (results.pose_landmarks.landmark[mp_pose.PoseLandmark.RIGHT_WRIST].x * width,
-                           results.pose_landmarks.landmark[mp_pose.PoseLandmark.RIGHT_WRIST].y * height)
-    
-    # Calculate the euclidean distance between the left and right wrist.
-    euclidean_distance = int(hypot(left_wrist_landmark[0] - right_wrist_landmark[0],
-                                   left_wrist_landmark[1] - right_wrist_landmark[1]))
-    
-    # Compare the distance between the wrists with a appropriate threshold to check if both hands are joined.
-    # Aumentamos el umbral para que sea más fácil detectar las manos unidas
-    if euclidean_distance < 180:  # Valor original: 130
-        
-        # Set the hands status to joined.
-        hand_status = 'Hands Joined'
-        
-        # Set the color value to green.
-        color = (0, 255, 0)
-        
-    # Otherwise.    
-    else:
-        
-        # Set the hands status to not joined.
-        hand_status = 'Hands Not Joined'
-        
-        # Set the color value to red.
-        color = (0, 0, 255)
-        
-    # Check if the Hands Joined status and hands distance are specified to be written on the output image.
-    if draw:
-
-        # Write the classified hands status on the image. 
-        cv2.putText(output_image, hand_status, (10, 30), cv2.FONT_HERSHEY_PLAIN, 2, color, 3)
-        
-        # Write the the distance between the wrists on the image. 
-        cv2.putText(output_image, f'Distance: {euclidean_distance}', (10, 70),
-                    cv2.FONT_HERSHEY_PLAIN, 2, color, 3)
+    # Only copy the input image when the status has to be written on it.
+    output_image = image
+    if draw or display:
+        output_image = drawHandsStatus(image.copy(), hand_status, euclidean_distance)
         
     # Check if the output image is specified to be displayed.
     if display:
-
-        # Display the output image.
-        plt.figure(figsize=[10,10])
-        plt.imshow(output_image[:,:,::-1]);plt.title("Output Image");plt.axis('off');
-        plt.show()
+        _showOutputImage(output_image)
     
     # Otherwise
     else:
@@ -169,61 +365,24 @@ def checkLeftRight(image, results, draw=False, display=False):
         display: A boolean value that is if set to true the function displays the resultant image and returns nothing.
     Returns:
         output_image:         The same input image but with the horizontal position written, if it was specified.
+                              When nothing is drawn this is the input image itself (no copy is made).
         horizontal_position:  The horizontal position (left, center, right) of the person in the input image.
     '''
     
-    # Declare a variable to store the horizontal position (left, center, right) of the person.
-    horizontal_position = None
-    
     # Get the height and width of the image.
     height, width, _ = image.shape
     
-    # Create a copy of the input image to write the horizontal position on.
-    output_image = image.copy()
+    # Classify the horizontal position from the landmarks only.
+    horizontal_position = classifyLeftRight(results, width)
     
-    # Retreive the x-coordinate of the left shoulder landmark.
-    left_x = int(results.pose_landmarks.landmark[mp_pose.PoseLandmark.RIGHT_SHOULDER].x * width)
-
-    # Retreive the x-corrdinate of the right shoulder landmark.
-    right_x = int(results.pose_landmarks.landmark[mp_pose.PoseLandmark.LEFT_SHOULDER].x * width)
-    
-    # Check if the person is at left that is when both shoulder landmarks x-corrdinates
-    # are less than or equal to the x-corrdinate of the center of the image.
-    if (right_x <= width//2 and left_x <= width//2):
-        
-        # Set the person's position to left.
-        horizontal_position = 'Left'
-
-    # Check if the person is at right that is when both shoulder landmarks x-corrdinates
-    # are greater than or equal to the x-corrdinate of the center of the image.
-    elif (right_x >= width//2 and left_x >= width//2):
-        
-        # Set the person's position to right.
-        horizontal_position = 'Right'
-    
-    # Check if the person is at center that is when right shoulder landmark x-corrdinate is greater than or equal to
-    # and left shoulder landmark x-corrdinate is less than or equal to the x-corrdinate of the center of the image.
-    elif (right_x >= width//2 and left_x <= width//2):
-        
-        # Set the person's position to center.
-        horizontal_position = 'Center'
-        
-    # Check if the person's horizontal position and a line at the center of the image is specified to be drawn.
-    if draw:
-
-        # Write the horizontal position of the person on the image. 
-        cv2.putText(output_image, horizontal_position, (5, height - 10), cv2.FONT_HERSHEY_PLAIN, 2, (255, 255, 255), 3)
-        
-        # Draw a line at the center of the image.
-        cv2.line(output_image, (width//2, 0), (width//2, height), (255, 255, 255), 2)
+    # Only copy the input image when the position has to be written on it.
+    output_image = image
+    if draw or display:
+        output_image = drawHorizontalPosition(image.copy(), horizontal_position)
         
     # Check if the output image is specified to be displayed.
     if display:
-
-        # Display the output image.
-        plt.figure(figsize=[10,10])
-        plt.imshow(output_image[:,:,::-1]);plt.title("Output Image");plt.axis('off');
-        plt.show()
+        _showOutputImage(output_image)
     
     # Otherwise
     else:
@@ -243,65 +402,24 @@ def checkJumpCrouch(image, results, MID_Y=250, draw=False, display=False):
         display: A boolean value that is if set to true the function displays the resultant image and returns nothing.
     Returns:
         output_image: The input image with the person's posture written, if it was specified.
+                      When nothing is drawn this is the input image itself (no copy is made).
         posture:      The posture (Jumping, Crouching or Standing) of the person in an image.
     '''
     
     # Get the height and width of the image.
     height, width, _ = image.shape
     
-    # Create a copy of the input image to write the posture label on.
-    output_image = image.copy()
-    
-    # Retreive the y-coordinate of the left shoulder landmark.
-    left_y = int(results.pose_landmarks.landmark[mp_pose.PoseLandmark.RIGHT_SHOULDER].y * height)
-
-    # Retreive the y-coordinate of the right shoulder landmark.
-    right_y = int(results.pose_landmarks.landmark[mp_pose.PoseLandmark.LEFT_SHOULDER].y * height)
-
-    # Calculate the y-coordinate of the mid-point of both shoulders.
-    actual_mid_y = abs(right_y + left_y) // 2
-    
-    # Calculate the upper and lower bounds of the threshold.
-    lower_bound = MID_Y-15
-    upper_bound = MID_Y+100
-    
-    # Check if the person has jumped that is when the y-coordinate of the mid-point 
-    # of both shoulders is less than the lower bound.
-    if (actual_mid_y < lower_bound):
-        
-        # Set the posture to jumping.
-        posture = 'Jumping'
-    
-    # Check if the person has crouched that is when the y-coordinate of the mid-point 
-    # of both shoulders is greater than the upper bound.
-    elif (actual_mid_y > upper_bound):
-        
-        # Set the posture to crouching.
-        posture = 'Crouching'
+    # Classify the posture from the landmarks only.
+    posture = classifyJumpCrouch(results, height, MID_Y)
     
-    # Otherwise the person is standing and the y-coordinate of the mid-point 
-    # of both shoulders is between the upper and lower bounds.    
-    else:
-        
-        # Set the posture to Standing straight.
-        posture = 'Standing'
-        
-    # Check if the posture and a horizontal line at the threshold is specified to be drawn.
-    if draw:
-
-        # Write the posture of the person on the image. 
-        cv2.putText(output_image, posture, (5, height - 50), cv2.FONT_HERSHEY_PLAIN, 2, (255, 255, 255), 3)
-        
-        # Draw a line at the intial center y-coordinate of the person (threshold).
-        cv2.line(output_image, (0, MID_Y),(width, MID_Y),(255, 255, 255), 2)
+    # Only copy the input image when the posture has to be written on it.
+    output_image = image
+    if draw or display:
+        output_image = drawPosture(image.copy(), posture, MID_Y)
         
     # Check if the output image is specified to be displayed.
     if display:
-
-        # Display the output image.
-        plt.figure(figsize=[10,10])
-        plt.imshow(output_image[:,:,::-1]);plt.title("Output Image");plt.axis('off');
-        plt.show()
+        _showOutputImage(output_image)
     
     # Otherwise
     else:
@@ -344,34 +462,11 @@ def test_image():
     except Exception as e:
         print(f"Error testing image: {e}")
 
-def try_available_cameras():
-    """Try to find available cameras and return the index of the first one that works"""
-    print("Buscando cámaras disponibles...")
-    
-    # Usar directamente la cámara 3 que sabemos que funciona
-    print("Usando cámara con índice 3 (confirmada)")
-    return 3
-    
-    # El código siguiente se mantiene como respaldo pero no se ejecutará
-    max_cameras_to_try = 10
-    for i in range(max_cameras_to_try):
-        print(f"Intentando con cámara {i}...")
-        cap = cv2.VideoCapture(i)
-        if cap.isOpened():
-            ret, frame = cap.read()
-            if ret:
-                print(f"¡Cámara encontrada! Índice: {i}")
-                cap.release()
-                return i
-            cap.release()
-    print("No se encontró ninguna cámara disponible.")
-    return -1
-
 def test_hands_joined():
     """Test the hands joined detection using webcam"""
     try:
         # Try to find an available camera
-        camera_index = try_available_cameras()
+        camera_index = find_camera()
         if camera_index == -1:
             print("Error: No se pudo acceder a ninguna cámara. Verifique que:")
             print("  1. Su cámara esté conectada y funcionando")
@@ -436,7 +531,7 @@ def test_horizontal_movement():
     """Test the horizontal movement detection using webcam"""
     try:
         # Try to find an available camera
-        camera_index = try_available_cameras()
+        camera_index = find_camera()
         if camera_index == -1:
             print("Error: No se pudo acceder a ninguna cámara.")
             return
@@ -497,7 +592,7 @@ def test_vertical_movement():
     """Test the vertical movement (jump/crouch) detection using webcam"""
     try:
         # Try to find an available camera
-        camera_index = try_available_cameras()
+        camera_index = find_camera()
         if camera_index == -1:
             print("Error: No se pudo acceder a ninguna cámara.")
             return
@@ -555,263 +650,415 @@ def test_vertical_movement():
         import traceback
         traceback.print_exc()
 
-def play_game():
-    """Main function to play Subway Surfers with pose detection"""
-    try:
-        # Abrir automáticamente la URL de Subway Surfers
-        print("Abriendo Subway Surfers en el navegador...")
-        webbrowser.open("https://subwaysurfersgame.io/online")
+class GameState:
+    '''
+    State machine of the game controls: turns the pose landmarks of each frame into key presses.
+    It keeps the state of the game between frames (started, lane, vertical position and consecutive
+    frames with the hands joined) and leaves the classification of the last frame in its attributes
+    so that it can be drawn on the frame.
+    '''
+    
+    def __init__(self, num_of_frames=None):
+        '''
+        Args:
+            num_of_frames: The number of consecutive frames with the hands joined required to start
+                           or pause the game (None for the configured one).
+        '''
+        self.keys = KEYS
+        self.start_click = (TUNING.start_click_x, TUNING.start_click_y)
+        if num_of_frames is None:
+            num_of_frames = TUNING.hands_joined_frames
+        self.game_started = False
+        self.x_pos_index = 1
+        self.y_pos_index = 1
+        self.MID_Y = None
+        self.counter = 0
+        self.num_of_frames = num_of_frames
+        self._resetFrame()
+    
+    def _resetFrame(self):
+        '''Clears the classification of the previous frame'''
+        self.position_classified = False
+        self.horizontal_position = None
+        self.posture = None
+        self.hand_status = None
+        self.show_instructions = False
+        self.hands_joined_count = None
+        self.pause_toggled = False
+    
+    def update(self, results, width, height):
+        '''
+        Classifies the pose of a frame and sends the corresponding keys to the game.
+        Args:
+            results: The output of the pose landmarks detection of the frame.
+            width:   The width of the frame.
+            height:  The height of the frame.
+        '''
+        self.send(self.classify(results, width, height))
+    
+    def classify(self, results, width, height):
+        '''
+        Classifies the pose of a frame and updates the state of the game, without sending anything.
+        Args:
+            results: The output of the pose landmarks detection of the frame.
+            width:   The width of the frame.
+            height:  The height of the frame.
+        Returns:
+            actions: The pyautogui calls to send to the game, as (function name, args, kwargs) tuples.
+        '''
+        self._resetFrame()
+        actions = []
         
-        # Try to find an available camera
-        camera_index = try_available_cameras()
-        if camera_index == -1:
-            print("Error: No se pudo acceder a ninguna cámara.")
-            print("  1. Verifique que su cámara esté conectada y funcionando")
-            print("  2. No esté siendo utilizada por otra aplicación")
-            print("  3. Tenga los permisos necesarios para acceder a la cámara")
-            print("  4. Los controladores de la cámara estén instalados correctamente")
-            return
-            
-        # Initialize the VideoCapture object to read from the webcam
-        camera_video = cv2.VideoCapture(camera_index)
-        if not camera_video.isOpened():
-            print(f"Error: No se pudo abrir la cámara con índice {camera_index}")
-            return
+        # Check if the pose landmarks are not detected
+        if not results.pose_landmarks:
             
-        camera_video.set(3, 640)  # Cambiado de 1280 a 640
-        camera_video.set(4, 480)  # Cambiado de 960 a 480
+            # Update the counter value to zero
+            self.counter = 0
+            return actions
         
-        # Create named window for resizing purposes
-        cv2.namedWindow('Subway Surfers with Pose Detection', cv2.WINDOW_NORMAL)
-        
-        # Initialize variables
-        time1 = 0
-        game_started = False
-        x_pos_index = 1
-        y_pos_index = 1
-        MID_Y = None
-        counter = 0
-        num_of_frames = 10
-        
-        # Imprimir instrucciones detalladas en español
-        print("\n============== INSTRUCCIONES ==============")
-        print("1. Colócate frente a la cámara donde pueda verse todo tu cuerpo")
-        print("2. Para INICIAR el juego: Junta tus manos frente a ti (como si rezaras o aplaudieras).")
-        print("3. Para controlar al personaje:")
-        print("   - Muévete a la IZQUIERDA o DERECHA para cambiar de carril")
-        print("   - SALTA para saltar obstáculos")
-        print("   - AGÁCHATE para deslizarte bajo obstáculos")
-        print("4. Para PAUSAR/REANUDAR: Junta tus manos nuevamente")
-        print("5. Presiona ESC para salir")
-        print("=========================================\n")
-        
-        # Contador de frames para mostrar la instrucción animada
-        instruction_frame = 0
-        max_instruction_frames = 90  # ~3 segundos a 30fps
-        
-        # Iterate until the webcam is accessed successfully
-        while camera_video.isOpened():
-            # Read a frame
-            ok, frame = camera_video.read()
+        # Check if the game has started
+        if self.game_started:
             
-            # Check if frame is not read properly
-            if not ok:
-                print("Error: No se pudo leer un fotograma de la cámara")
-                break
+            # Commands to control the horizontal movements of the character
+            self.horizontal_position = classifyLeftRight(results, width)
+            self.position_classified = True
             
-            # Flip the frame horizontally for natural (selfie-view) visualization
-            frame = cv2.flip(frame, 1)
+            # Check if the person has moved to left from center or to center from right
+            if (self.horizontal_position=='Left' and self.x_pos_index!=0) or (self.horizontal_position=='Center' and self.x_pos_index==2):
+                
+                # Press the left arrow key
+                actions.append(('press', (self.keys[LEFT],), {}))
+                
+                # Update the horizontal position index of the character
+                self.x_pos_index -= 1
+            
+            # Check if the person has moved to Right from center or to center from left
+            elif (self.horizontal_position=='Right' and self.x_pos_index!=2) or (self.horizontal_position=='Center' and self.x_pos_index==0):
+                
+                # Press the right arrow key
+                actions.append(('press', (self.keys[RIGHT],), {}))
+                
+                # Update the horizontal position index of the character
+                self.x_pos_index += 1
+        
+        # Otherwise if the game has not started
+        else:
+            # Mostrar instrucciones animadas en la pantalla
+            self.show_instructions = True
+        
+        # Command to Start or resume the game
+        self.hand_status = classifyHandsJoined(results, width, height)[0]
+        if self.hand_status == 'Hands Joined':
             
-            # Get the height and width of the frame
-            frame_height, frame_width, _ = frame.shape
+            # Increment the count of consecutive frames with +ve condition
+            self.counter += 1
             
-            # Perform the pose detection
-            frame, results = detectPose(frame, pose_video, draw=game_started)
+            # Mostrar contador para que el usuario sepa cuánto falta para la acción
+            self.hands_joined_count = self.counter
             
-            # Check if the pose landmarks are detected
-            if results.pose_landmarks:
+            # Check if the counter is equal to the required number of consecutive frames
+            if self.counter == self.num_of_frames:
                 
-                # Check if the game has started
-                if game_started:
+                # Check if the game has not started yet
+                if not(self.game_started):
                     
-                    # Commands to control the horizontal movements of the character
-                    frame, horizontal_position = checkLeftRight(frame, results, draw=True)
+                    # Update the value of the variable that stores the game state
+                    self.game_started = True
                     
-                    # Check if the person has moved to left from center or to center from right
-                    if (horizontal_position=='Left' and x_pos_index!=0) or (horizontal_position=='Center' and x_pos_index==2):
-                        
-                        # Press the left arrow key
-                        pyautogui.press('left')
-                        
-                        # Update the horizontal position index of the character
-                        x_pos_index -= 1               
-
-                    # Check if the person has moved to Right from center or to center from left
-                    elif (horizontal_position=='Right' and x_pos_index!=2) or (horizontal_position=='Center' and x_pos_index==0):
-                        
-                        # Press the right arrow key
-                        pyautogui.press('right')
-                        
-                        # Update the horizontal position index of the character
-                        x_pos_index += 1
-                
-                # Otherwise if the game has not started
-                else:
-                    # Mostrar instrucciones animadas en la pantalla
-                    instruction_frame = (instruction_frame + 1) % max_instruction_frames
+                    # Retreive the y-coordinate of the left shoulder landmark
+                    left_y = int(results.pose_landmarks.landmark[mp_pose.PoseLandmark.RIGHT_SHOULDER].y * height)
                     
-                    # Instrucción principal
-                    cv2.putText(frame, 'JUNTA TUS MANOS FRENTE A TI', (frame_width//2 - 250, frame_height - 100), 
-                                cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 3)
+                    # Retreive the y-coordinate of the right shoulder landmark
+                    right_y = int(results.pose_landmarks.landmark[mp_pose.PoseLandmark.LEFT_SHOULDER].y * height)
                     
-                    # Instrucciones adicionales que parpadean
-                    if instruction_frame < max_instruction_frames // 2:
-                        cv2.putText(frame, 'Como si rezaras o aplaudieras', (frame_width//2 - 200, frame_height - 60), 
-                                    cv2.FONT_HERSHEY_PLAIN, 1, (0, 255, 0), 2)
-                        
-                        # Dibujar iconos de manos
-                        hand_center_x = frame_width // 2
-                        hand_center_y = frame_height // 2
-                        
-                        # Dibujar manos juntas como un simple diagrama
-                        cv2.circle(frame, (hand_center_x - 30, hand_center_y), 40, (0, 255, 0), 2)
-                        cv2.circle(frame, (hand_center_x + 30, hand_center_y), 40, (0, 255, 0), 2)
-                        
-                        # Línea para juntar las manos
-                        cv2.line(frame, (hand_center_x - 10, hand_center_y), 
-                                (hand_center_x + 10, hand_center_y), (0, 255, 0), 5)
-                
-                # Command to Start or resume the game
-                if checkHandsJoined(frame, results)[1] == 'Hands Joined':
-                    
-                    # Mostrar visualmente que las manos están unidas correctamente
-                    cv2.putText(frame, '¡MANOS UNIDAS!', (10, 130), 
-                                cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 3)
+                    # Calculate the intial y-coordinate of the mid-point of both shoulders
+                    self.MID_Y = abs(right_y + left_y) // 2
                     
-                    # Increment the count of consecutive frames with +ve condition
-                    counter += 1
+                    # Move to the start position (1300, 800 by default), then click the left mouse button to start the game
+                    x, y = self.start_click
+                    actions.append(('click', (), {'x': x, 'y': y, 'button': 'left'}))
                     
-                    # Mostrar contador para que el usuario sepa cuánto falta para la acción
-                    cv2.putText(frame, f'Mantenlas unidas: {counter}/{num_of_frames}', 
-                                (10, 170), cv2.FONT_HERSHEY_PLAIN, 2, (0, 255, 0), 2)
-                    
-                    # Check if the counter is equal to the required number of consecutive frames
-                    if counter == num_of_frames:
-                        
-                        # Check if the game has not started yet
-                        if not(game_started):
-                            
-                            # Update the value of the variable that stores the game state
-                            game_started = True
-                            
-                            # Retreive the y-coordinate of the left shoulder landmark
-                            left_y = int(results.pose_landmarks.landmark[mp_pose.PoseLandmark.RIGHT_SHOULDER].y * frame_height)
-                            
-                            # Retreive the y-coordinate of the right shoulder landmark
-                            right_y = int(results.pose_landmarks.landmark[mp_pose.PoseLandmark.LEFT_SHOULDER].y * frame_height)
-                            
-                            # Calculate the intial y-coordinate of the mid-point of both shoulders
-                            MID_Y = abs(right_y + left_y) // 2
-                            
-                            # Move to 1300, 800, then click the left mouse button to start the game
-                            pyautogui.click(x=1300, y=800, button='left')
-                            
-                            # Mensaje de confirmación
-                            print("\n¡Juego iniciado! Ahora puedes controlar al personaje con tus movimientos.")
-                        
-                        # Otherwise if the game has started
-                        else:
-                            
-                            # Press the space key
-                            pyautogui.press('space')
-                            
-                            # Mensaje visual
-                            cv2.putText(frame, '¡PAUSA/CONTINUAR!', (frame_width//2 - 150, 100), 
-                                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 3)
-                        
-                        # Update the counter value to zero
-                        counter = 0
-                        
-                # Otherwise if the left and right hands are not joined
+                    # Mensaje de confirmación
+                    print("\n¡Juego iniciado! Ahora puedes controlar al personaje con tus movimientos.")
+                
+                # Otherwise if the game has started
                 else:
                     
-                    # Update the counter value to zero
-                    counter = 0
+                    # Press the pause key (space by default)
+                    actions.append(('press', (self.keys[PAUSE],), {}))
                     
-                # Commands to control the vertical movements of the character
-                if MID_Y:
-                    
-                    # Get posture (jumping, crouching or standing) of the person
-                    frame, posture = checkJumpCrouch(frame, results, MID_Y, draw=True)
-                    
-                    # Check if the person has jumped
-                    if posture == 'Jumping' and y_pos_index == 1:
-                        
-                        # Press the up arrow key
-                        pyautogui.press('up')
-                        
-                        # Update the vertical position index of the character
-                        y_pos_index += 1 
-                        
-                    # Check if the person has crouched
-                    elif posture == 'Crouching' and y_pos_index == 1:
-                        
-                        # Press the down arrow key
-                        pyautogui.press('down')
-                        
-                        # Update the vertical position index of the character
-                        y_pos_index -= 1
-                    
-                    # Check if the person has stood
-                    elif posture == 'Standing' and y_pos_index != 1:
-                        
-                        # Update the vertical position index of the character
-                        y_pos_index = 1
-            
-            # Otherwise if the pose landmarks in the frame are not detected
-            else:
+                    # Mensaje visual
+                    self.pause_toggled = True
                 
                 # Update the counter value to zero
-                counter = 0
-                
-                # Mostrar mensaje de que no se detecta a la persona
-                cv2.putText(frame, 'No se detecta persona - Ponte frente a la camara', (10, frame_height - 50), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-                
-            # Calculate the frames updates in one second
+                self.counter = 0
+        
+        # Otherwise if the left and right hands are not joined
+        else:
             
-            # Set the time for this frame to the current time
-            time2 = time()
+            # Update the counter value to zero
+            self.counter = 0
+        
+        # Commands to control the vertical movements of the character
+        if self.MID_Y:
             
-            # Check if the difference between the previous and this frame time > 0 to avoid division by zero
-            if (time2 - time1) > 0:
+            # Get posture (jumping, crouching or standing) of the person
+            self.posture = classifyJumpCrouch(results, height, self.MID_Y)
             
-                # Calculate the number of frames per second
-                frames_per_second = 1.0 / (time2 - time1)
+            # Check if the person has jumped
+            if self.posture == 'Jumping' and self.y_pos_index == 1:
                 
-                # Write the calculated number of frames per second on the frame
-                cv2.putText(frame, 'FPS: {}'.format(int(frames_per_second)), (10, 30), cv2.FONT_HERSHEY_PLAIN, 2, (0, 255, 0), 3)
+                # Press the jump key (up arrow by default)
+                actions.append(('press', (self.keys[JUMP],), {}))
+                
+                # Update the vertical position index of the character
+                self.y_pos_index += 1
             
-            # Update the previous frame time to this frame time
-            time1 = time2
+            # Check if the person has crouched
+            elif self.posture == 'Crouching' and self.y_pos_index == 1:
+                
+                # Press the crouch key (down arrow by default)
+                actions.append(('press', (self.keys[CROUCH],), {}))
+                
+                # Update the vertical position index of the character
+                self.y_pos_index -= 1
             
-            # Display the frame
-            cv2.imshow('Subway Surfers with Pose Detection', frame)
+            # Check if the person has stood
+            elif self.posture == 'Standing' and self.y_pos_index != 1:
+                
+                # Update the vertical position index of the character
+                self.y_pos_index = 1
+        
+        return actions
+    
+    @staticmethod
+    def send(actions):
+        '''
+        Sends to the game the keys and clicks decided by classify().
+        Args:
+            actions: The (function name, args, kwargs) tuples returned by classify().
+        '''
+        for name, args, kwargs in actions:
+            getattr(pyautogui, name)(*args, **kwargs)
+
+class SubwaySurfersPlugin(GamePlugin):
+    '''
+    Subway Surfers for the shared controller loop: the full-body pose changes lane (left/right),
+    jumps (up) and crouches (down), and joining the hands starts or pauses the game.
+    '''
+    
+    name = 'subway_surfers'
+    title = 'Subway Surfers'
+    window_title = 'Subway Surfers with Pose Detection'
+    url = "https://subwaysurfersgame.io/online"
+    capture_size = (640, 480)  # Cambiado de 1280x960 a 640x480
+    
+    # Contador de frames para mostrar la instrucción animada (~3 segundos a 30fps)
+    max_instruction_frames = 90
+    
+    def __init__(self):
+        self.state = GameState()
+        self.instruction_frame = 0
+        self.draw_landmarks = False
+    
+    def start(self):
+        self.state = GameState()
+        self.instruction_frame = 0
+    
+    def instructions(self, headless):
+        # Instrucciones detalladas en español
+        return [
+            "\n============== INSTRUCCIONES ==============",
+            "1. Colócate frente a la cámara donde pueda verse todo tu cuerpo",
+            "2. Para INICIAR el juego: Junta tus manos frente a ti (como si rezaras o aplaudieras).",
+            "3. Para controlar al personaje:",
+            "   - Muévete a la IZQUIERDA o DERECHA para cambiar de carril",
+            "   - SALTA para saltar obstáculos",
+            "   - AGÁCHATE para deslizarte bajo obstáculos",
+            "4. Para PAUSAR/REANUDAR: Junta tus manos nuevamente",
+            "5. Modo headless: Ctrl+C, o ESC/q en la consola para salir" if headless
+            else "5. Presiona ESC para salir",
+            "=========================================\n",
+        ]
+    
+    def infer(self, image):
+        # Perform the pose detection (nothing is drawn here, see render), on the player's region with --person-roi
+        return person_roi.infer(pose_video.process, image)
+    
+    def detected(self, results):
+        return results.pose_landmarks is not None
+    
+    def classify(self, results, frame_shape):
+        # The landmarks are drawn from the frame after the one that started the game
+        self.draw_landmarks = self.state.game_started
+        frame_height, frame_width = frame_shape[:2]
+        # With --person-roi the next crop follows the landmarks used here (propagated ones with --flow)
+        person_roi.observe(results)
+        actions = self.state.classify(results, frame_width, frame_height)
+        
+        # Advance the animated instructions while waiting for the game to start
+        if self.state.show_instructions:
+            self.instruction_frame = (self.instruction_frame + 1) % self.max_instruction_frames
+        return actions
+    
+    def act(self, observation, now):
+        GameState.send(observation)
+    
+    def render(self, frame, results, observation, fps):
+        state = self.state
+        
+        # Single annotation pass: everything classified in this frame is drawn in place
+        if self.draw_landmarks:
+            drawPoseLandmarks(frame, results)
+        
+        if state.position_classified:
+            drawHorizontalPosition(frame, state.horizontal_position)
+        
+        if state.show_instructions:
+            # Instrucción principal
+            HUD_JOIN_HANDS.draw(frame)
             
-            # Wait for 1ms. If ESC is pressed, exit
-            k = cv2.waitKey(1) & 0xFF
+            # Instrucciones adicionales que parpadean (texto y diagrama de manos)
+            if self.instruction_frame < self.max_instruction_frames // 2:
+                HUD_JOIN_HANDS_HINT.draw(frame)
+        
+        if state.hands_joined_count is not None:
+            # Mostrar visualmente que las manos están unidas correctamente
+            HUD_HANDS_JOINED.draw(frame)
             
-            if(k == 27):
-                break
-                
-        # Release the VideoCapture object and close the windows
-        camera_video.release()
-        cv2.destroyAllWindows()
+            # Mostrar contador para que el usuario sepa cuánto falta para la acción
+            cv2.putText(frame, f'Mantenlas unidas: {state.hands_joined_count}/{state.num_of_frames}', 
+                        (10, 170), cv2.FONT_HERSHEY_PLAIN, 2, (0, 255, 0), 2)
         
-    except Exception as e:
-        print(f"Error playing game: {e}")
-        import traceback
-        traceback.print_exc()
+        if state.pause_toggled:
+            HUD_PAUSE_RESUME.draw(frame)
+        
+        if state.posture is not None:
+            drawPosture(frame, state.posture, state.MID_Y)
+        
+        # Mostrar mensaje de que no se detecta a la persona
+        if not results.pose_landmarks:
+            HUD_NO_PERSON.draw(frame)
+        
+        # Write the number of frames per second on the frame
+        cv2.putText(frame, 'FPS: {}'.format(int(fps)), (10, 30), cv2.FONT_HERSHEY_PLAIN, 2, (0, 255, 0), 3)
+        return frame
+
+class PinchPausePlugin(GamePlugin):
+    '''
+    Pinch-to-pause from a second camera close to the hands (multi-camera mode): pinching the thumb
+    and index finger pauses or resumes the game without joining the hands in front of the body camera.
+    '''
+    
+    name = 'pinch_pause'
+    title = 'Pinch to pause'
+    window_title = 'Hand camera'
+    
+    def __init__(self, body):
+        '''
+        Args:
+            body: The SubwaySurfersPlugin of the body camera (the pause is only sent once the game started).
+        '''
+        self.body = body
+        self.key = KEYS[PAUSE]
+        self.distance = TUNING.pinch_pause_distance
+        self.num_of_frames = TUNING.pinch_pause_frames
+        self.counter = 0
+        self.pinch_distance = None
+        self.hands = mp.solutions.hands.Hands(model_complexity=0, max_num_hands=1,
+                                              min_detection_confidence=0.5, min_tracking_confidence=0.5)
+    
+    def start(self):
+        self.counter = 0
+    
+    def instructions(self, headless):
+        return [
+            "HAND CAMERA:",
+            "   - PINCH (thumb and index finger) in front of the hand camera to PAUSE/RESUME",
+            "=========================================\n",
+        ]
+    
+    def infer(self, image):
+        return self.hands.process(image)
+    
+    def detected(self, results):
+        return bool(results.multi_hand_landmarks)
+    
+    def classify(self, results, frame_shape):
+        '''
+        Counts the consecutive pinched frames and toggles the pause when they reach the required number.
+        results is None when no hand camera frame was captured close enough to the body camera frame,
+        or when the paired hand frame was already classified with an earlier body frame.
+        '''
+        actions = []
+        if results is None:
+            return actions
+        
+        self.pinch_distance = None
+        if not results.multi_hand_landmarks:
+            self.counter = 0
+            return actions
+        
+        # Distance between the thumb tip and the index finger tip in pixels
+        height, width = frame_shape[:2]
+        landmarks = results.multi_hand_landmarks[0].landmark
+        thumb_tip = landmarks[mp.solutions.hands.HandLandmark.THUMB_TIP]
+        index_tip = landmarks[mp.solutions.hands.HandLandmark.INDEX_FINGER_TIP]
+        self.pinch_distance = hypot((thumb_tip.x - index_tip.x) * width, (thumb_tip.y - index_tip.y) * height)
+        
+        if self.pinch_distance < self.distance:
+            self.counter += 1
+            # Toggle the pause once per pinch, only while playing
+            if self.counter == self.num_of_frames and self.body.state.game_started:
+                actions.append(('press', (self.key,), {}))
+                print("Pinch: pause/resume")
+        else:
+            self.counter = 0
+        return actions
+    
+    def act(self, observation, now):
+        GameState.send(observation)
+    
+    def render(self, frame, results, observation, fps):
+        if results.multi_hand_landmarks:
+            mp_drawing.draw_landmarks(frame, results.multi_hand_landmarks[0], mp.solutions.hands.HAND_CONNECTIONS)
+        pinched = self.counter >= self.num_of_frames
+        status = 'PINCH' if pinched else ('no hand' if self.pinch_distance is None else f'{int(self.pinch_distance)} px')
+        cv2.putText(frame, status, (10, 40), cv2.FONT_HERSHEY_PLAIN, 3,
+                    (0, 255, 0) if pinched else (255, 255, 255), 3)
+        return frame
+
+def play_game(camera_index=None, headless=False, preview_fps=DEFAULT_PREVIEW_FPS,
+              preview_scale=DEFAULT_PREVIEW_SCALE, record=None, replay=None,
+              hand_camera=None, max_skew=MAX_SKEW, use_async=False):
+    """
+    Main function to play Subway Surfers with pose detection
+    
+    Args:
+        camera_index:  Index of the webcam to use (None to look for one)
+        headless:      If True nothing is drawn and no window is opened
+        preview_fps:   Maximum frames per second shown in the preview window
+        preview_scale: Scale factor applied to the frames shown in the preview window
+        record:        Base name of the camera session to record (None to not record)
+        replay:        Base name of a recorded session to use instead of the webcam
+        hand_camera:   Index of a second webcam close to the hands for pinch-to-pause (None for one webcam)
+        max_skew:      Max time between the captures of the two webcams merged in a frame (seconds)
+        use_async:     If True the stages run as asyncio tasks connected by bounded queues
+    """
+    if hand_camera is not None:
+        # Body pose and pinch-to-pause on parallel pipelines, merged by capture time
+        if camera_index is None and not replay:
+            camera_index = find_camera()
+        body = SubwaySurfersPlugin()
+        run_multi_camera(body, PinchPausePlugin(body), camera_index, hand_camera, headless=headless,
+                         preview_fps=preview_fps, preview_scale=preview_scale, record=record, replay=replay,
+                         max_skew=max_skew)
+        return
+    
+    # Same stages as cooperating asyncio tasks (capture, inference and key presses off the event loop)
+    run = run_async_pipeline if use_async else run_pipeline
+    run(SubwaySurfersPlugin(), camera_index=camera_index, headless=headless,
+        preview_fps=preview_fps, preview_scale=preview_scale, record=record, replay=replay)
 
 def show_help():
     """Show usage information for the script"""
@@ -826,6 +1073,25 @@ Commands:
   --test-horizontal    Test horizontal movement detection using webcam
   --test-vertical      Test vertical movement detection using webcam
   --play               Start the game controller
+  --camera N           Index of the webcam to use
+  --hand-camera N      Second webcam close to the hands: pinch to pause/resume
+  --async              Run the stages as asyncio tasks connected by bounded queues
+  --person-roi         Run pose detection only on the region of the player (background subtraction)
+  --max-skew MS        Max time between the frames of both webcams merged together (default 50)
+  --config FILE        Keys and thresholds of the game (default configs/subway_surfers.json)
+  --headless           Play without a window or drawing (exit with Ctrl+C or ESC/q in the console)
+  --preview-fps N      Maximum FPS of the preview window (default 15)
+  --preview-scale N    Scale of the image shown in the preview window (default 0.75)
+  --record NAME        Record the camera session (NAME.avi and NAME.csv)
+  --replay NAME        Use a recorded session instead of the webcam
+  --trace FILE         Save a Chrome/Perfetto trace with the time of each stage
+  --metrics-port N     Publish Prometheus metrics on http://127.0.0.1:N/metrics
+  --memprofile N       Measure the memory allocated per frame (snapshot every N frames)
+  --pacing             Analyze the frame pacing (camera vs CPU bound) at exit
+  --autotune FPS       Tune capture resolution and inference scale to reach FPS (saved per camera)
+                       (standard loop only, not with --async or --hand-camera)
+  --flow K             Run pose detection at most every K frames, propagating the landmarks with optical flow
+                       (standard loop only, not with --async or --hand-camera)
   --help               Show this help message
 
 Instructions:
@@ -847,22 +1113,50 @@ Example:
 
 def main():
     """Main function to parse arguments and run the appropriate function"""
-    parser = argparse.ArgumentParser(description='Subway Surfers Pose Detection Controller')
+    parser = create_parser('Subway Surfers Pose Detection Controller')
     parser.add_argument('--test-image', action='store_true', help='Test pose detection on a sample image')
     parser.add_argument('--test-hands', action='store_true', help='Test hand join detection using webcam')
     parser.add_argument('--test-horizontal', action='store_true', help='Test horizontal movement detection using webcam')
     parser.add_argument('--test-vertical', action='store_true', help='Test vertical movement detection using webcam')
-    parser.add_argument('--play', action='store_true', help='Start the game controller')
+    parser.add_argument('--hand-camera', type=int, help='Index of a second webcam close to the hands (pinch to pause)')
+    parser.add_argument('--max-skew', type=float, default=1000 * MAX_SKEW,
+                        help='Max time in ms between the frames of both webcams merged together')
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help='Run the stages as asyncio tasks connected by bounded queues')
+    parser.add_argument('--person-roi', action='store_true',
+                        help='Run pose detection only on the region of the player (background subtraction)')
     # Removed the custom --help argument as it conflicts with built-in help
     
     # Parse arguments
     args = parser.parse_args()
     
     # Show help if no arguments provided
-    if len(sys.argv) == 1:
+    if no_arguments():
         show_help()
         return
     
+    # Keys and thresholds of the game (reloaded on every launch to pick up changes)
+    try:
+        configure(args.config)
+    except ValueError as e:
+        print(f"Configuration error: {e}")
+        return
+    
+    # The optical flow and the autotuner only wrap the standard loop
+    if args.use_async or args.hand_camera is not None:
+        for option, enabled in (('--flow', args.flow and args.flow > 1), ('--autotune', args.autotune)):
+            if enabled:
+                print(f"Error: {option} only works with the standard loop, not with --async or --hand-camera")
+                return
+    
+    # Traces, metrics, memory and frame pacing if requested
+    start_instrumentation(args, SubwaySurfersPlugin.name, sys.modules[__name__])
+    
+    # Crop the input of the pose model to the player if requested
+    start_person_roi(args.person_roi, lambda: mp_pose.Pose(static_image_mode=False, model_complexity=1,
+                                                           min_detection_confidence=0.7,
+                                                           min_tracking_confidence=0.7))
+    
     # Run the appropriate function
     if args.test_image:
         test_image()
@@ -873,7 +1167,8 @@ def main():
     elif args.test_vertical:
         test_vertical_movement()
     elif args.play:
-        play_game()
+        play_game(hand_camera=args.hand_camera, max_skew=args.max_skew / 1000.0, use_async=args.use_async,
+                  **play_arguments(args))
 
 
 if __name__ == "__main__":
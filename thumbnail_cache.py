@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Caché en disco de miniaturas para el menú de juegos
+
+Decodificar los JPEG y PNG originales y redimensionarlos con LANCZOS en cada inicio
+retrasa la primera ventana del menú. Este módulo guarda cada variante redimensionada
+como PNG en .cache/thumbnails, con un nombre que incluye el tamaño pedido y la fecha
+de modificación y el tamaño del archivo original: si la imagen cambia, su miniatura
+se regenera automáticamente.
+
+Uso:
+    img = load_thumbnail(os.path.join(img_dir, '1942_icon.png'), (64, 64))
+"""
+
+import os
+import glob
+import hashlib
+from PIL import Image
+
+# Carpeta de la caché (ignorada por git)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "thumbnails")
+
+
+def thumbnail_cache_path(source_path, size):
+    """
+    Devuelve la ruta del archivo de caché para una imagen y un tamaño.
+
+    Args:
+        source_path: Ruta de la imagen original
+        size: Tamaño (ancho, alto) de la miniatura
+
+    Returns:
+        Ruta del PNG en la caché
+    """
+    stat = os.stat(source_path)
+    width, height = size
+    key = f"{os.path.abspath(source_path)}|{width}x{height}|{stat.st_mtime_ns}|{stat.st_size}"
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(CACHE_DIR, f"{name}_{width}x{height}_{digest}.png")
+
+
+def load_thumbnail(source_path, size):
+    """
+    Carga una miniatura desde la caché o la genera y la guarda.
+
+    Args:
+        source_path: Ruta de la imagen original
+        size: Tamaño (ancho, alto) de la miniatura
+
+    Returns:
+        Imagen PIL ya cargada en memoria con el tamaño pedido
+    """
+    cache_path = thumbnail_cache_path(source_path, size)
+
+    if os.path.exists(cache_path):
+        try:
+            with Image.open(cache_path) as cached:
+                cached.load()
+                return cached
+        except OSError:
+            # Archivo de caché dañado: se regenera
+            pass
+
+    with Image.open(source_path) as source:
+        thumbnail = source.resize(size, Image.Resampling.LANCZOS)
+
+    # Guardar en un archivo temporal y renombrarlo para no dejar PNG a medio escribir
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        thumbnail.save(temp_path, format='PNG')
+        os.replace(temp_path, cache_path)
+
+        # Borrar las variantes anteriores de la misma imagen y tamaño
+        prefix = os.path.basename(cache_path).rsplit('_', 1)[0]
+        for old_path in glob.glob(os.path.join(CACHE_DIR, f"{glob.escape(prefix)}_*.png")):
+            if old_path != cache_path:
+                os.remove(old_path)
+    except OSError as e:
+        # Sin caché (por ejemplo, carpeta de solo lectura) el menú sigue funcionando
+        print(f"No se pudo guardar la miniatura en caché: {e}")
+
+    return thumbnail